@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-player collection summary table from scratch. Writes on ball "
+        "instances are blocked while this runs."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cursor:
+            # block concurrent writes so that no trigger update is lost during the rebuild
+            cursor.execute("LOCK TABLE ballinstance IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute("DELETE FROM player_collection_summary")
+            cursor.execute(
+                "INSERT INTO player_collection_summary (player_id, ball_id, special_id, count) "
+                "SELECT player_id, ball_id, special_id, COUNT(*) FROM ballinstance "
+                "GROUP BY player_id, ball_id, special_id"
+            )
+            rows = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(f"Collection summary rebuilt with {rows} rows."))
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+def add_months(day: date, months: int) -> date:
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the monthly partitions of the trade tables: create the partitions of the "
+        "upcoming months, and optionally move the oldest ones to the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Number of upcoming months to create partitions for (default: 3)",
+        )
+        parser.add_argument(
+            "--archive-after",
+            type=int,
+            metavar="MONTHS",
+            help="Archive the partitions of the trades older than this number of months",
+        )
+
+    def handle(self, *args, ahead: int, archive_after: int | None, **options):
+        if ahead < 1:
+            raise CommandError("--ahead must be at least 1.")
+        if archive_after is not None and archive_after < 1:
+            raise CommandError("--archive-after must be at least 1.")
+
+        this_month = date.today().replace(day=1)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT trade_create_partitions(%s, %s)",
+                [this_month, add_months(this_month, ahead + 1)],
+            )
+            created = cursor.fetchone()[0]
+            archived = 0
+            if archive_after is not None:
+                cursor.execute(
+                    "SELECT trade_archive_partitions(%s)",
+                    [add_months(this_month, -archive_after)],
+                )
+                archived = cursor.fetchone()[0]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} and archived {archived} monthly partitions.")
+        )
@@ -0,0 +1,129 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:12
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# Maintains player_collection_summary in the same transaction as every insert, delete or
+# ownership change on ballinstance, wherever the change comes from (bot or admin panel).
+CREATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION player_collection_summary_apply(
+    p_player bigint, p_ball bigint, p_special bigint, p_delta integer
+) RETURNS void AS $$
+BEGIN
+    IF p_delta > 0 THEN
+        INSERT INTO player_collection_summary (player_id, ball_id, special_id, count)
+        VALUES (p_player, p_ball, p_special, p_delta)
+        ON CONFLICT (player_id, ball_id, COALESCE(special_id, 0))
+        DO UPDATE SET count = player_collection_summary.count + EXCLUDED.count;
+    ELSE
+        DELETE FROM player_collection_summary
+        WHERE player_id = p_player AND ball_id = p_ball
+            AND special_id IS NOT DISTINCT FROM p_special AND count + p_delta <= 0;
+        IF NOT FOUND THEN
+            UPDATE player_collection_summary SET count = count + p_delta
+            WHERE player_id = p_player AND ball_id = p_ball
+                AND special_id IS NOT DISTINCT FROM p_special;
+        END IF;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION player_collection_summary_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' OR TG_OP = 'UPDATE' THEN
+        PERFORM player_collection_summary_apply(OLD.player_id, OLD.ball_id, OLD.special_id, -1);
+    END IF;
+    IF TG_OP = 'INSERT' OR TG_OP = 'UPDATE' THEN
+        PERFORM player_collection_summary_apply(NEW.player_id, NEW.ball_id, NEW.special_id, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER player_collection_summary_insert_delete
+AFTER INSERT OR DELETE ON ballinstance
+FOR EACH ROW EXECUTE FUNCTION player_collection_summary_trigger();
+
+CREATE TRIGGER player_collection_summary_update
+AFTER UPDATE OF player_id, ball_id, special_id ON ballinstance
+FOR EACH ROW
+WHEN (
+    OLD.player_id IS DISTINCT FROM NEW.player_id
+    OR OLD.ball_id IS DISTINCT FROM NEW.ball_id
+    OR OLD.special_id IS DISTINCT FROM NEW.special_id
+)
+EXECUTE FUNCTION player_collection_summary_trigger();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS player_collection_summary_update ON ballinstance;
+DROP TRIGGER IF EXISTS player_collection_summary_insert_delete ON ballinstance;
+DROP FUNCTION IF EXISTS player_collection_summary_trigger();
+DROP FUNCTION IF EXISTS player_collection_summary_apply(bigint, bigint, bigint, integer);
+"""
+
+FILL_SUMMARY = """
+INSERT INTO player_collection_summary (player_id, ball_id, special_id, count)
+SELECT player_id, ball_id, special_id, COUNT(*) FROM ballinstance
+GROUP BY player_id, ball_id, special_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0005_alter_ball_short_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerCollectionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "ball",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="bd_models.ball"
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="bd_models.player"
+                    ),
+                ),
+                (
+                    "special",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="bd_models.special",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "player_collection_summary",
+                "managed": True,
+                "constraints": [
+                    models.UniqueConstraint(
+                        models.F("player"),
+                        models.F("ball"),
+                        django.db.models.functions.comparison.Coalesce(
+                            models.F("special"), models.Value(0)
+                        ),
+                        name="player_collection_summary_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(sql=CREATE_TRIGGERS, reverse_sql=DROP_TRIGGERS),
+        migrations.RunSQL(sql=FILL_SUMMARY, reverse_sql=migrations.RunSQL.noop),
+    ]
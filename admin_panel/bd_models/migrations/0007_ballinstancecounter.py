@@ -0,0 +1,106 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:40
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# Same principle as player_collection_summary, but global to all players. Only catches,
+# deletions and changes of ball or special touch this table, trades never do.
+CREATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION ballinstance_counter_apply(
+    p_ball bigint, p_special bigint, p_delta integer
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO ballinstance_counter (ball_id, special_id, count)
+    VALUES (p_ball, p_special, p_delta)
+    ON CONFLICT (ball_id, COALESCE(special_id, 0))
+    DO UPDATE SET count = ballinstance_counter.count + EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ballinstance_counter_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' OR TG_OP = 'UPDATE' THEN
+        PERFORM ballinstance_counter_apply(OLD.ball_id, OLD.special_id, -1);
+    END IF;
+    IF TG_OP = 'INSERT' OR TG_OP = 'UPDATE' THEN
+        PERFORM ballinstance_counter_apply(NEW.ball_id, NEW.special_id, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ballinstance_counter_insert_delete
+AFTER INSERT OR DELETE ON ballinstance
+FOR EACH ROW EXECUTE FUNCTION ballinstance_counter_trigger();
+
+CREATE TRIGGER ballinstance_counter_update
+AFTER UPDATE OF ball_id, special_id ON ballinstance
+FOR EACH ROW
+WHEN (OLD.ball_id IS DISTINCT FROM NEW.ball_id OR OLD.special_id IS DISTINCT FROM NEW.special_id)
+EXECUTE FUNCTION ballinstance_counter_trigger();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS ballinstance_counter_update ON ballinstance;
+DROP TRIGGER IF EXISTS ballinstance_counter_insert_delete ON ballinstance;
+DROP FUNCTION IF EXISTS ballinstance_counter_trigger();
+DROP FUNCTION IF EXISTS ballinstance_counter_apply(bigint, bigint, integer);
+"""
+
+FILL_COUNTERS = """
+INSERT INTO ballinstance_counter (ball_id, special_id, count)
+SELECT ball_id, special_id, COUNT(*) FROM ballinstance GROUP BY ball_id, special_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0006_playercollectionsummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BallInstanceCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "ball",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="bd_models.ball"
+                    ),
+                ),
+                (
+                    "special",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="bd_models.special",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ballinstance_counter",
+                "managed": True,
+                "constraints": [
+                    models.UniqueConstraint(
+                        models.F("ball"),
+                        django.db.models.functions.comparison.Coalesce(
+                            models.F("special"), models.Value(0)
+                        ),
+                        name="ballinstance_counter_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(sql=CREATE_TRIGGERS, reverse_sql=DROP_TRIGGERS),
+        migrations.RunSQL(sql=FILL_COUNTERS, reverse_sql=migrations.RunSQL.noop),
+    ]
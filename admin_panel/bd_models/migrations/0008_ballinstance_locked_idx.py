@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0007_ballinstancecounter"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ballinstance",
+            index=models.Index(
+                condition=models.Q(("locked__isnull", False)),
+                fields=["locked"],
+                name="ballinstance_locked_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0008_ballinstance_locked_idx"),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name="ball",
+            name="search_text",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Concat(
+                        models.F("country"),
+                        models.Value(" "),
+                        django.db.models.functions.comparison.Coalesce(
+                            models.F("catch_names"),
+                            models.Value(""),
+                            output_field=models.TextField(),
+                        ),
+                        models.Value(" "),
+                        django.db.models.functions.comparison.Coalesce(
+                            models.F("translations"),
+                            models.Value(""),
+                            output_field=models.TextField(),
+                        ),
+                        output_field=models.TextField(),
+                    )
+                ),
+                output_field=models.TextField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ball",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_text"], name="ball_search_text_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ballinstance",
+            index=models.Index(fields=["player", "ball"], name="ballinstance_player_ball_idx"),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.4 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0009_ball_search_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("kind", models.CharField(help_text="Name of the job handler", max_length=64)),
+                (
+                    "user_id",
+                    models.BigIntegerField(help_text="Discord ID of the user who queued the job"),
+                ),
+                (
+                    "payload",
+                    models.JSONField(blank=True, default=dict, help_text="Arguments of the job"),
+                ),
+                (
+                    "direct_message",
+                    models.BooleanField(
+                        default=False, help_text="Deliver the result in DMs instead of a followup"
+                    ),
+                ),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[(1, "Pending"), (2, "Running"), (3, "Done"), (4, "Failed")],
+                        default=1,
+                    ),
+                ),
+                (
+                    "progress",
+                    models.FloatField(default=0, help_text="Progress between 0 and 1"),
+                ),
+                ("error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "job",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status__in", (1, 2))),
+                        fields=["status", "created_at"],
+                        name="job_active_idx",
+                    ),
+                    models.Index(fields=["user_id"], name="job_user_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,194 @@
+# Generated by Django 5.1.4 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Trades and their objects are partitioned by month on the date of the trade. A foreign key to a
+# partitioned table must include the partition key, which would prevent detaching partitions
+# into the archive, so tradeobject.trade_id is not a database constraint anymore and deleting a
+# trade cascades to its objects through a trigger instead.
+#
+# Partitions are named trade_pYYYY_MM and tradeobject_pYYYY_MM, and are created ahead of time by
+# trade_create_partitions. Old partitions are moved by trade_archive_partitions under the
+# trade_archive and tradeobject_archive tables, which are only read when explicitly requested.
+# Rows without a matching partition land in the default partitions, which should stay empty.
+CREATE_TABLES = """
+ALTER TABLE trade RENAME TO trade_legacy;
+ALTER TABLE tradeobject RENAME TO tradeobject_legacy;
+
+CREATE SEQUENCE trade_partitioned_id_seq AS bigint;
+CREATE SEQUENCE tradeobject_partitioned_id_seq AS bigint;
+SELECT setval('trade_partitioned_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM trade_legacy;
+SELECT setval('tradeobject_partitioned_id_seq', COALESCE(MAX(id), 0) + 1, false)
+FROM tradeobject_legacy;
+
+CREATE TABLE trade (
+    id bigint NOT NULL DEFAULT nextval('trade_partitioned_id_seq'),
+    date timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    player1_id bigint NOT NULL REFERENCES player (id) ON DELETE CASCADE,
+    player2_id bigint NOT NULL REFERENCES player (id) ON DELETE CASCADE,
+    PRIMARY KEY (id, date)
+) PARTITION BY RANGE (date);
+CREATE INDEX trade_player1_date_idx ON trade (player1_id, date);
+CREATE INDEX trade_player2_date_idx ON trade (player2_id, date);
+CREATE TABLE trade_default PARTITION OF trade DEFAULT;
+
+CREATE TABLE tradeobject (
+    id bigint NOT NULL DEFAULT nextval('tradeobject_partitioned_id_seq'),
+    trade_id bigint NOT NULL,
+    trade_date timestamp with time zone NOT NULL,
+    ballinstance_id bigint NOT NULL REFERENCES ballinstance (id) ON DELETE CASCADE,
+    player_id bigint NOT NULL REFERENCES player (id) ON DELETE CASCADE,
+    PRIMARY KEY (id, trade_date)
+) PARTITION BY RANGE (trade_date);
+CREATE INDEX tradeobject_trade_idx ON tradeobject (trade_id);
+CREATE INDEX tradeobject_ballinstance_idx ON tradeobject (ballinstance_id);
+CREATE INDEX tradeobject_player_idx ON tradeobject (player_id);
+CREATE TABLE tradeobject_default PARTITION OF tradeobject DEFAULT;
+
+ALTER SEQUENCE trade_partitioned_id_seq OWNED BY trade.id;
+ALTER SEQUENCE tradeobject_partitioned_id_seq OWNED BY tradeobject.id;
+
+CREATE TABLE trade_archive (LIKE trade) PARTITION BY RANGE (date);
+ALTER TABLE trade_archive ADD PRIMARY KEY (id, date);
+CREATE INDEX trade_archive_player1_date_idx ON trade_archive (player1_id, date);
+CREATE INDEX trade_archive_player2_date_idx ON trade_archive (player2_id, date);
+
+CREATE TABLE tradeobject_archive (LIKE tradeobject)
+PARTITION BY RANGE (trade_date);
+ALTER TABLE tradeobject_archive ADD PRIMARY KEY (id, trade_date);
+CREATE INDEX tradeobject_archive_trade_idx ON tradeobject_archive (trade_id);
+CREATE INDEX tradeobject_archive_ballinstance_idx ON tradeobject_archive (ballinstance_id);
+CREATE INDEX tradeobject_archive_player_idx ON tradeobject_archive (player_id);
+"""
+
+CREATE_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION trade_delete_objects() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM tradeobject WHERE trade_id = OLD.id AND trade_date = OLD.date;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trade_delete_objects
+AFTER DELETE ON trade
+FOR EACH ROW EXECUTE FUNCTION trade_delete_objects();
+
+-- Create the monthly partitions covering [p_from, p_to), skipping the existing or archived ones.
+-- Returns the number of months created.
+CREATE OR REPLACE FUNCTION trade_create_partitions(p_from date, p_to date)
+RETURNS integer AS $$
+DECLARE
+    month date := date_trunc('month', p_from)::date;
+    start_at timestamp with time zone;
+    end_at timestamp with time zone;
+    suffix text;
+    created integer := 0;
+BEGIN
+    WHILE month < p_to LOOP
+        suffix := to_char(month, 'YYYY_MM');
+        start_at := month::timestamp AT TIME ZONE 'UTC';
+        end_at := (month + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+        IF to_regclass('trade_p' || suffix) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF trade FOR VALUES FROM (%L) TO (%L)',
+                'trade_p' || suffix, start_at, end_at
+            );
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF tradeobject FOR VALUES FROM (%L) TO (%L)',
+                'tradeobject_p' || suffix, start_at, end_at
+            );
+            created := created + 1;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move the monthly partitions older than p_before from the live tables to the archive tables.
+-- Returns the number of months archived.
+CREATE OR REPLACE FUNCTION trade_archive_partitions(p_before date)
+RETURNS integer AS $$
+DECLARE
+    part record;
+    suffix text;
+    archived integer := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'trade'::regclass AND c.relname ~ '^trade_p[0-9]{4}_[0-9]{2}$'
+        ORDER BY c.relname
+    LOOP
+        suffix := substr(part.relname, 8);
+        IF to_date(suffix, 'YYYY_MM') >= date_trunc('month', p_before) THEN
+            CONTINUE;
+        END IF;
+        EXECUTE format('ALTER TABLE trade DETACH PARTITION %I', part.relname);
+        EXECUTE format(
+            'ALTER TABLE trade_archive ATTACH PARTITION %I %s', part.relname, part.bound
+        );
+        EXECUTE format('ALTER TABLE tradeobject DETACH PARTITION %I', 'tradeobject_p' || suffix);
+        EXECUTE format(
+            'ALTER TABLE tradeobject_archive ATTACH PARTITION %I %s',
+            'tradeobject_p' || suffix, part.bound
+        );
+        archived := archived + 1;
+    END LOOP;
+    RETURN archived;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+FILL_TABLES = """
+SELECT trade_create_partitions(
+    COALESCE((SELECT MIN(date) FROM trade_legacy), CURRENT_TIMESTAMP)::date,
+    (CURRENT_TIMESTAMP + interval '3 months')::date
+);
+
+INSERT INTO trade (id, date, player1_id, player2_id)
+SELECT id, date, player1_id, player2_id FROM trade_legacy;
+
+INSERT INTO tradeobject (id, trade_id, trade_date, ballinstance_id, player_id)
+SELECT o.id, o.trade_id, t.date, o.ballinstance_id, o.player_id
+FROM tradeobject_legacy o JOIN trade_legacy t ON t.id = o.trade_id;
+
+DROP TABLE tradeobject_legacy;
+DROP TABLE trade_legacy;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0010_job"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="tradeobject",
+                    name="trade_date",
+                    field=models.DateTimeField(
+                        editable=False, help_text="Date of the trade, partition key of the table"
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="tradeobject",
+                    name="trade",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="bd_models.trade",
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(sql=CREATE_TABLES),
+                migrations.RunSQL(sql=CREATE_FUNCTIONS),
+                migrations.RunSQL(sql=FILL_TABLES),
+            ],
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.1.4 on 2026-10-19 17:25
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# the archive must keep the same columns as the live table for partitions to move between them
+ADD_ARCHIVE_COLUMNS = """
+ALTER TABLE trade_archive
+    ADD COLUMN summary jsonb NOT NULL DEFAULT '{}',
+    ADD COLUMN ball_ids integer[] NOT NULL DEFAULT '{}',
+    ADD COLUMN special_ids integer[] NOT NULL DEFAULT '{}';
+"""
+
+DROP_ARCHIVE_COLUMNS = """
+ALTER TABLE trade_archive
+    DROP COLUMN summary,
+    DROP COLUMN ball_ids,
+    DROP COLUMN special_ids;
+"""
+
+FILL_SUMMARY = """
+UPDATE {trade} t
+SET summary = s.summary, ball_ids = s.ball_ids, special_ids = s.special_ids
+FROM (
+    SELECT o.trade_id, o.trade_date,
+        jsonb_build_object(
+            'player1', COALESCE(
+                jsonb_agg(
+                    jsonb_build_array(
+                        i.id, i.ball_id, i.special_id, i.health_bonus, i.attack_bonus
+                    ) ORDER BY o.id
+                ) FILTER (WHERE o.player_id = tr.player1_id),
+                '[]'
+            ),
+            'player2', COALESCE(
+                jsonb_agg(
+                    jsonb_build_array(
+                        i.id, i.ball_id, i.special_id, i.health_bonus, i.attack_bonus
+                    ) ORDER BY o.id
+                ) FILTER (WHERE o.player_id = tr.player2_id),
+                '[]'
+            )
+        ) AS summary,
+        array_agg(DISTINCT i.ball_id) AS ball_ids,
+        COALESCE(
+            array_agg(DISTINCT i.special_id) FILTER (WHERE i.special_id IS NOT NULL), '{{}}'
+        ) AS special_ids
+    FROM {tradeobject} o
+    JOIN {trade} tr ON tr.id = o.trade_id AND tr.date = o.trade_date
+    JOIN ballinstance i ON i.id = o.ballinstance_id
+    GROUP BY o.trade_id, o.trade_date, tr.player1_id, tr.player2_id
+) s
+WHERE t.id = s.trade_id AND t.date = s.trade_date;
+"""
+
+CREATE_ARCHIVE_INDEXES = """
+CREATE INDEX trade_archive_ball_ids_idx ON trade_archive USING gin (ball_ids);
+CREATE INDEX trade_archive_special_ids_idx ON trade_archive USING gin (special_ids);
+"""
+
+DROP_ARCHIVE_INDEXES = """
+DROP INDEX trade_archive_ball_ids_idx;
+DROP INDEX trade_archive_special_ids_idx;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bd_models", "0011_partition_trades"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trade",
+            name="summary",
+            field=models.JSONField(
+                default=dict, editable=False, help_text="Instances given by each player"
+            ),
+        ),
+        migrations.AddField(
+            model_name="trade",
+            name="ball_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(),
+                default=list,
+                editable=False,
+                help_text="Countryballs traded",
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="trade",
+            name="special_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(),
+                default=list,
+                editable=False,
+                help_text="Specials traded",
+                size=None,
+            ),
+        ),
+        migrations.RunSQL(sql=ADD_ARCHIVE_COLUMNS, reverse_sql=DROP_ARCHIVE_COLUMNS),
+        migrations.RunSQL(
+            sql=FILL_SUMMARY.format(trade="trade", tradeobject="tradeobject"),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql=FILL_SUMMARY.format(trade="trade_archive", tradeobject="tradeobject_archive"),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="trade",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ball_ids"], name="trade_ball_ids_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trade",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["special_ids"], name="trade_special_ids_idx"
+            ),
+        ),
+        migrations.RunSQL(sql=CREATE_ARCHIVE_INDEXES, reverse_sql=DROP_ARCHIVE_INDEXES),
+    ]
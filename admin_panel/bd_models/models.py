@@ -4,8 +4,12 @@ from datetime import timedelta
 from typing import Any, Iterable, cast
 
 from django.contrib import admin
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.cache import cache
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Concat, Lower
 from django.utils.safestring import SafeText, mark_safe
 from django.utils.timezone import now
 
@@ -221,6 +225,20 @@ class Ball(models.Model):
     regime_id: int
     created_at = models.DateTimeField(blank=True, null=True, auto_now_add=True, editable=False)
     translations = models.TextField(blank=True, null=True)
+    search_text = models.GeneratedField(
+        expression=Lower(
+            Concat(
+                F("country"),
+                Value(" "),
+                Coalesce(F("catch_names"), Value(""), output_field=models.TextField()),
+                Value(" "),
+                Coalesce(F("translations"), Value(""), output_field=models.TextField()),
+                output_field=models.TextField(),
+            )
+        ),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
 
     def __str__(self) -> str:
         return self.country
@@ -253,6 +271,13 @@ class Ball(models.Model):
     class Meta:
         managed = True
         db_table = "ball"
+        indexes = [
+            GinIndex(
+                fields=["search_text"],
+                name="ball_search_text_trgm",
+                opclasses=["gin_trgm_ops"],
+            )
+        ]
 
 
 class BallInstance(models.Model):
@@ -320,6 +345,65 @@ class BallInstance(models.Model):
         managed = True
         db_table = "ballinstance"
         unique_together = (("player", "id"),)
+        indexes = [
+            models.Index(fields=("player", "ball"), name="ballinstance_player_ball_idx"),
+            models.Index(
+                fields=("locked",),
+                name="ballinstance_locked_idx",
+                condition=Q(locked__isnull=False),
+            ),
+        ]
+
+
+class PlayerCollectionSummary(models.Model):
+    """
+    Number of instances owned per player, countryball and special.
+
+    This table is maintained by database triggers on `ballinstance`, do not edit it manually.
+    """
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE)
+    player_id: int
+    ball = models.ForeignKey(Ball, on_delete=models.CASCADE)
+    ball_id: int
+    special = models.ForeignKey(Special, on_delete=models.CASCADE, blank=True, null=True)
+    special_id: int | None
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = "player_collection_summary"
+        constraints = [
+            models.UniqueConstraint(
+                F("player"),
+                F("ball"),
+                Coalesce(F("special"), Value(0)),
+                name="player_collection_summary_unique",
+            )
+        ]
+
+
+class BallInstanceCounter(models.Model):
+    """
+    Total number of instances per countryball and special.
+
+    This table is maintained by database triggers on `ballinstance`, do not edit it manually.
+    """
+
+    ball = models.ForeignKey(Ball, on_delete=models.CASCADE)
+    ball_id: int
+    special = models.ForeignKey(Special, on_delete=models.CASCADE, blank=True, null=True)
+    special_id: int | None
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = "ballinstance_counter"
+        constraints = [
+            models.UniqueConstraint(
+                F("ball"), Coalesce(F("special"), Value(0)), name="ballinstance_counter_unique"
+            )
+        ]
 
 
 class BlacklistedID(models.Model):
@@ -364,6 +448,15 @@ class Trade(models.Model):
     player1_id: int
     player2 = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="trade_player2_set")
     player2_id: int
+    summary = models.JSONField(
+        default=dict, editable=False, help_text="Instances given by each player"
+    )
+    ball_ids = ArrayField(
+        models.IntegerField(), default=list, editable=False, help_text="Countryballs traded"
+    )
+    special_ids = ArrayField(
+        models.IntegerField(), default=list, editable=False, help_text="Specials traded"
+    )
     tradeobject_set: models.QuerySet[TradeObject]
 
     def __str__(self) -> str:
@@ -372,6 +465,10 @@ class Trade(models.Model):
     class Meta:
         managed = True
         db_table = "trade"
+        indexes = [
+            GinIndex(fields=("ball_ids",), name="trade_ball_ids_idx"),
+            GinIndex(fields=("special_ids",), name="trade_special_ids_idx"),
+        ]
 
 
 class TradeObject(models.Model):
@@ -379,8 +476,16 @@ class TradeObject(models.Model):
     ballinstance_id: int
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     player_id: int
-    trade = models.ForeignKey(Trade, on_delete=models.CASCADE)
+    trade = models.ForeignKey(Trade, on_delete=models.CASCADE, db_constraint=False)
     trade_id: int
+    trade_date = models.DateTimeField(
+        editable=False, help_text="Date of the trade, partition key of the table"
+    )
+
+    def save(self, *args, **kwargs):
+        # the partition key must always match the date of the trade
+        self.trade_date = self.trade.date
+        super().save(*args, **kwargs)
 
     class Meta:
         managed = True
@@ -411,3 +516,40 @@ class Block(models.Model):
     class Meta:
         managed = True
         db_table = "block"
+
+
+class JobStatus(models.IntegerChoices):
+    PENDING = 1
+    RUNNING = 2
+    DONE = 3
+    FAILED = 4
+
+
+class Job(models.Model):
+    kind = models.CharField(max_length=64, help_text="Name of the job handler")
+    user_id = models.BigIntegerField(help_text="Discord ID of the user who queued the job")
+    payload = models.JSONField(blank=True, default=dict, help_text="Arguments of the job")
+    direct_message = models.BooleanField(
+        default=False, help_text="Deliver the result in DMs instead of a followup"
+    )
+    status = models.SmallIntegerField(choices=JobStatus.choices, default=JobStatus.PENDING)
+    progress = models.FloatField(default=0, help_text="Progress between 0 and 1")
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk}"
+
+    class Meta:
+        managed = True
+        db_table = "job"
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"],
+                condition=models.Q(status__in=(JobStatus.PENDING, JobStatus.RUNNING)),
+                name="job_active_idx",
+            ),
+            models.Index(fields=["user_id"], name="job_user_idx"),
+        ]
@@ -17,6 +17,8 @@ from tortoise import Tortoise
 
 from ballsdex import __version__ as bot_version
 from ballsdex.core.bot import BallsDexBot
+from ballsdex.core.jobs import job_queue
+from ballsdex.core.utils import query_stats
 from ballsdex.logging import init_logger
 from ballsdex.settings import read_settings, settings, update_settings, write_default_settings
 
@@ -34,6 +36,11 @@ TORTOISE_ORM = {
 }
 
 
+# optional read replica, used for replica-safe reads (see ballsdex.core.utils.replica)
+if replica_url := os.environ.get("BALLSDEXBOT_DB_REPLICA_URL"):
+    TORTOISE_ORM["connections"]["replica"] = replica_url
+
+
 class CLIFlags(argparse.Namespace):
     version: bool
     config_file: Path
@@ -174,6 +181,7 @@ async def shutdown_handler(bot: BallsDexBot, signal_type: str | None = None):
     else:
         log.info("Shutting down the bot...")
     try:
+        await job_queue.stop()
         await asyncio.wait_for(bot.close(), timeout=10)
     finally:
         pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
@@ -238,6 +246,7 @@ class RemoveWSBehindMsg(logging.Filter):
 
 async def init_tortoise(db_url: str, *, skip_migrations: bool = False):
     log.debug(f"Database URL: {db_url}")
+    query_stats.install()
     await Tortoise.init(config=TORTOISE_ORM)
 
 
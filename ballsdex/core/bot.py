@@ -13,7 +13,6 @@ import aiohttp
 import discord
 import discord.gateway
 from aiohttp import ClientTimeout
-from cachetools import TTLCache
 from discord import app_commands
 from discord.app_commands.translator import TranslationContextTypes, locale_str
 from discord.enums import Locale
@@ -25,6 +24,7 @@ from rich.table import Table
 
 from ballsdex.core.commands import Core
 from ballsdex.core.dev import Dev
+from ballsdex.core.jobs import job_queue
 from ballsdex.core.metrics import PrometheusServer
 from ballsdex.core.models import (
     Ball,
@@ -38,6 +38,9 @@ from ballsdex.core.models import (
     regimes,
     specials,
 )
+from ballsdex.core.utils.locks import lock_manager
+from ballsdex.core.utils.name_index import catalog_changed
+from ballsdex.core.utils.query_stats import track_queries
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -122,6 +125,17 @@ class CommandTree(app_commands.CommandTree):
             return False  # wait for all shards to be connected
         return await bot.blacklist_check(interaction)
 
+    async def _call(self, interaction: discord.Interaction[BallsDexBot]):
+        # every interaction runs in its own task, so queries are counted per interaction
+        with track_queries("unknown") as stats:
+            try:
+                await super()._call(interaction)
+            finally:
+                if command := interaction.command:
+                    stats.name = command.qualified_name
+                if interaction.type == discord.InteractionType.autocomplete:
+                    stats.name += " (autocomplete)"
+
 
 class BallsDexBot(commands.AutoShardedBot):
     """
@@ -174,7 +188,6 @@ class BallsDexBot(commands.AutoShardedBot):
         self.blacklist_guild: set[int] = set()
         self.catch_log: set[int] = set()
         self.command_log: set[int] = set()
-        self.locked_balls = TTLCache(maxsize=99999, ttl=60 * 30)
 
         self.owner_ids: set
 
@@ -239,6 +252,7 @@ class BallsDexBot(commands.AutoShardedBot):
         for special in await Special.all():
             specials[special.pk] = special
         table.add_row("Special events", str(len(specials)))
+        catalog_changed()
 
         self.blacklist = set()
         for blacklisted_id in await BlacklistedID.all().only("discord_id"):
@@ -250,6 +264,9 @@ class BallsDexBot(commands.AutoShardedBot):
             self.blacklist_guild.add(blacklisted_id.discord_id)
         table.add_row("Blacklisted guilds", str(len(self.blacklist_guild)))
 
+        await lock_manager.load()
+        table.add_row("Locked instances", str(len(lock_manager.locks)))
+
         log.info("Cache loaded, summary displayed below:")
         console = Console()
         console.print(table)
@@ -360,6 +377,9 @@ class BallsDexBot(commands.AutoShardedBot):
                     f"Synced {len(synced_commands)} admin command{grammar} for guild {guild.id}."
                 )
 
+        # handlers are registered by the packages, start once they are loaded
+        await job_queue.start(self)
+
         if settings.prometheus_enabled:
             try:
                 await self.start_prometheus_server()
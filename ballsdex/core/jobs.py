@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, NamedTuple
+
+import discord
+
+from ballsdex.core.metrics import job_duration, job_queue_size
+from ballsdex.core.models import Job, JobStatus
+from ballsdex.core.utils.query_stats import track_queries
+from ballsdex.settings import settings
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+
+log = logging.getLogger("ballsdex.core.jobs")
+
+__all__ = ("JobResult", "JobError", "TooManyJobs", "JobContext", "JobQueue", "job_queue")
+
+# interaction tokens expire after 15 minutes, keep a margin for the delivery itself
+INTERACTION_LIFETIME = timedelta(minutes=14)
+
+
+class JobResult(NamedTuple):
+    """
+    Result of a job, delivered to the user who queued it.
+    """
+
+    content: str
+    files: tuple[discord.File, ...] = ()
+    embeds: tuple[discord.Embed, ...] = ()
+
+
+class JobError(Exception):
+    """
+    Error raised by a job handler, its message is sent to the user.
+    """
+
+
+class TooManyJobs(Exception):
+    """
+    The user already has `settings.jobs_per_user` jobs queued or running.
+    """
+
+
+class JobContext:
+    """
+    Context given to job handlers.
+
+    Attributes
+    ----------
+    bot: BallsDexBot
+        The bot instance.
+    job: Job
+        The job being run, its `payload` holds the arguments given when queued.
+    interaction: discord.Interaction | None
+        The interaction that queued the job, if it is still usable. Jobs resumed after a
+        restart do not have one.
+    """
+
+    # minimum delay in seconds between two progress reports
+    progress_interval: float = 3
+
+    def __init__(
+        self,
+        bot: "BallsDexBot",
+        job: Job,
+        interaction: discord.Interaction["BallsDexBot"] | None,
+    ):
+        self.bot = bot
+        self.job = job
+        self.interaction = interaction
+        self.last_progress: float = 0
+
+    async def progress(self, done: int, total: int):
+        """
+        Report the progress of the job. This is throttled, it can be called as often as needed.
+        """
+        now = time.monotonic()
+        if total <= 0 or now - self.last_progress < self.progress_interval:
+            return
+        self.last_progress = now
+        self.job.progress = min(done / total, 1)
+        await Job.filter(id=self.job.pk).update(progress=self.job.progress)
+        if self.interaction is not None and not interaction_expired(self.interaction):
+            try:
+                await self.interaction.edit_original_response(
+                    content=f"Your request is in progress ({round(self.job.progress * 100)}%)."
+                )
+            except discord.HTTPException:
+                pass
+
+
+Handler = Callable[[JobContext], Awaitable[JobResult]]
+
+
+def interaction_expired(interaction: discord.Interaction) -> bool:
+    return discord.utils.utcnow() - interaction.created_at > INTERACTION_LIFETIME
+
+
+class JobQueue:
+    """
+    Queue of background jobs, persisted in the `job` table and run by a pool of workers.
+
+    Commands producing heavy reports enqueue a job and acknowledge the interaction right away.
+    The job runs once a worker is free, `settings.job_workers` at the same time, and its result
+    is delivered as a followup of the interaction, or in DMs. Each user can only have
+    `settings.jobs_per_user` jobs queued or running.
+
+    Jobs left queued or running when the bot stopped are resumed on the next start, and their
+    results are delivered in DMs since the interaction is gone.
+
+    Handlers are registered by kind with the `handler` decorator.
+    """
+
+    def __init__(self):
+        self.handlers: dict[str, Handler] = {}
+        self.queue: asyncio.Queue[int] = asyncio.Queue()
+        self.interactions: dict[int, discord.Interaction["BallsDexBot"]] = {}
+        self.workers: list[asyncio.Task[None]] = []
+        self.lock = asyncio.Lock()
+
+    def handler(self, kind: str) -> Callable[[Handler], Handler]:
+        """
+        Decorator registering a coroutine as the handler of a kind of job.
+        """
+
+        def decorator(func: Handler) -> Handler:
+            self.handlers[kind] = func
+            return func
+
+        return decorator
+
+    async def enqueue(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        *,
+        direct_message: bool = False,
+    ) -> Job:
+        """
+        Queue a job for the user of an interaction. The interaction must be acknowledged by the
+        caller, its original response is then edited with the progress of the job.
+
+        Parameters
+        ----------
+        interaction: discord.Interaction
+            The interaction requesting the job.
+        kind: str
+            Kind of job, a handler must be registered for it.
+        payload: dict[str, Any] | None
+            JSON-serializable arguments of the job.
+        direct_message: bool
+            Deliver the result in DMs instead of a followup of the interaction.
+
+        Raises
+        ------
+        TooManyJobs
+            The user already has too many jobs queued or running.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job {kind}")
+        async with self.lock:
+            active = await Job.filter(
+                user_id=interaction.user.id, status__in=(JobStatus.PENDING, JobStatus.RUNNING)
+            ).count()
+            if active >= settings.jobs_per_user:
+                raise TooManyJobs()
+            job = await Job.create(
+                kind=kind,
+                user_id=interaction.user.id,
+                payload=payload or {},
+                direct_message=direct_message,
+            )
+        self.interactions[job.pk] = interaction
+        self.queue.put_nowait(job.pk)
+        job_queue_size.set(self.queue.qsize())
+        return job
+
+    async def submit(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        *,
+        direct_message: bool = False,
+    ) -> Job | None:
+        """
+        Acknowledge an interaction and queue a job for its user, see `enqueue`. If the user
+        already has too many jobs, they are told so and `None` is returned.
+        """
+        where = "via DMs" if direct_message else "here"
+        await interaction.response.send_message(
+            f"Your request has been queued, it will be sent {where} once ready.", ephemeral=True
+        )
+        try:
+            return await self.enqueue(interaction, kind, payload, direct_message=direct_message)
+        except TooManyJobs:
+            await interaction.edit_original_response(
+                content="You already have a request in progress, please wait for it to finish."
+            )
+            return None
+
+    async def start(self, bot: "BallsDexBot"):
+        """
+        Resume the jobs interrupted by the last shutdown and start the workers.
+        """
+        if self.workers:
+            return
+        # the workers running these jobs are gone, run them again from the start
+        await Job.filter(status=JobStatus.RUNNING).update(status=JobStatus.PENDING, progress=0)
+        pending = Job.filter(status=JobStatus.PENDING).order_by("created_at")
+        for job_id in await pending.values_list("id", flat=True):
+            self.queue.put_nowait(job_id)
+        job_queue_size.set(self.queue.qsize())
+        if not self.queue.empty():
+            log.info(f"Resuming {self.queue.qsize()} background jobs")
+        self.workers = [
+            asyncio.create_task(self.worker(bot), name=f"job-worker-{i}")
+            for i in range(settings.job_workers)
+        ]
+
+    async def stop(self):
+        for task in self.workers:
+            task.cancel()
+        self.workers = []
+
+    async def worker(self, bot: "BallsDexBot"):
+        while True:
+            job_id = await self.queue.get()
+            job_queue_size.set(self.queue.qsize())
+            try:
+                await self.run(bot, job_id)
+            except Exception:
+                log.exception(f"Unexpected error while running job {job_id}")
+            finally:
+                self.interactions.pop(job_id, None)
+
+    async def run(self, bot: "BallsDexBot", job_id: int):
+        now = datetime.now(timezone.utc)
+        # only one worker may pick a job
+        if not await Job.filter(id=job_id, status=JobStatus.PENDING).update(
+            status=JobStatus.RUNNING, started_at=now
+        ):
+            return
+        job = await Job.get(id=job_id)
+        interaction = self.interactions.get(job_id)
+        if interaction is not None and interaction_expired(interaction):
+            interaction = None
+
+        handler = self.handlers.get(job.kind)
+        t1 = time.monotonic()
+        result: JobResult | None = None
+        error: str | None = None
+        try:
+            if handler is None:
+                raise JobError("This request is no longer supported.")
+            with track_queries(f"job.{job.kind}"):
+                result = await handler(JobContext(bot, job, interaction))
+        except JobError as e:
+            error = str(e)
+        except Exception:
+            log.exception(f"Job {job} failed")
+            error = "An error occurred while processing your request."
+
+        status = JobStatus.FAILED if result is None else JobStatus.DONE
+        job_duration.labels(kind=job.kind, status=status.name.lower()).observe(
+            time.monotonic() - t1
+        )
+        await Job.filter(id=job_id).update(
+            status=status,
+            progress=1 if result is not None else job.progress,
+            error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+        if result is None:
+            result = JobResult(f"Your request could not be completed: {error}")
+        try:
+            await self.deliver(bot, job, interaction, result)
+        finally:
+            for file in result.files:
+                file.close()
+
+    async def deliver(
+        self,
+        bot: "BallsDexBot",
+        job: Job,
+        interaction: discord.Interaction["BallsDexBot"] | None,
+        result: JobResult,
+    ):
+        if interaction is not None and interaction_expired(interaction):
+            interaction = None
+
+        if job.direct_message or interaction is None:
+            try:
+                user = bot.get_user(job.user_id) or await bot.fetch_user(job.user_id)
+                await user.send(result.content, files=result.files, embeds=result.embeds)
+            except discord.HTTPException:
+                log.info(f"Could not deliver job {job} in DMs", exc_info=True)
+            else:
+                if interaction is not None:
+                    await interaction.edit_original_response(
+                        content="Your request is done and has been sent via DMs."
+                    )
+                return
+            if interaction is None:
+                return
+            await interaction.edit_original_response(
+                content="I couldn't send the result to you in DM. "
+                "Either you blocked me or you disabled DMs in this server."
+            )
+            return
+
+        await interaction.edit_original_response(content="Your request is done.")
+        await interaction.followup.send(
+            result.content, files=result.files, embeds=result.embeds, ephemeral=True
+        )
+
+
+job_queue = JobQueue()
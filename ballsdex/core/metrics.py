@@ -16,6 +16,30 @@ log = logging.getLogger("ballsdex.core.metrics")
 caught_balls = Counter(
     "caught_cb", "Caught countryballs", ["country", "special", "guild_size", "spawn_algo"]
 )
+query_count_histogram = Histogram(
+    "db_queries",
+    "Number of database queries sent per command or task",
+    ["name"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf")),
+)
+query_time_histogram = Histogram(
+    "db_query_time", "Time spent in the database per command or task", ["name"]
+)
+autocomplete_latency = Histogram(
+    "autocomplete_latency", "Time taken to generate autocompletion results", ["name"]
+)
+autocomplete_skipped = Counter(
+    "autocomplete_skipped",
+    "Autocompletion requests cancelled by a newer keystroke or sharing a pending result",
+    ["name", "reason"],
+)
+job_duration = Histogram(
+    "job_duration",
+    "Time taken to run a background job, excluding the wait in the queue",
+    ["kind", "status"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, float("inf")),
+)
+job_queue_size = Gauge("job_queue_size", "Number of background jobs waiting for a worker")
 
 
 class PrometheusServer:
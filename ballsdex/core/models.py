@@ -1,22 +1,25 @@
 from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import IntEnum
 from io import BytesIO
-from typing import TYPE_CHECKING, Iterable, Tuple, Type
+from typing import TYPE_CHECKING, Any, Iterable, Tuple, Type
 
 import discord
 from discord.utils import format_dt
-from tortoise import exceptions, fields, models, signals, timezone, validators
-from tortoise.contrib.postgres.indexes import PostgreSQLIndex
+from tortoise import exceptions, fields, models, signals, validators
+from tortoise.contrib.postgres.fields import ArrayField
+from tortoise.contrib.postgres.indexes import GinIndex, PostgreSQLIndex
 from tortoise.expressions import Q
 
 from ballsdex.core.image_generator.image_gen import draw_card
+from ballsdex.core.utils.locks import lock_manager
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
     from tortoise.backends.base.client import BaseDBAsyncClient
+    from tortoise.queryset import QuerySet
 
 
 balls: dict[int, Ball] = {}
@@ -201,6 +204,7 @@ Ball.register_listener(signals.Signals.pre_save, lower_translations)
 
 class BallInstance(models.Model):
     ball_id: int
+    player_id: int
     special_id: int
     trade_player_id: int
 
@@ -242,7 +246,7 @@ class BallInstance(models.Model):
     def is_tradeable(self) -> bool:
         return (
             self.tradeable
-            and self.countryball.tradeable
+            and getattr(self.countryball, "tradeable", False)
             and getattr(self.specialcard, "tradeable", True)
         )
 
@@ -259,7 +263,9 @@ class BallInstance(models.Model):
     @property
     def special_card(self) -> str | None:
         if self.specialcard:
-            return self.specialcard.background or self.countryball.collection_card
+            return self.specialcard.background or getattr(
+                self.countryball, "collection_card", None
+            )
 
     @property
     def countryball(self) -> Ball:
@@ -274,7 +280,7 @@ class BallInstance(models.Model):
 
     def to_string(self, bot: discord.Client | None = None, is_trade: bool = False) -> str:
         emotes = ""
-        if bot and self.pk in bot.locked_balls and not is_trade:  # type: ignore
+        if not is_trade and lock_manager.is_locked(self.pk):
             emotes += "🔒"
         if self.favorite and not is_trade:
             emotes += settings.favorited_collectible_emoji
@@ -379,18 +385,186 @@ class BallInstance(models.Model):
 
         return content, discord.File(buffer, "card.png")
 
-    async def lock_for_trade(self):
-        self.locked = timezone.now()
-        await self.save(update_fields=("locked",))
+    async def lock_for_trade(self) -> bool:
+        """
+        Lock this instance for trade. Return `False` if it was already locked.
+
+        Use `lock_manager` directly when locking several instances at once.
+        """
+        if not await lock_manager.lock((self.pk,)):
+            return False
+        self.locked = lock_manager.locks[self.pk]
+        return True
 
     async def unlock(self):
+        await lock_manager.unlock((self.pk,))
         self.locked = None  # type: ignore
-        await self.save(update_fields=("locked",))
 
     async def is_locked(self):
-        await self.refresh_from_db(fields=("locked",))
-        self.locked
-        return self.locked is not None and (self.locked + timedelta(minutes=30)) > timezone.now()
+        return lock_manager.is_locked(self.pk)
+
+
+class BallInstanceView:
+    """
+    Read-only, lightweight representation of a `BallInstance`.
+
+    This only holds the columns needed for listing and selecting instances, without the
+    ORM bookkeeping or the `extra_data` JSON. Use this when loading large inventories that
+    are only displayed, and fetch the full model for anything that needs to be written.
+
+    Instances are loaded with `fetch`, which uses a single `values_list` query.
+    """
+
+    __slots__ = (
+        "id",
+        "ball_id",
+        "special_id",
+        "health_bonus",
+        "attack_bonus",
+        "favorite",
+        "tradeable",
+        "catch_date",
+        "locked",
+    )
+
+    id: int
+    ball_id: int
+    special_id: int | None
+    health_bonus: int
+    attack_bonus: int
+    favorite: bool
+    tradeable: bool
+    catch_date: datetime
+    locked: datetime | None
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    async def fetch(cls, queryset: "QuerySet[BallInstance]") -> list[BallInstanceView]:
+        """
+        Load the rows of a queryset as views. Filters, annotations and ordering of the
+        queryset are kept.
+
+        Parameters
+        ----------
+        queryset: QuerySet[BallInstance]
+            A queryset of ball instances, **without awaiting the result!**
+        """
+        return [cls(*row) for row in await queryset.values_list(*cls.__slots__)]
+
+    @classmethod
+    def from_summary(cls, item: list[Any]) -> BallInstanceView:
+        """
+        Build a view from an item of a trade summary, see `TradeSummary`. The columns missing
+        from the summary are not tracked and only set to neutral values.
+        """
+        return cls(*item, False, True, None, None)
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def countryball(self) -> Ball | None:
+        # trade summaries keep the IDs of deleted countryballs
+        return balls.get(self.ball_id)
+
+    @property
+    def specialcard(self) -> Special | None:
+        return specials.get(self.special_id) if self.special_id else None
+
+    # rendering helpers are shared with the full model so that both display the same way
+    is_tradeable = BallInstance.is_tradeable
+    attack = BallInstance.attack
+    health = BallInstance.health
+    special_card = BallInstance.special_card
+    to_string = BallInstance.to_string
+    special_emoji = BallInstance.special_emoji
+    description = BallInstance.description
+    __str__ = BallInstance.__str__
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (BallInstanceView, BallInstance)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+    def __repr__(self) -> str:
+        return f"<BallInstanceView {self.pk}>"
+
+
+class PlayerCollectionSummary(models.Model):
+    """
+    Number of instances owned per player, countryball and special.
+
+    This table is maintained by database triggers on every insert, delete or ownership change
+    of a `BallInstance`, it must never be written from the bot. If it gets out of sync, use
+    the `rebuild_collection_summary` command of the admin panel.
+    """
+
+    player_id: int
+    ball_id: int
+    special_id: int | None
+
+    player: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
+        "models.Player", related_name="collection_summary"
+    )
+    ball: fields.ForeignKeyRelation[Ball] = fields.ForeignKeyField(
+        "models.Ball", related_name="collection_summary"
+    )
+    special: fields.ForeignKeyRelation[Special] | None = fields.ForeignKeyField(
+        "models.Special", null=True, default=None
+    )
+    count = fields.IntField(default=0)
+
+    class Meta:
+        table = "player_collection_summary"
+
+    @classmethod
+    async def total(cls, using_db: BaseDBAsyncClient | None = None, **filters) -> int:
+        """
+        Return the number of instances matching the given filters. This is equivalent to
+        `BallInstance.filter(**filters).count()` for filters on the player, ball and special.
+        """
+        query = cls.filter(**filters).using_db(using_db)
+        return sum(await query.values_list("count", flat=True))
+
+    @classmethod
+    async def owned_ball_ids(
+        cls, using_db: BaseDBAsyncClient | None = None, **filters
+    ) -> set[int]:
+        """
+        Return the IDs of the countryballs owned matching the given filters.
+        """
+        query = cls.filter(**filters).using_db(using_db).distinct()
+        return set(await query.values_list("ball_id", flat=True))
+
+
+class BallInstanceCounter(models.Model):
+    """
+    Total number of instances per countryball and special, across all players.
+
+    Like `PlayerCollectionSummary`, this is maintained by database triggers and must not be
+    written from the bot. Prefer reading it through `ballsdex.core.utils.counters`.
+    """
+
+    ball_id: int
+    special_id: int | None
+
+    ball: fields.ForeignKeyRelation[Ball] = fields.ForeignKeyField(
+        "models.Ball", related_name="counters"
+    )
+    special: fields.ForeignKeyRelation[Special] | None = fields.ForeignKeyField(
+        "models.Special", null=True, default=None
+    )
+    count = fields.BigIntField(default=0)
+
+    class Meta:
+        table = "ballinstance_counter"
 
 
 class DonationPolicy(IntEnum):
@@ -502,7 +676,64 @@ class BlacklistHistory(models.Model):
     action_type = fields.CharField(max_length=64, default="blacklist")
 
 
-class Trade(models.Model):
+class TradeSummary(models.Model):
+    """
+    Denormalized contents of a trade, written once when the trade is settled so that the
+    history can be filtered and displayed without reading the trade objects.
+
+    Attributes
+    ----------
+    summary: dict[str, list[list[int | None]]]
+        Instances given by `player1` and `player2`, as lists of
+        `[id, ball_id, special_id, health_bonus, attack_bonus]`.
+    ball_ids: list[int]
+        IDs of the countryballs traded, for filtering.
+    special_ids: list[int]
+        IDs of the specials traded, for filtering.
+    """
+
+    summary = fields.JSONField(description="Instances given by each player", default={})
+    ball_ids = ArrayField("int", description="Countryballs traded", default=[])
+    special_ids = ArrayField("int", description="Specials traded", default=[])
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def summarize(
+        proposal1: Iterable[BallInstance], proposal2: Iterable[BallInstance]
+    ) -> dict[str, Any]:
+        """
+        Build the summary columns of a trade from the instances given by each player, to pass
+        when creating the trade.
+        """
+        items = {
+            key: [
+                [x.pk, x.ball_id, x.special_id, x.health_bonus, x.attack_bonus] for x in proposal
+            ]
+            for key, proposal in (("player1", proposal1), ("player2", proposal2))
+        }
+        traded = items["player1"] + items["player2"]
+        return {
+            "summary": items,
+            "ball_ids": sorted({x[1] for x in traded}),
+            "special_ids": sorted({x[2] for x in traded if x[2] is not None}),
+        }
+
+    def proposal(self, player: Player) -> list[BallInstanceView]:
+        """
+        Instances given by one of the players of the trade, read from the summary.
+        """
+        key = "player1" if player.pk == self.player1_id else "player2"  # type: ignore
+        return [BallInstanceView.from_summary(x) for x in self.summary.get(key, [])]
+
+
+class Trade(TradeSummary):
+    """
+    Concluded trade. The table is partitioned by month on `date`, old months are moved to
+    `TradeArchive`.
+    """
+
     id: int
     player1: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
         "models.Player", related_name="trades"
@@ -518,17 +749,25 @@ class Trade(models.Model):
 
     class Meta:
         indexes = [
-            PostgreSQLIndex(fields=("player1_id",)),
-            PostgreSQLIndex(fields=("player2_id",)),
+            PostgreSQLIndex(fields=("player1_id", "date")),
+            PostgreSQLIndex(fields=("player2_id", "date")),
+            GinIndex(fields=("ball_ids",)),
+            GinIndex(fields=("special_ids",)),
         ]
 
 
 class TradeObject(models.Model):
+    """
+    Instance given in a trade. The table is partitioned by month on `trade_date`, which must
+    always be the date of the trade.
+    """
+
     trade_id: int
 
     trade: fields.ForeignKeyRelation[Trade] = fields.ForeignKeyField(
-        "models.Trade", related_name="tradeobjects"
+        "models.Trade", related_name="tradeobjects", db_constraint=False
     )
+    trade_date = fields.DatetimeField(description="Date of the trade, partition key of the table")
     ballinstance: fields.ForeignKeyRelation[BallInstance] = fields.ForeignKeyField(
         "models.BallInstance", related_name="tradeobjects"
     )
@@ -547,6 +786,54 @@ class TradeObject(models.Model):
         ]
 
 
+class TradeArchive(TradeSummary):
+    """
+    Trade of a month archived out of the `trade` table by the partition maintenance. Only read
+    when the archives are explicitly requested.
+    """
+
+    id: int
+    player1: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
+        "models.Player", related_name=False, db_constraint=False
+    )
+    player2: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
+        "models.Player", related_name=False, db_constraint=False
+    )
+    date = fields.DatetimeField()
+    tradeobjects: fields.ReverseRelation[TradeObjectArchive]
+
+    def __str__(self) -> str:
+        return str(self.pk)
+
+    class Meta:
+        table = "trade_archive"
+
+
+class TradeObjectArchive(models.Model):
+    """
+    Instance given in an archived trade, see `TradeArchive`.
+    """
+
+    trade_id: int
+
+    trade: fields.ForeignKeyRelation[TradeArchive] = fields.ForeignKeyField(
+        "models.TradeArchive", related_name="tradeobjects", db_constraint=False
+    )
+    trade_date = fields.DatetimeField()
+    ballinstance: fields.ForeignKeyRelation[BallInstance] = fields.ForeignKeyField(
+        "models.BallInstance", related_name=False, db_constraint=False
+    )
+    player: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
+        "models.Player", related_name=False, db_constraint=False
+    )
+
+    def __str__(self) -> str:
+        return str(self.pk)
+
+    class Meta:
+        table = "tradeobject_archive"
+
+
 class Friendship(models.Model):
     id: int
     player1: fields.ForeignKeyRelation[Player] = fields.ForeignKeyField(
@@ -573,3 +860,36 @@ class Block(models.Model):
 
     def __str__(self) -> str:
         return str(self.pk)
+
+
+class JobStatus(IntEnum):
+    PENDING = 1
+    RUNNING = 2
+    DONE = 3
+    FAILED = 4
+
+
+class Job(models.Model):
+    """
+    Background job queued by a user, run by `ballsdex.core.jobs`.
+    """
+
+    id: int
+    kind = fields.CharField(max_length=64, description="Name of the job handler")
+    user_id = fields.BigIntField(description="Discord ID of the user who queued the job")
+    payload = fields.JSONField(description="Arguments of the job", default={})
+    direct_message = fields.BooleanField(
+        description="Deliver the result in DMs instead of a followup", default=False
+    )
+    status = fields.IntEnumField(JobStatus, default=JobStatus.PENDING)
+    progress = fields.FloatField(description="Progress between 0 and 1", default=0)
+    error = fields.TextField(null=True, default=None)
+    created_at = fields.DatetimeField(auto_now_add=True)
+    started_at = fields.DatetimeField(null=True, default=None)
+    finished_at = fields.DatetimeField(null=True, default=None)
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk}"
+
+    class Meta:
+        table = "job"
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, NamedTuple
+
+import discord
+from discord import app_commands
+
+from ballsdex.core.metrics import autocomplete_latency, autocomplete_skipped
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+
+log = logging.getLogger("ballsdex.core.utils.autocomplete")
+
+__all__ = ("AutocompleteDispatcher", "autocomplete_dispatcher")
+
+Choices = list[app_commands.Choice[Any]]
+Key = tuple[int, str, str]
+
+
+class Pending(NamedTuple):
+    value: str
+    task: asyncio.Task[Choices]
+
+
+def focused_option(options: list[dict[str, Any]]) -> str | None:
+    """
+    Find the name of the focused option in the raw options of an autocomplete interaction.
+    """
+    for option in options:
+        if option.get("focused"):
+            return option["name"]
+        if "options" in option and (name := focused_option(option["options"])):
+            return name
+    return None
+
+
+class AutocompleteDispatcher:
+    """
+    Run autocompletion requests, dropping the ones superseded by a newer keystroke.
+
+    Requests are keyed by user, command and focused option. When a new request arrives for a
+    key that still has one in flight, the previous request is cancelled, unless it is searching
+    the exact same value, in which case both share the same result.
+    """
+
+    def __init__(self):
+        self.pending: dict[Key, Pending] = {}
+
+    @staticmethod
+    def key(interaction: discord.Interaction["BallsDexBot"]) -> Key:
+        command = interaction.command.qualified_name if interaction.command else ""
+        option = focused_option(interaction.data.get("options", [])) if interaction.data else None
+        return (interaction.user.id, command, option or "")
+
+    def _cleanup(self, key: Key, task: asyncio.Task[Choices]):
+        pending = self.pending.get(key)
+        if pending is not None and pending.task is task:
+            del self.pending[key]
+
+    async def _wait(self, task: asyncio.Task[Choices], name: str) -> Choices:
+        try:
+            # shielded so that a waiter going away does not cancel a shared task
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # the waiter itself was cancelled
+            autocomplete_skipped.labels(name=name, reason="superseded").inc()
+            # Discord already discarded this request, there is nothing useful to send
+            return []
+
+    async def dispatch(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        value: str,
+        name: str,
+        callback: Callable[[], Awaitable[Choices]],
+    ) -> Choices:
+        """
+        Run an autocompletion request through the dispatcher.
+
+        Parameters
+        ----------
+        interaction: discord.Interaction
+            The autocomplete interaction.
+        value: str
+            The value currently typed by the user.
+        name: str
+            Name of the autocompletion, used as a label for the metrics.
+        callback: Callable[[], Awaitable[list[app_commands.Choice]]]
+            Function generating the choices.
+        """
+        key = self.key(interaction)
+        loop = asyncio.get_running_loop()
+        t1 = loop.time()
+
+        pending = self.pending.get(key)
+        if pending is not None and not pending.task.done():
+            if pending.value == value:
+                autocomplete_skipped.labels(name=name, reason="shared").inc()
+                return await self._wait(pending.task, name)
+            pending.task.cancel()
+
+        task = asyncio.create_task(callback())
+        self.pending[key] = Pending(value, task)
+        task.add_done_callback(lambda t: self._cleanup(key, t))
+        choices = await self._wait(task, name)
+        if not task.cancelled():
+            autocomplete_latency.labels(name=name).observe(loop.time() - t1)
+        return choices
+
+
+autocomplete_dispatcher = AutocompleteDispatcher()
@@ -0,0 +1,213 @@
+import logging
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Type
+
+from cachetools import LRUCache, TTLCache
+from tortoise import signals
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from ballsdex.core.models import BallInstance, PlayerCollectionSummary, Special, balls
+from ballsdex.core.utils.name_index import catalog_version
+from ballsdex.core.utils.replica import replica_read, replica_router
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+
+log = logging.getLogger("ballsdex.core.utils.completion")
+
+__all__ = ("Catalog", "get_catalog", "CompletionCache", "completion_cache")
+
+# maximum length of an embed field value
+FIELD_LIMIT = 1024
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """
+    Yield the position of each set bit, lowest first.
+    """
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class Catalog:
+    """
+    Snapshot of the countryballs catalog, mapping each ball to a bit position so that sets of
+    balls can be stored and compared as integer bitmaps.
+
+    A new snapshot is built every time the catalog version changes, bitmaps built from
+    different snapshots must never be mixed.
+
+    Attributes
+    ----------
+    version: int
+        Catalog version of this snapshot.
+    ball_ids: list[int]
+        Ball IDs, in the order of their bit position.
+    enabled: int
+        Bitmap of the enabled countryballs.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.ball_ids = sorted(balls)
+        self.positions = {x: i for i, x in enumerate(self.ball_ids)}
+        self.enabled = self.bitmap(x for x, y in balls.items() if y.enabled)
+        self.special_masks: dict[int, int] = {}
+        self.emojis: list[str | None] | None = None
+        self.field_cache: LRUCache[tuple[str, int], list[tuple[str, str]]] = LRUCache(256)
+
+    def bitmap(self, ball_ids: Iterable[int]) -> int:
+        """
+        Build the bitmap of the given ball IDs, ignoring the ones unknown to this snapshot.
+        """
+        bitmap = 0
+        for ball_id in ball_ids:
+            if (position := self.positions.get(ball_id)) is not None:
+                bitmap |= 1 << position
+        return bitmap
+
+    def mask(self, special: Special | None = None) -> int:
+        """
+        Bitmap of the countryballs counting towards completion: enabled, and created before
+        the end of the special event if given.
+        """
+        if special is None or special.end_date is None:
+            return self.enabled
+        if (mask := self.special_masks.get(special.pk)) is None:
+            mask = self.special_masks[special.pk] = self.enabled & self.bitmap(
+                x for x, y in balls.items() if y.created_at < special.end_date
+            )
+        return mask
+
+    def fields(self, bot: "BallsDexBot", title: str, bitmap: int) -> list[tuple[str, str]]:
+        """
+        Render the emojis of the countryballs of a bitmap as embed fields, split to fit the
+        embed limits. Only the first field is titled. The result is cached.
+        """
+        key = (title, bitmap)
+        if (fields := self.field_cache.get(key)) is not None:
+            return fields
+
+        if self.emojis is None:
+            self.emojis = []
+            for ball_id in self.ball_ids:
+                emoji = bot.get_emoji(balls[ball_id].emoji_id)
+                self.emojis.append(f"{emoji} " if emoji else None)
+
+        fields = []
+        buffer = ""
+        for position in iter_bits(bitmap):
+            if (text := self.emojis[position]) is None:
+                continue
+            if len(buffer) + len(text) > FIELD_LIMIT:
+                # hitting embed limits, adding an intermediate field
+                fields.append(("\u200B" if fields else f"__**{title}**__", buffer))
+                buffer = ""
+            buffer += text
+        if buffer:  # add what's remaining
+            fields.append(("\u200B" if fields else f"__**{title}**__", buffer))
+
+        self.field_cache[key] = fields
+        return fields
+
+
+_catalog: Catalog | None = None
+
+
+def get_catalog() -> Catalog:
+    """
+    Return the snapshot of the current catalog, building it if the catalog changed.
+    """
+    global _catalog
+    version = catalog_version()
+    if _catalog is None or _catalog.version != version:
+        _catalog = Catalog(version)
+        log.debug(f"Built completion catalog with {len(_catalog.ball_ids)} balls")
+    return _catalog
+
+
+class CompletionCache:
+    """
+    Per-user cache of owned countryballs as bitmaps of the current catalog, for completion.
+
+    Bitmaps expire after `ttl` seconds, and are invalidated as soon as one of the user's
+    instances is created, saved or deleted through the ORM. Bitmaps of players changed in the
+    last `replica_router.max_lag` seconds are read from the primary, the replica may not have
+    these changes yet.
+
+    Attributes
+    ----------
+    ttl: float
+        Delay in seconds for a bitmap to live, defaults to 300
+    maxsize: int
+        Maximum number of bitmaps kept in memory, defaults to 5000
+    """
+
+    ttl: float = 300
+    maxsize: int = 5000
+
+    def __init__(self):
+        # keyed by catalog version, discord ID and special ID
+        self.bitmaps: TTLCache[tuple[int, int, int | None], int] = TTLCache(self.maxsize, self.ttl)
+        self.discord_ids: TTLCache[int, int] = TTLCache(self.maxsize, self.ttl)
+        # time of the last invalidation of each player, while the replica may lag behind
+        self.changes: TTLCache[int, float] = TTLCache(self.maxsize, replica_router.max_lag)
+
+    async def owned(self, discord_id: int, special: Special | None = None) -> int:
+        """
+        Return the bitmap of the countryballs owned by a user, optionally only counting
+        instances of the given special. Disabled balls are included, mask them with
+        `Catalog.mask`.
+        """
+        catalog = get_catalog()
+        key = (catalog.version, discord_id, special.pk if special else None)
+        if (bitmap := self.bitmaps.get(key)) is not None:
+            return bitmap
+
+        filters = {"player__discord_id": discord_id, "count__gt": 0}
+        if special:
+            filters["special_id"] = special.pk
+        queryset = PlayerCollectionSummary.filter(**filters).distinct()
+
+        async def read(db: BaseDBAsyncClient) -> list[tuple[int, int]]:
+            return await queryset.using_db(db).values_list("player_id", "ball_id")
+
+        started = time.monotonic()
+        rows = await replica_read(read)
+        if rows and rows[0][0] in self.changes:
+            # the replica may not have the last changes of the player yet
+            started = time.monotonic()
+            rows = await replica_read(read, primary=True)
+        bitmap = catalog.bitmap(x[1] for x in rows)
+        # without rows, the player ID is unknown and the bitmap could not be invalidated
+        if rows:
+            player_id = rows[0][0]
+            self.discord_ids[player_id] = discord_id
+            # skip caching if the player changed during the read
+            if self.changes.get(player_id, started) <= started:
+                self.bitmaps[key] = bitmap
+        return bitmap
+
+    def invalidate_player(self, player_id: int | None):
+        if player_id is None:
+            return
+        self.changes[player_id] = time.monotonic()
+        if (discord_id := self.discord_ids.get(player_id)) is None:
+            return
+        for key in [x for x in self.bitmaps.keys() if x[1] == discord_id]:
+            self.bitmaps.pop(key, None)
+
+
+completion_cache = CompletionCache()
+
+
+async def _invalidate_instance(model: Type[BallInstance], instance: BallInstance, *args):
+    # the previous owner is the trade player after a trade or a donation
+    completion_cache.invalidate_player(instance.player_id)
+    completion_cache.invalidate_player(instance.trade_player_id)
+
+
+BallInstance.register_listener(signals.Signals.post_save, _invalidate_instance)
+BallInstance.register_listener(signals.Signals.post_delete, _invalidate_instance)
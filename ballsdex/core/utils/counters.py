@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from ballsdex.core.models import Ball, BallInstanceCounter, Regime, Special, balls
+
+log = logging.getLogger("ballsdex.core.utils.counters")
+
+__all__ = ("InstanceCounters", "instance_counters")
+
+
+class InstanceCounters:
+    """
+    In-memory mirror of the `ballinstance_counter` table, giving the global number of instances
+    per countryball and special without counting rows of `ballinstance`.
+
+    The table itself is kept exact by database triggers, this mirror is reloaded from it at most
+    every `ttl` seconds, which is cheap since it only has one row per ball/special pair.
+
+    Attributes
+    ----------
+    ttl: float
+        Delay in seconds before the counters are reloaded from the database, defaults to 30
+    """
+
+    ttl: float = 30
+
+    def __init__(self):
+        self.counts: dict[tuple[int, int | None], int] = {}
+        self.per_ball: dict[int, int] = {}
+        self.per_special: dict[int | None, int] = {}
+        self.last_refresh: float = 0
+        self.lock = asyncio.Lock()
+
+    async def refresh(self):
+        """
+        Reload all counters from the database.
+        """
+        counts: dict[tuple[int, int | None], int] = {}
+        per_ball: dict[int, int] = defaultdict(int)
+        per_special: dict[int | None, int] = defaultdict(int)
+        for ball_id, special_id, count in await BallInstanceCounter.filter(
+            count__gt=0
+        ).values_list("ball_id", "special_id", "count"):
+            counts[(ball_id, special_id)] = count
+            per_ball[ball_id] += count
+            per_special[special_id] += count
+        self.counts = counts
+        self.per_ball = dict(per_ball)
+        self.per_special = dict(per_special)
+        self.last_refresh = time.time()
+        log.debug(f"Loaded {len(counts)} instance counters")
+
+    async def maybe_refresh(self):
+        if time.time() - self.last_refresh <= self.ttl:
+            return
+        async with self.lock:
+            # another task may have refreshed while we were waiting for the lock
+            if time.time() - self.last_refresh > self.ttl:
+                await self.refresh()
+
+    async def count(
+        self,
+        *,
+        ball: Ball | None = None,
+        special: Special | None = None,
+        regime: Regime | None = None,
+    ) -> int:
+        """
+        Return the global number of instances matching the given filters. Omitted filters
+        match everything.
+
+        Parameters
+        ----------
+        ball: Ball | None
+            Only count instances of this countryball.
+        special: Special | None
+            Only count instances with this special event.
+        regime: Regime | None
+            Only count instances of countryballs with this regime.
+
+        Returns
+        -------
+        int
+            Number of instances, as of the last refresh.
+        """
+        await self.maybe_refresh()
+        if ball is not None and special is not None:
+            if regime is not None and ball.regime_id != regime.pk:
+                return 0
+            return self.counts.get((ball.pk, special.pk), 0)
+        if ball is not None:
+            if regime is not None and ball.regime_id != regime.pk:
+                return 0
+            return self.per_ball.get(ball.pk, 0)
+        if regime is not None:
+            return sum(
+                count
+                for (ball_id, special_id), count in self.counts.items()
+                if (special is None or special_id == special.pk)
+                and (b := balls.get(ball_id)) is not None
+                and b.regime_id == regime.pk
+            )
+        if special is not None:
+            return self.per_special.get(special.pk, 0)
+        return sum(self.per_ball.values())
+
+    async def ball_ids(self, *, special: Special | None = None) -> set[int]:
+        """
+        Return the IDs of all countryballs having at least one instance, optionally restricted
+        to a special event.
+        """
+        await self.maybe_refresh()
+        if special is None:
+            return set(self.per_ball.keys())
+        return {ball_id for ball_id, special_id in self.counts if special_id == special.pk}
+
+
+instance_counters = InstanceCounters()
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import time
+from typing import Iterable, Type
+
+from cachetools import TTLCache
+from tortoise import signals
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from ballsdex.core.models import BallInstance, BallInstanceView, Player, balls
+from ballsdex.core.utils.locks import LOCK_DURATION
+from ballsdex.core.utils.replica import replica_read, replica_router
+
+log = logging.getLogger("ballsdex.core.utils.inventory_index")
+
+__all__ = ("UserInventory", "InventoryIndex", "inventory_index", "search_database")
+
+# prefix matches on the country first, then closest names, using the trigram index on ball
+SEARCH_QUERY = """
+SELECT {columns} FROM ballinstance i
+JOIN player p ON p.id = i.player_id
+JOIN ball b ON b.id = i.ball_id
+WHERE p.discord_id = $1 AND ($2::bigint IS NULL OR i.special_id = $2) AND {condition}
+ORDER BY lower(b.country) LIKE $4 DESC, similarity(b.search_text, $5) DESC, i.id
+LIMIT $6
+"""
+SEARCH_CONDITION = "b.search_text LIKE $3"
+# IDs are matched by a separate query, an OR with the search text prevents using its index
+ID_CONDITION = "i.id = $3"
+EXACT_CONDITION = "lower(b.country) = $3"
+UNLOCKED_CONDITION = " AND (i.locked IS NULL OR i.locked < now() - $7::interval)"
+LOCKED_CONDITION = " AND i.locked >= now() - $7::interval"
+
+
+class UserInventory:
+    """
+    Searchable snapshot of a player's inventory.
+
+    Attributes
+    ----------
+    player_id: int | None
+        Primary key of the player, `None` if the user is not registered.
+    instances: list[BallInstanceView]
+        All the instances owned by the player.
+    search_texts: list[str]
+        Lowercase text matched against the search for each instance, in the same order as
+        `instances`.
+    """
+
+    __slots__ = ("player_id", "instances", "search_texts", "last_search", "last_results")
+
+    def __init__(self, player_id: int | None, instances: list[BallInstanceView]):
+        self.player_id = player_id
+        self.instances = instances
+        self.search_texts: list[str] = []
+        ball_texts: dict[int, str] = {}
+        for instance in instances:
+            if (text := ball_texts.get(instance.ball_id)) is None:
+                text = ball_texts[instance.ball_id] = self.ball_search_text(instance.ball_id)
+            self.search_texts.append(f"{instance.pk:x} {text}")
+
+        # results of the previous search, narrowed down when the next one extends it
+        self.last_search: tuple[int | None, str] | None = None
+        self.last_results: list[int] = []
+
+    @staticmethod
+    def ball_search_text(ball_id: int) -> str:
+        ball = balls.get(ball_id)
+        if ball is None:
+            return ""
+        return f"{ball.country} {ball.catch_names or ''} {ball.translations or ''}".lower()
+
+    def search(self, value: str, *, special_id: int | None = None) -> list[BallInstanceView]:
+        """
+        Return all the instances matching the search, optionally filtered by special.
+
+        A value starting with `=` matches the exact country name, otherwise the value is
+        searched in the ID, country name, catch names and translations of each instance.
+        """
+        value = value.lower()
+        if value.startswith("="):
+            country = value[1:]
+            return [
+                x
+                for x in self.instances
+                if (special_id is None or x.special_id == special_id)
+                and (ball := balls.get(x.ball_id)) is not None
+                and ball.country.lower() == country
+            ]
+
+        value = value.replace(".", "")
+        indexes: Iterable[int]
+        if (
+            self.last_search is not None
+            and self.last_search[0] == special_id
+            and value.startswith(self.last_search[1])
+        ):
+            # the user kept typing, only the previous matches can still match
+            indexes = self.last_results
+        else:
+            indexes = range(len(self.instances))
+        results = [
+            i
+            for i in indexes
+            if value in self.search_texts[i]
+            and (special_id is None or self.instances[i].special_id == special_id)
+        ]
+        self.last_search = (special_id, value)
+        self.last_results = results
+        return [self.instances[i] for i in results]
+
+
+class InventoryIndex:
+    """
+    Per-user cache of searchable inventories, used by the instance autocompletion.
+
+    Inventories expire after `ttl` seconds, and are invalidated as soon as one of their
+    instances is created, saved or deleted through the ORM (catches, trades, donations...).
+    Inventories of players changed in the last `replica_router.max_lag` seconds are read from
+    the primary, the replica may not have these changes yet. Users without a player are not
+    cached.
+
+    Attributes
+    ----------
+    ttl: float
+        Delay in seconds for an inventory to live, defaults to 60
+    maxsize: int
+        Maximum number of inventories kept in memory, defaults to 1000
+    """
+
+    ttl: float = 60
+    maxsize: int = 1000
+
+    def __init__(self):
+        self.inventories: TTLCache[int, UserInventory] = TTLCache(self.maxsize, self.ttl)
+        self.discord_ids: TTLCache[int, int] = TTLCache(self.maxsize, self.ttl)
+        self.loading: dict[int, asyncio.Task[UserInventory]] = {}
+        # bumped on each invalidation, loads started before are not cached
+        self.generations: TTLCache[int, int] = TTLCache(self.maxsize, self.ttl)
+        # time of the last invalidation of each player, while the replica may lag behind
+        self.changes: TTLCache[int, float] = TTLCache(self.maxsize, replica_router.max_lag)
+
+    async def load(self, discord_id: int) -> UserInventory:
+        inventory = await replica_read(lambda db: self.read(db, discord_id))
+        if inventory.player_id in self.changes:
+            # the replica may not have the last changes of the player yet
+            inventory = await replica_read(lambda db: self.read(db, discord_id), primary=True)
+        return inventory
+
+    async def read(self, db: BaseDBAsyncClient, discord_id: int) -> UserInventory:
+        player_ids = (
+            await Player.filter(discord_id=discord_id).using_db(db).values_list("id", flat=True)
+        )
+        if not player_ids:
+            return UserInventory(None, [])
+        player_id = player_ids[0]
+        instances = await BallInstanceView.fetch(
+            BallInstance.filter(player_id=player_id).order_by("id").using_db(db)
+        )
+        self.discord_ids[player_id] = discord_id
+        return UserInventory(player_id, instances)
+
+    async def get(self, discord_id: int) -> UserInventory:
+        """
+        Return the inventory of a user, loading it if needed.
+        """
+        if (inventory := self.inventories.get(discord_id)) is not None:
+            return inventory
+        generation = self.generations.get(discord_id, 0)
+        # concurrent keystrokes share the same load
+        if (task := self.loading.get(discord_id)) is None:
+            task = self.loading[discord_id] = asyncio.create_task(self.load(discord_id))
+            task.add_done_callback(lambda x: self.loaded(discord_id, x))
+        inventory = await asyncio.shield(task)
+        # an unregistered user cannot be invalidated when their player is created
+        if inventory.player_id is not None and self.generations.get(discord_id, 0) == generation:
+            self.inventories[discord_id] = inventory
+        return inventory
+
+    def loaded(self, discord_id: int, task: asyncio.Task[UserInventory]):
+        if self.loading.get(discord_id) is task:
+            del self.loading[discord_id]
+
+    def invalidate(self, discord_id: int):
+        self.inventories.pop(discord_id, None)
+        self.generations[discord_id] = self.generations.get(discord_id, 0) + 1
+        # the ongoing load may miss the change, the next lookup starts a new one
+        self.loading.pop(discord_id, None)
+
+    def invalidate_player(self, player_id: int | None):
+        if player_id is None:
+            return
+        self.changes[player_id] = time.monotonic()
+        if discord_id := self.discord_ids.get(player_id):
+            self.invalidate(discord_id)
+
+
+inventory_index = InventoryIndex()
+
+
+async def _invalidate_instance(model: Type[BallInstance], instance: BallInstance, *args):
+    # the previous owner is the trade player after a trade or a donation
+    inventory_index.invalidate_player(instance.player_id)
+    inventory_index.invalidate_player(instance.trade_player_id)
+
+
+BallInstance.register_listener(signals.Signals.post_save, _invalidate_instance)
+BallInstance.register_listener(signals.Signals.post_delete, _invalidate_instance)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_database(
+    discord_id: int,
+    value: str,
+    *,
+    special_id: int | None = None,
+    locked: bool | None = None,
+    limit: int = 25,
+) -> list[BallInstanceView]:
+    """
+    Search a user's inventory in the database, without loading it in memory.
+
+    This is the same search as `UserInventory.search`, ranked with country prefix matches
+    first, then by trigram similarity. It is served by the trigram index on `ball.search_text`
+    and the `(player_id, ball_id)` index on `ballinstance`. A value that is a hexadecimal ID
+    also matches that exact instance, listed first.
+
+    Parameters
+    ----------
+    discord_id: int
+        Discord ID of the user owning the instances.
+    value: str
+        The search, starting with `=` for an exact country name.
+    special_id: int | None
+        Only return instances of this special.
+    locked: bool | None
+        If set, only return instances that are locked (`True`) or not locked (`False`).
+    limit: int
+        Maximum number of results.
+    """
+    value = value.lower()
+    pk: int | None = None
+    if value.startswith("="):
+        value = value[1:]
+        condition = EXACT_CONDITION
+        pattern = value
+    else:
+        value = value.replace(".", "")
+        condition = SEARCH_CONDITION
+        pattern = f"%{_escape_like(value)}%"
+        try:
+            pk = int(value, 16)
+        except ValueError:
+            pass
+    lock_condition = ""
+    if locked is True:
+        lock_condition = LOCKED_CONDITION
+    elif locked is False:
+        lock_condition = UNLOCKED_CONDITION
+    columns = ", ".join(f"i.{x}" for x in BallInstanceView.__slots__)
+    params = [discord_id, special_id, pattern, f"{_escape_like(value)}%", value, limit]
+    if locked is not None:
+        params.append(LOCK_DURATION)
+
+    async def search(db: BaseDBAsyncClient) -> list[BallInstanceView]:
+        results: list[BallInstanceView] = []
+        # bigint bounds of the primary key
+        if pk is not None and pk < 2**63:
+            query = SEARCH_QUERY.format(columns=columns, condition=ID_CONDITION + lock_condition)
+            _, rows = await db.execute_query(query, [discord_id, special_id, pk, *params[3:]])
+            results.extend(BallInstanceView(*row) for row in rows)
+        query = SEARCH_QUERY.format(columns=columns, condition=condition + lock_condition)
+        _, rows = await db.execute_query(query, params)
+        results.extend(x for row in rows if (x := BallInstanceView(*row)).id != pk)
+        return results[:limit]
+
+    return await replica_read(search)
@@ -0,0 +1,107 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from tortoise import Tortoise
+
+log = logging.getLogger("ballsdex.core.utils.locks")
+
+__all__ = ("LockManager", "lock_manager")
+
+LOCK_DURATION = timedelta(minutes=30)
+
+
+class LockManager:
+    """
+    Lock and unlock countryball instances for trading in bulk.
+
+    Locking is done with a single conditional `UPDATE` per call, so only instances that are not
+    already locked (or whose lock expired) are acquired. The manager also keeps an in-memory view
+    of the locks held by this process, which is what rendering and pre-checks should read
+    instead of querying the database.
+
+    Attributes
+    ----------
+    locks: dict[int, datetime]
+        Mapping of locked instance IDs to the time they were locked at.
+    """
+
+    def __init__(self):
+        self.locks: dict[int, datetime] = {}
+
+    def is_locked(self, pk: int) -> bool:
+        """
+        Return whether the given instance is currently locked, without querying the database.
+        """
+        locked_at = self.locks.get(pk)
+        if locked_at is None:
+            return False
+        if locked_at + LOCK_DURATION <= datetime.now(timezone.utc):
+            del self.locks[pk]
+            return False
+        return True
+
+    async def load(self):
+        """
+        Load the locks currently active in the database, typically on startup.
+        """
+        connection = Tortoise.get_connection("default")
+        _, rows = await connection.execute_query(
+            "SELECT id, locked FROM ballinstance "
+            "WHERE locked IS NOT NULL AND locked > now() - $1::interval",
+            [LOCK_DURATION],
+        )
+        self.locks = {row["id"]: row["locked"] for row in rows}
+        log.debug(f"Loaded {len(self.locks)} instance locks")
+
+    async def lock(self, pks: Iterable[int]) -> set[int]:
+        """
+        Lock the given instances for trade.
+
+        Parameters
+        ----------
+        pks: Iterable[int]
+            IDs of the instances to lock.
+
+        Returns
+        -------
+        set[int]
+            IDs of the instances that were locked. Instances already locked are left out.
+        """
+        pks = list(set(pks))
+        if not pks:
+            return set()
+        connection = Tortoise.get_connection("default")
+        _, rows = await connection.execute_query(
+            "UPDATE ballinstance SET locked = now() WHERE id = ANY($1) "
+            "AND (locked IS NULL OR locked < now() - $2::interval) RETURNING id, locked",
+            [pks, LOCK_DURATION],
+        )
+        for row in rows:
+            self.locks[row["id"]] = row["locked"]
+        return {row["id"] for row in rows}
+
+    def forget(self, pks: Iterable[int]):
+        """
+        Drop the given instances from the in-memory view, after their lock was already cleared
+        in the database by another query.
+        """
+        for pk in pks:
+            self.locks.pop(pk, None)
+
+    async def unlock(self, pks: Iterable[int]):
+        """
+        Release the lock on the given instances.
+        """
+        pks = list(set(pks))
+        if not pks:
+            return
+        self.forget(pks)
+        connection = Tortoise.get_connection("default")
+        await connection.execute_query(
+            "UPDATE ballinstance SET locked = NULL WHERE id = ANY($1) AND locked IS NOT NULL",
+            [pks],
+        )
+
+
+lock_manager = LockManager()
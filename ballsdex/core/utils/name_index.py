@@ -0,0 +1,105 @@
+import bisect
+from typing import Generic, Iterable, TypeVar
+
+__all__ = ("NameIndex", "catalog_changed", "catalog_version")
+
+T = TypeVar("T")
+
+# incremented every time the bot reloads its cache of balls, regimes, economies and specials
+_catalog_version = 0
+
+
+def catalog_version() -> int:
+    return _catalog_version
+
+
+def catalog_changed():
+    """
+    Signal that the cached catalog was reloaded, so that name indexes are checked for changes.
+    """
+    global _catalog_version
+    _catalog_version += 1
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex(Generic[T]):
+    """
+    Search index over the names of a small catalog of items, for autocompletion.
+
+    Names are kept in a sorted array to find prefix matches with a binary search, and in a
+    trigram map to find substring matches without scanning every name. Results are ranked
+    with prefix matches first, then matches at the start of a word, then other matches.
+
+    Use `NameIndex.shared` to get an index, it is only rebuilt when the items or their names
+    change, and shared by all transformers of the same kind.
+    """
+
+    _shared: dict[str, tuple[tuple[tuple[int, str], ...], "NameIndex"]] = {}
+
+    def __init__(self, items: Iterable[tuple[str, T]]):
+        entries = sorted(((name.lower(), name, item) for name, item in items), key=lambda x: x[0])
+        self.keys: list[str] = [x[0] for x in entries]
+        self.names: list[str] = [x[1] for x in entries]
+        self.items: list[T] = [x[2] for x in entries]
+        self.trigrams: dict[str, set[int]] = {}
+        for i, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                self.trigrams.setdefault(trigram, set()).add(i)
+
+    @classmethod
+    def shared(cls, kind: str, items: Iterable[tuple[int, str, T]]) -> "NameIndex[T]":
+        """
+        Return the index of the given items, reusing the previous index of the same kind if
+        the catalog snapshot did not change.
+
+        Parameters
+        ----------
+        kind: str
+            Identifier of the catalog, like the transformer's class name.
+        items: Iterable[tuple[int, str, T]]
+            Primary key, name and item to index.
+        """
+        items = list(items)
+        snapshot = tuple((pk, name) for pk, name, _ in items)
+        previous = cls._shared.get(kind)
+        if previous is not None and previous[0] == snapshot:
+            return previous[1]
+        index = cls((name, item) for _, name, item in items)
+        cls._shared[kind] = (snapshot, index)
+        return index
+
+    def _candidates(self, value: str) -> Iterable[int]:
+        if len(value) < 3:
+            return range(len(self.keys))
+        sets = [self.trigrams.get(x) for x in trigrams(value)]
+        if not all(sets):
+            return ()
+        return set.intersection(*sets)  # type: ignore
+
+    def search(self, value: str, limit: int = 25) -> list[tuple[str, T]]:
+        """
+        Return up to `limit` pairs of name and item matching the search, best matches first.
+        """
+        value = value.lower()
+        results: list[int] = []
+
+        # prefix matches, already in alphabetical order
+        i = bisect.bisect_left(self.keys, value)
+        while i < len(self.keys) and self.keys[i].startswith(value) and len(results) < limit:
+            results.append(i)
+            i += 1
+
+        if len(results) < limit:
+            others: list[tuple[bool, int, int]] = []
+            for i in self._candidates(value):
+                position = self.keys[i].find(value)
+                if position > 0:
+                    word_start = self.keys[i][position - 1] in " -_("
+                    others.append((not word_start, position, i))
+            others.sort(key=lambda x: (x[0], x[1], self.keys[x[2]]))
+            results.extend(x[2] for x in others[: limit - len(results)])
+
+        return [(self.names[i], self.items[i]) for i in results]
@@ -139,8 +139,10 @@ class Pages(discord.ui.View):
             elif max_pages > page_number >= 0:
                 await self.show_page(interaction, page_number)
         except IndexError:
-            # An error happened that can be handled, so ignore it.
-            pass
+            # The source has less pages than announced, show its actual last page instead.
+            last_page = self.source.get_max_pages()
+            if last_page is not None and 0 <= last_page - 1 < page_number:
+                await self.show_checked_page(interaction, last_page - 1)
 
     async def interaction_check(self, interaction: discord.Interaction[BallsDexBot]) -> bool:
         if not await interaction.client.blacklist_check(interaction):
@@ -225,7 +227,7 @@ class Pages(discord.ui.View):
     async def go_to_last_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         """go to the last page"""
         # The call here is safe because it's guarded by skip_if
-        await self.show_page(interaction, self.source.get_max_pages() - 1)  # type: ignore
+        await self.show_checked_page(interaction, self.source.get_max_pages() - 1)  # type: ignore
 
     @discord.ui.button(label="Skip to page...", style=discord.ButtonStyle.grey)
     async def numbered_page(self, interaction: discord.Interaction, button: discord.ui.Button):
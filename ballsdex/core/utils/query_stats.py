@@ -0,0 +1,140 @@
+import functools
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from ballsdex.core.metrics import query_count_histogram, query_time_histogram
+from ballsdex.settings import settings
+
+log = logging.getLogger("ballsdex.core.utils.query_stats")
+
+__all__ = ("QueryStats", "track_queries", "install")
+
+# methods of the Tortoise clients that send a query to the database
+CLIENT_METHODS = (
+    "execute_insert",
+    "execute_many",
+    "execute_query",
+    "execute_query_dict",
+    "execute_script",
+)
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def sql_template(query: str) -> str:
+    """
+    Strip literal values from a SQL query, so that queries only differing by their parameters
+    share the same template.
+    """
+    query = LITERAL_RE.sub("?", query)
+    query = IN_LIST_RE.sub("(...)", query)
+    return WHITESPACE_RE.sub(" ", query).strip()
+
+
+class QueryStats:
+    """
+    Queries sent to the database within a single interaction or task.
+
+    Attributes
+    ----------
+    name: str
+        Name of the command or task being tracked.
+    count: int
+        Number of queries sent.
+    time: float
+        Total time spent waiting for the database, in seconds.
+    templates: Counter[str]
+        Number of queries sent per SQL template.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.time: float = 0
+        self.templates: Counter[str] = Counter()
+
+    def repeated_templates(self, minimum: int = 2) -> list[tuple[str, int]]:
+        return [(x, y) for x, y in self.templates.most_common() if y >= minimum]
+
+
+current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+# set while a tracked query runs, client methods calling each other must only count once
+in_query: ContextVar[bool] = ContextVar("in_query", default=False)
+
+
+@contextmanager
+def track_queries(name: str) -> Iterator[QueryStats]:
+    """
+    Count and time all queries sent within this block, in the current context.
+
+    Queries sent from tasks spawned inside the block are also counted, since they inherit the
+    context. Once the block exits, the results are exported to Prometheus and a warning is
+    logged if the number of queries went over `settings.query_budget`.
+
+    Parameters
+    ----------
+    name: str
+        Name of the command or task, used as a label for the metrics. It can be changed on the
+        yielded `QueryStats` until the block exits.
+    """
+    stats = QueryStats(name)
+    token = current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_stats.reset(token)
+        if stats.count:
+            query_count_histogram.labels(name=stats.name).observe(stats.count)
+            query_time_histogram.labels(name=stats.name).observe(stats.time)
+        if settings.query_budget and stats.count > settings.query_budget:
+            repeated = "\n".join(
+                f"  {count}x {template[:300]}"
+                for template, count in stats.repeated_templates()[:5]
+            )
+            log.warning(
+                f"{stats.name} sent {stats.count} queries (budget is {settings.query_budget}), "
+                f"{round(stats.time * 1000)}ms spent in the database. "
+                f"Most repeated queries:\n{repeated or '  none'}"
+            )
+
+
+def _wrap(method):
+    @functools.wraps(method)
+    async def wrapper(self, query: str, *args, **kwargs):
+        stats = current_stats.get()
+        if stats is None or in_query.get():
+            return await method(self, query, *args, **kwargs)
+        token = in_query.set(True)
+        t1 = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            stats.time += time.perf_counter() - t1
+            in_query.reset(token)
+            stats.count += 1
+            stats.templates[sql_template(query)] += 1
+
+    wrapper.__query_stats_wrapped__ = True  # type: ignore
+    return wrapper
+
+
+def install():
+    """
+    Hook the query counter into the asyncpg client of Tortoise and its transactions.
+    This should be called once, before any query is sent.
+    """
+    from tortoise.backends.asyncpg.client import AsyncpgDBClient, TransactionWrapper
+
+    for cls in (AsyncpgDBClient, TransactionWrapper):
+        for name in CLIENT_METHODS:
+            method = cls.__dict__.get(name)
+            if method is None or getattr(method, "__query_stats_wrapped__", False):
+                continue
+            setattr(cls, name, _wrap(method))
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import asyncpg
+from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import ConfigurationError
+
+log = logging.getLogger("ballsdex.core.utils.replica")
+
+__all__ = ("ReplicaRouter", "replica_router", "read_connection", "replica_read")
+
+T = TypeVar("T")
+
+REPLICA_CONNECTION = "replica"
+
+# errors of a lost or refused connection, the read can be retried on another server
+CONNECTION_ERRORS = (
+    OSError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.OperatorInterventionError,
+)
+
+# seconds of replication delay, 0 when the replica replayed everything it received
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END AS lag
+"""
+
+
+class ReplicaRouter:
+    """
+    Route read-only queries to the `replica` connection when it is configured and healthy.
+
+    The replica is considered healthy if it answers the lag query and is less than `max_lag`
+    seconds behind the primary. This is checked at most every `check_interval` seconds, and
+    after a failure, the primary is used for `retry_delay` seconds before checking again.
+
+    Only use this for reads that can tolerate a few seconds of delay, never for a read followed
+    by a write depending on it. Prefer `read`, which also falls back to the primary when the
+    replica fails between two checks.
+
+    Attributes
+    ----------
+    max_lag: float
+        Maximum replication delay in seconds before falling back to the primary. Set with the
+        `BALLSDEXBOT_DB_REPLICA_MAX_LAG` environment variable, defaults to 5.
+    check_interval: float
+        Delay in seconds between two health checks of a healthy replica, defaults to 5.
+    retry_delay: float
+        Delay in seconds before checking an unhealthy replica again, defaults to 30.
+    """
+
+    check_interval: float = 5
+    retry_delay: float = 30
+
+    def __init__(self):
+        self.max_lag = float(os.environ.get("BALLSDEXBOT_DB_REPLICA_MAX_LAG", 5))
+        self.healthy = False
+        self.lag: float | None = None
+        self.next_check: float = 0
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def primary() -> BaseDBAsyncClient:
+        return Tortoise.get_connection("default")
+
+    @staticmethod
+    def get_replica() -> BaseDBAsyncClient | None:
+        try:
+            return Tortoise.get_connection(REPLICA_CONNECTION)
+        except (ConfigurationError, KeyError):
+            return None
+
+    async def check(self, replica: BaseDBAsyncClient):
+        try:
+            _, rows = await replica.execute_query(LAG_QUERY)
+            self.lag = float(rows[0]["lag"])
+        except Exception:
+            self.mark_unhealthy()
+            return
+
+        healthy = self.lag <= self.max_lag
+        if healthy != self.healthy:
+            if healthy:
+                log.info(f"Read replica is healthy ({self.lag:.1f}s behind), routing reads")
+            else:
+                log.warning(f"Read replica is {self.lag:.1f}s behind, using primary")
+        self.healthy = healthy
+        self.next_check = time.monotonic() + (self.check_interval if healthy else self.retry_delay)
+
+    def mark_unhealthy(self):
+        """
+        Route the reads to the primary until the next check, in `retry_delay` seconds.
+        """
+        if self.healthy:
+            log.warning("Read replica is unavailable, using primary", exc_info=True)
+        self.healthy = False
+        self.lag = None
+        self.next_check = time.monotonic() + self.retry_delay
+
+    def failed(self, db: BaseDBAsyncClient) -> bool:
+        """
+        Report a connection error of a read made on `db`, to be called from an `except` block.
+
+        Returns `True` if `db` is the replica, which is then marked unhealthy, and the read
+        can be retried on the primary.
+        """
+        if db is not self.get_replica():
+            return False
+        self.mark_unhealthy()
+        return True
+
+    async def connection(self) -> BaseDBAsyncClient:
+        """
+        Return the connection to use for a replica-safe read: the replica if healthy,
+        otherwise the primary.
+        """
+        primary = self.primary()
+        replica = self.get_replica()
+        if replica is None:
+            return primary
+        if time.monotonic() >= self.next_check:
+            async with self.lock:
+                if time.monotonic() >= self.next_check:
+                    await self.check(replica)
+        return replica if self.healthy else primary
+
+    async def read(
+        self, query: Callable[[BaseDBAsyncClient], Awaitable[T]], *, primary: bool = False
+    ) -> T:
+        """
+        Run a replica-safe read, retrying it on the primary if the replica connection fails.
+
+        Parameters
+        ----------
+        query: Callable[[BaseDBAsyncClient], Awaitable[T]]
+            Function running the read on the given connection, for instance the `using_db`
+            method of a queryset.
+        primary: bool
+            Read from the primary even if the replica is healthy, for data changed in the
+            last `max_lag` seconds.
+        """
+        db = self.primary() if primary else await self.connection()
+        try:
+            return await query(db)
+        except CONNECTION_ERRORS:
+            if not self.failed(db):
+                raise
+        return await query(self.primary())
+
+
+replica_router = ReplicaRouter()
+
+
+async def read_connection() -> BaseDBAsyncClient:
+    """
+    Shortcut for `replica_router.connection()`, pass the result to `.using_db()` on
+    replica-safe querysets. Prefer `replica_read`, which retries on the primary if the replica
+    fails.
+    """
+    return await replica_router.connection()
+
+
+async def replica_read(
+    query: Callable[[BaseDBAsyncClient], Awaitable[T]], *, primary: bool = False
+) -> T:
+    """
+    Shortcut for `replica_router.read()`.
+    """
+    return await replica_router.read(query, primary=primary)
@@ -0,0 +1,106 @@
+import logging
+import time
+from typing import Callable, Generic, Hashable, Iterator, TypeVar
+
+log = logging.getLogger("ballsdex.core.utils.sessions")
+
+__all__ = ("SessionRegistry",)
+
+S = TypeVar("S")
+
+
+class SessionRegistry(Generic[S]):
+    """
+    Registry of the ongoing sessions of a feature (trades, lineups, battles...), indexed by the
+    keys of their participants for constant time lookups.
+
+    Sessions stay registered until they are explicitly removed, unless an idle `ttl` is given.
+    Sessions that finished without being removed are dropped when they are looked up, if an
+    `is_finished` check is given.
+
+    Parameters
+    ----------
+    is_finished: Callable[[S], bool] | None
+        Check telling whether a session is over and can be dropped.
+    ttl: float | None
+        Delay in seconds after which a session that was not looked up is dropped. Abandoned
+        sessions are swept at most once per `ttl` when new sessions are added.
+    """
+
+    def __init__(
+        self, is_finished: Callable[[S], bool] | None = None, *, ttl: float | None = None
+    ):
+        self.is_finished = is_finished
+        self.ttl = ttl
+        self.sessions: dict[Hashable, S] = {}
+        # sessions may not be hashable, keys are stored by object identity
+        self.keys: dict[int, tuple[Hashable, ...]] = {}
+        self.last_used: dict[int, float] = {}
+        self.last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[S]:
+        seen: set[int] = set()
+        for session in list(self.sessions.values()):
+            if id(session) not in seen:
+                seen.add(id(session))
+                yield session
+
+    def expired(self, session: S, now: float | None = None) -> bool:
+        if self.is_finished and self.is_finished(session):
+            return True
+        if self.ttl is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.last_used.get(id(session), now) > self.ttl
+
+    def sweep(self):
+        """
+        Drop the finished and idle sessions.
+        """
+        now = self.last_sweep = time.monotonic()
+        for session in list(self):
+            if self.expired(session, now):
+                log.debug("Dropping an expired session")
+                self.remove(session)
+
+    def add(self, session: S, *keys: Hashable):
+        """
+        Register a session under the keys of its participants, usually their user ID, possibly
+        scoped with a channel ID. A key already in use is taken over by the new session.
+        """
+        if self.ttl is not None and time.monotonic() - self.last_sweep > self.ttl:
+            self.sweep()
+        for key in keys:
+            if (previous := self.sessions.get(key)) is not None and previous is not session:
+                log.debug(f"Session key {key} taken over by a new session")
+                self.remove(previous)
+        self.keys[id(session)] = self.keys.get(id(session), ()) + keys
+        self.last_used[id(session)] = time.monotonic()
+        for key in keys:
+            self.sessions[key] = session
+
+    def get(self, key: Hashable) -> S | None:
+        """
+        Return the ongoing session registered under a key, if any. This counts as an activity
+        of the session.
+        """
+        session = self.sessions.get(key)
+        if session is None:
+            return None
+        if self.expired(session):
+            self.remove(session)
+            return None
+        self.last_used[id(session)] = time.monotonic()
+        return session
+
+    def remove(self, session: S):
+        """
+        Unregister a session from all of its keys. Does nothing if it is not registered.
+        """
+        self.last_used.pop(id(session), None)
+        for key in self.keys.pop(id(session), ()):
+            if self.sessions.get(key) is session:
+                del self.sessions[key]
@@ -1,5 +1,5 @@
 import enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 from tortoise.expressions import F, RawSQL
 
@@ -7,7 +7,6 @@ if TYPE_CHECKING:
     from tortoise.queryset import QuerySet
 
     from ballsdex.core.models import BallInstance, Special
-    
 
 
 class SortingChoices(enum.Enum):
@@ -24,13 +23,44 @@ class SortingChoices(enum.Enum):
     duplicates = "duplicates"
 
 
+# sorting methods ordering on plain columns, their rows can be paginated by keyset
+KEYSET_ORDERINGS: dict[SortingChoices | None, tuple[str, ...]] = {
+    None: ("-favorite",),
+    SortingChoices.alphabetic: ("ball__country",),
+    SortingChoices.catch_date: ("-catch_date",),
+    SortingChoices.rarity: ("ball__rarity", "ball__country"),
+    SortingChoices.health_bonus: ("-health_bonus",),
+    SortingChoices.attack_bonus: ("-attack_bonus",),
+}
+
+
+def reverse_ordering(fields: "Iterable[str]") -> tuple[str, ...]:
+    """
+    Flip the direction of each field of an ordering.
+    """
+    return tuple(x[1:] if x.startswith("-") else f"-{x}" for x in fields)
+
+
+def keyset_ordering(sort: SortingChoices | None, reverse: bool = False) -> tuple[str, ...] | None:
+    """
+    Return the ordering of a sorting method, ending with the ID to make it unique, or `None`
+    if the method sorts on a computed value and cannot be paginated by keyset.
+    """
+    if sort not in KEYSET_ORDERINGS:
+        return None
+    fields = (*KEYSET_ORDERINGS[sort], "id")
+    return reverse_ordering(fields) if reverse else fields
+
+
 def sort_balls(
-    sort: SortingChoices, queryset: "QuerySet[BallInstance]"
+    sort: SortingChoices, queryset: "QuerySet[BallInstance]", *, reverse: bool = False
 ) -> "QuerySet[BallInstance]":
     """
     Edit a queryset in place to apply the selected sorting options. You can call this function
     multiple times with the same queryset to have multiple sort methods.
 
+    Ties are ordered by ID, so that the ordering is stable across paginated queries.
+
     Parameters
     ----------
     sort: SortingChoices
@@ -39,38 +69,38 @@ def sort_balls(
         An existing queryset of ball instances. This can be obtained with, for example,
         ``BallInstance.all()`` or ``BallInstance.filter(player=x)``
         **without awaiting the result!**
+    reverse: bool
+        Reverse the ordering.
 
     Returns
     -------
     QuerySet[BallInstance]
         The same queryset modified to apply the ordering. Await it to obtain the result.
     """
+    fields: tuple[str, ...]
     if sort == SortingChoices.duplicates:
-        return queryset.annotate(count=RawSQL("COUNT(*) OVER (PARTITION BY ball_id)")).order_by(
-            "-count"
-        )
+        queryset = queryset.annotate(count=RawSQL("COUNT(*) OVER (PARTITION BY ball_id)"))
+        fields = ("-count",)
     elif sort == SortingChoices.stats_bonus:
-        return queryset.annotate(stats_bonus=F("health_bonus") + F("attack_bonus")).order_by(
-            "-stats_bonus"
-        )
+        queryset = queryset.annotate(stats_bonus=F("health_bonus") + F("attack_bonus"))
+        fields = ("-stats_bonus",)
     elif sort == SortingChoices.special:
-        return queryset.order_by(sort.value, "special__start_date")
+        fields = (sort.value, "special__start_date")
     elif sort == SortingChoices.health or sort == SortingChoices.attack:
         # Use the sorting name as the annotation key to avoid issues when this function
         # is called multiple times. Using the same annotation name twice will error.
-        return queryset.annotate(
+        queryset = queryset.annotate(
             **{f"{sort.value}_sort": F(f"{sort.value}_bonus") + F(f"ball__{sort.value}")}
-        ).order_by(f"-{sort.value}_sort")
+        )
+        fields = (f"-{sort.value}_sort",)
     elif sort == SortingChoices.total_stats:
-        return (
-            queryset.select_related("ball")
-            .annotate(
-                stats=RawSQL("ballinstance__ball.health + " "ballinstance__ball.attack :: BIGINT")
-            )
-            .order_by("-stats")
+        queryset = queryset.select_related("ball").annotate(
+            stats=RawSQL("ballinstance__ball.health + " "ballinstance__ball.attack :: BIGINT")
         )
+        fields = ("-stats",)
     elif sort == SortingChoices.rarity:
-        return queryset.order_by(sort.value, "ball__country")
+        fields = (sort.value, "ball__country")
     else:
-        return queryset.order_by(sort.value)
-    
+        fields = (sort.value,)
+    fields = (*fields, "id")
+    return queryset.order_by(*(reverse_ordering(fields) if reverse else fields))
@@ -37,3 +37,28 @@ async def row_count_estimate(table_name: str, *, analyze: bool = True) -> int:
         return await row_count_estimate(table_name, analyze=False)  # prevent recursion error
 
     return result
+
+
+async def create_trade_partitions(months: int = 3) -> int:
+    """
+    Create the monthly partitions of the trade tables for the current and upcoming months,
+    if they don't exist yet. Rows of a month without partition end up in the default
+    partition, which then prevents creating that month's partition.
+
+    Parameters
+    ----------
+    months: int = 3
+        Number of upcoming months to create partitions for.
+
+    Returns
+    -------
+    int
+        Number of months created
+    """
+    connection = Tortoise.get_connection("default")
+    _, rows = await connection.execute_query(
+        "SELECT trade_create_partitions(CURRENT_DATE, "
+        "(date_trunc('month', CURRENT_DATE) + make_interval(months => $1))::date) AS created",
+        [months + 1],
+    )
+    return rows[0]["created"]
@@ -1,6 +1,5 @@
 import logging
 import time
-from datetime import timedelta
 from enum import Enum
 from typing import TYPE_CHECKING, Generic, Iterable, Optional, TypeVar
 
@@ -8,20 +7,24 @@ import discord
 from discord import app_commands
 from discord.interactions import Interaction
 from tortoise.exceptions import DoesNotExist
-from tortoise.expressions import Q, RawSQL
 from tortoise.models import Model
-from tortoise.timezone import now as tortoise_now
 
 from ballsdex.core.models import (
     Ball,
     BallInstance,
+    BallInstanceView,
     Economy,
     Regime,
     Special,
     balls,
     economies,
     regimes,
+    specials,
 )
+from ballsdex.core.utils.autocomplete import autocomplete_dispatcher
+from ballsdex.core.utils.inventory_index import inventory_index, search_database
+from ballsdex.core.utils.locks import lock_manager
+from ballsdex.core.utils.name_index import NameIndex, catalog_version
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -113,9 +116,9 @@ class ModelTransformer(app_commands.Transformer, Generic[T]):
         self, interaction: Interaction["BallsDexBot"], value: str
     ) -> list[app_commands.Choice[int]]:
         t1 = time.time()
-        choices: list[app_commands.Choice[int]] = []
-        for option in await self.get_options(interaction, value):
-            choices.append(option)
+        choices: list[app_commands.Choice[int]] = await autocomplete_dispatcher.dispatch(
+            interaction, value, self.name, lambda: self.get_options(interaction, value)
+        )
         t2 = time.time()
         log.debug(
             f"{self.name.title()} autocompletion took "
@@ -161,45 +164,33 @@ class BallInstanceTransformer(ModelTransformer[BallInstance]):
     async def get_options(
         self, interaction: Interaction["BallsDexBot"], value: str
     ) -> list[app_commands.Choice[int]]:
-        balls_queryset = BallInstance.filter(player__discord_id=interaction.user.id)
-
+        special_id: int | None = None
         if (special := getattr(interaction.namespace, "special", None)) and special.isdigit():
-            balls_queryset = balls_queryset.filter(special_id=int(special))
-
+            special_id = int(special)
+        locked: bool | None = None
         if interaction.command and (trade_type := interaction.command.extras.get("trade", None)):
-            if trade_type == TradeCommandType.PICK:
-                balls_queryset = balls_queryset.filter(
-                    Q(
-                        Q(locked__isnull=True)
-                        | Q(locked__lt=tortoise_now() - timedelta(minutes=30))
-                    )
-                )
-            else:
-                balls_queryset = balls_queryset.filter(
-                    locked__isnull=False, locked__gt=tortoise_now() - timedelta(minutes=30)
-                )
+            locked = trade_type != TradeCommandType.PICK
 
-        if value.startswith("="):
-            ball_name = value[1:]
-            balls_queryset = balls_queryset.filter(ball__country__iexact=ball_name)
+        instances: Iterable[BallInstanceView]
+        if settings.inventory_search == "database":
+            instances = await search_database(
+                interaction.user.id, value, special_id=special_id, locked=locked
+            )
         else:
-            balls_queryset = (
-                balls_queryset.select_related("ball")
-                .annotate(
-                    searchable=RawSQL(
-                        "to_hex(ballinstance.id) || ' ' || ballinstance__ball.country || ' ' || "
-                        "COALESCE(ballinstance__ball.catch_names, '') || ' ' || "
-                        "COALESCE(ballinstance__ball.translations, '')"
-                    )
+            inventory = await inventory_index.get(interaction.user.id)
+            instances = inventory.search(value, special_id=special_id)
+            if locked is not None:
+                instances = (x for x in instances if lock_manager.is_locked(x.pk) is locked)
+
+        choices: list[app_commands.Choice] = []
+        for instance in instances:
+            choices.append(
+                app_commands.Choice(
+                    name=instance.description(bot=interaction.client), value=str(instance.pk)
                 )
-                .filter(searchable__icontains=value.replace(".", ""))
             )
-        balls_queryset = balls_queryset.limit(25)
-
-        choices: list[app_commands.Choice] = [
-            app_commands.Choice(name=x.description(bot=interaction.client), value=str(x.pk))
-            for x in await balls_queryset
-        ]
+            if len(choices) == 25:
+                break
         return choices
 
 
@@ -213,15 +204,17 @@ class TTLModelTransformer(ModelTransformer[T]):
     Attributes
     ----------
     ttl: float
-        Delay in seconds for `items` to live until refreshed with `load_items`, defaults to 300
+        Delay in seconds for `items` to live until refreshed with `load_items`, defaults to 300.
+        Items are also refreshed as soon as the bot reloads its cache.
     """
 
     ttl: float = 300
 
     def __init__(self):
         self.items: dict[int, T] = {}
-        self.search_map: dict[T, str] = {}
+        self.index: NameIndex[int] = NameIndex(())
         self.last_refresh: float = 0
+        self.catalog_version: int = -1
         log.debug(f"Inited transformer for {self.name}")
 
     async def load_items(self) -> Iterable[T]:
@@ -232,25 +225,22 @@ class TTLModelTransformer(ModelTransformer[T]):
 
     async def maybe_refresh(self):
         t = time.time()
-        if t - self.last_refresh > self.ttl:
+        if t - self.last_refresh > self.ttl or self.catalog_version != catalog_version():
+            self.catalog_version = catalog_version()
             self.items = {x.pk: x for x in await self.load_items()}
             self.last_refresh = t
-            self.search_map = {x: self.key(x).lower() for x in self.items.values()}
+            # the index is only rebuilt if names changed, and is shared between instances
+            self.index = NameIndex.shared(
+                type(self).__name__, ((x.pk, self.key(x), x.pk) for x in self.items.values())
+            )
 
     async def get_options(
         self, interaction: Interaction["BallsDexBot"], value: str
     ) -> list[app_commands.Choice[str]]:
         await self.maybe_refresh()
-
-        i = 0
-        choices: list[app_commands.Choice] = []
-        for item in self.items.values():
-            if value.lower() in self.search_map[item]:
-                choices.append(app_commands.Choice(name=self.key(item), value=str(item.pk)))
-                i += 1
-                if i == 25:
-                    break
-        return choices
+        return [
+            app_commands.Choice(name=name, value=str(pk)) for name, pk in self.index.search(value)
+        ]
 
 
 class BallTransformer(TTLModelTransformer[Ball]):
@@ -290,10 +280,13 @@ class SpecialTransformer(TTLModelTransformer[Special]):
     def key(self, model: Special) -> str:
         return model.name
 
+    async def load_items(self) -> Iterable[Special]:
+        return specials.values()
+
 
 class SpecialEnabledTransformer(SpecialTransformer):
     async def load_items(self) -> Iterable[Special]:
-        return await Special.filter(hidden=False).all()
+        return [x for x in specials.values() if not x.hidden]
 
 
 class RegimeTransformer(TTLModelTransformer[Regime]):
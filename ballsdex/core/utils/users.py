@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+import discord
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+
+log = logging.getLogger("ballsdex.core.utils.users")
+
+__all__ = ("UserResolver", "user_resolver")
+
+
+class UserResolver:
+    """
+    Resolve Discord users from their ID, avoiding the heavily rate-limited `fetch_user` call.
+
+    Users are first looked up in the bot's cache, then in an LRU of the users fetched before.
+    Only the remaining ones are fetched, and concurrent requests for the same user share the
+    same call.
+
+    Attributes
+    ----------
+    maxsize: int
+        Maximum number of fetched users kept in memory, defaults to 10000
+    """
+
+    maxsize: int = 10000
+
+    def __init__(self):
+        self.users: LRUCache[int, discord.User] = LRUCache(self.maxsize)
+        self.fetching: dict[int, asyncio.Task[discord.User]] = {}
+
+    def get(self, bot: "BallsDexBot", user_id: int) -> discord.User | None:
+        """
+        Return the user if it is known without any request, else `None`.
+        """
+        return bot.get_user(user_id) or self.users.get(user_id)
+
+    async def fetch(self, bot: "BallsDexBot", user_id: int) -> discord.User:
+        """
+        Return the user with the given ID, fetching it only if it is not cached.
+
+        Raises
+        ------
+        discord.NotFound
+            The user does not exist.
+        discord.HTTPException
+            Fetching the user failed.
+        """
+        if (user := self.get(bot, user_id)) is not None:
+            return user
+        if (task := self.fetching.get(user_id)) is None:
+            task = self.fetching[user_id] = asyncio.create_task(bot.fetch_user(user_id))
+            task.add_done_callback(lambda _: self.fetching.pop(user_id, None))
+        user = await asyncio.shield(task)
+        self.users[user_id] = user
+        return user
+
+
+user_resolver = UserResolver()
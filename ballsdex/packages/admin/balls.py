@@ -14,6 +14,7 @@ from random import randint
 from ballsdex.core.bot import BallsDexBot
 from ballsdex.core.models import Ball, BallInstance, Player, Special, Trade, TradeObject
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.counters import instance_counters
 from ballsdex.core.utils.logging import log_action
 from ballsdex.core.utils.transformers import (
     BallTransform,
@@ -569,8 +570,12 @@ class Balls(app_commands.Group):
             await ball.save()
 
             # Log the transfer in the trade table
-            trade = await Trade.create(player1=donor_player, player2=receiver_player)
-            await TradeObject.create(trade=trade, ballinstance=ball, player=donor_player)
+            trade = await Trade.create(
+                player1=donor_player, player2=receiver_player, **Trade.summarize([ball], [])
+            )
+            await TradeObject.create(
+                trade=trade, trade_date=trade.date, ballinstance=ball, player=donor_player
+            )
 
         await interaction.response.send_message(
             f"Transferred all countryballs from {donor} to {receiver}.",
@@ -620,8 +625,12 @@ class Balls(app_commands.Group):
         ball.player = player
         await ball.save()
 
-        trade = await Trade.create(player1=original_player, player2=player)
-        await TradeObject.create(trade=trade, ballinstance=ball, player=original_player)
+        trade = await Trade.create(
+            player1=original_player, player2=player, **Trade.summarize([ball], [])
+        )
+        await TradeObject.create(
+            trade=trade, trade_date=trade.date, ballinstance=ball, player=original_player
+        )
         await interaction.response.send_message(
             f"Transfered {ball}({ball.pk}) from {original_player} to {user}.",
             ephemeral=True,
@@ -737,7 +746,10 @@ class Balls(app_commands.Group):
             filters["ball__regime"] = regime
             
         await interaction.response.defer(ephemeral=True, thinking=True)
-        balls = await BallInstance.filter(**filters).count()
+        if user:
+            balls = await BallInstance.filter(**filters).count()
+        else:
+            balls = await instance_counters.count(ball=countryball, special=special, regime=regime)
         verb = "is" if balls == 1 else "are"
         country = f"{countryball.country} " if countryball else ""
         plural = "s" if balls > 1 or balls == 0 else ""
@@ -6,9 +6,12 @@ from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
 
 from ballsdex.core.bot import BallsDexBot
-from ballsdex.core.models import BallInstance, Player, Trade
+from ballsdex.core.jobs import JobContext, JobError, JobResult, job_queue
+from ballsdex.core.models import BallInstance, Player, Trade, TradeArchive
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.replica import replica_read
 from ballsdex.core.utils.transformers import BallEnabledTransform
+from ballsdex.packages.players.export import export_file
 from ballsdex.packages.trade.display import TradeViewFormat, fill_trade_embed_fields
 from ballsdex.packages.trade.trade_user import TradingUser
 from ballsdex.settings import settings
@@ -35,6 +38,7 @@ class History(app_commands.Group):
         countryball: BallEnabledTransform | None = None,
         user2: discord.User | None = None,
         days: int | None = None,
+        archived: bool = False,
     ):
         """
         Show the trade history of a user.
@@ -51,6 +55,8 @@ class History(app_commands.Group):
             The second user you want to check the history of.
         days: Optional[int]
             Retrieve trade history from last x days.
+        archived: bool
+            Show the archived trades instead of the recent ones.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
         sort_value = sorting.value if sorting else "-date"
@@ -61,7 +67,7 @@ class History(app_commands.Group):
             )
             return
 
-        queryset = Trade.filter()
+        queryset = (TradeArchive if archived else Trade).filter()
         try:
             player1 = await Player.get(discord_id=user.id)
             if user2:
@@ -79,7 +85,7 @@ class History(app_commands.Group):
             return
 
         if countryball:
-            queryset = queryset.filter(Q(tradeobjects__ballinstance__ball=countryball)).distinct()
+            queryset = queryset.filter(ball_ids__contains=[countryball.pk])
 
         if days is not None and days > 0:
             end_date = datetime.datetime.now()
@@ -87,7 +93,7 @@ class History(app_commands.Group):
             queryset = queryset.filter(date__range=(start_date, end_date))
 
         queryset = queryset.order_by(sort_value).prefetch_related("player1", "player2")
-        history = await queryset
+        history = await replica_read(queryset.using_db)
 
         if not history:
             await interaction.followup.send("No history found.", ephemeral=True)
@@ -98,11 +104,42 @@ class History(app_commands.Group):
                 f"History of {user.display_name} and {user2.display_name}:"
             )
 
-        url = f"{settings.admin_url}/bd_models/trade/{query}" if settings.admin_url else None
+        url = (
+            f"{settings.admin_url}/bd_models/trade/{query}"
+            if settings.admin_url and not archived
+            else None
+        )
         source = TradeViewFormat(history, user.display_name, interaction.client, True, url)
         pages = Pages(source=source, interaction=interaction)
         await pages.start(ephemeral=True)
 
+    @app_commands.command(name="export")
+    @app_commands.checks.has_any_role(*settings.root_role_ids, *settings.admin_role_ids)
+    async def history_export(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        user: discord.User,
+        archived: bool = False,
+    ):
+        """
+        Export the full trade history of a user as a CSV file.
+
+        Parameters
+        ----------
+        user: discord.User
+            The user you want to export the history of.
+        archived: bool
+            Export the archived trades instead of the recent ones.
+        """
+        if not await Player.exists(discord_id=user.id):
+            await interaction.response.send_message(
+                "The user you gave is not registered by the bot.", ephemeral=True
+            )
+            return
+        await job_queue.submit(
+            interaction, "admin_history_export", {"user_id": user.id, "archived": archived}
+        )
+
     @app_commands.command(name="countryball")
     @app_commands.checks.has_any_role(*settings.root_role_ids)
     @app_commands.choices(
@@ -117,6 +154,7 @@ class History(app_commands.Group):
         countryball_id: str,
         sorting: app_commands.Choice[str] | None = None,
         days: int | None = None,
+        archived: bool = False,
     ):
         """
         Show the trade history of a countryball.
@@ -129,6 +167,8 @@ class History(app_commands.Group):
             The sorting method you want to use.
         days: Optional[int]
             Retrieve ball history from last x days.
+        archived: bool
+            Show the archived trades instead of the recent ones.
         """
         sort_value = sorting.value if sorting else "-date"
 
@@ -154,7 +194,7 @@ class History(app_commands.Group):
             )
             return
 
-        queryset = Trade.all()
+        queryset = (TradeArchive if archived else Trade).all()
         if days is None or days == 0:
             queryset = queryset.filter(tradeobjects__ballinstance_id=pk)
         else:
@@ -202,7 +242,12 @@ class History(app_commands.Group):
                 "The trade ID you gave is not valid.", ephemeral=True
             )
             return
-        trade = await Trade.get(id=pk).prefetch_related("player1", "player2")
+        trade: Trade | TradeArchive | None = await Trade.get_or_none(id=pk).prefetch_related(
+            "player1", "player2"
+        )
+        if not trade:
+            # trades missing from the live table may have been archived
+            trade = await TradeArchive.get_or_none(id=pk).prefetch_related("player1", "player2")
         if not trade:
             await interaction.response.send_message(
                 "The trade ID you gave does not exist.", ephemeral=True
@@ -212,7 +257,7 @@ class History(app_commands.Group):
             title=f"Trade {trade.pk:0X}",
             url=(
                 f"{settings.admin_url}/bd_models/trade/{trade.pk}/change/"
-                if settings.admin_url
+                if settings.admin_url and isinstance(trade, Trade)
                 else None
             ),
             description=f"Trade ID: {trade.pk:0X}",
@@ -227,3 +272,32 @@ class History(app_commands.Group):
             is_admin=True,
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+@job_queue.handler("admin_history_export")
+async def history_export_job(ctx: JobContext) -> JobResult:
+    """
+    Background job exporting the full trade history of a user for an admin, the payload has
+    the `user_id` of the user and whether the trades are `archived`.
+    """
+    user_id = ctx.job.payload["user_id"]
+    archived = ctx.job.payload.get("archived", False)
+    player = await Player.get_or_none(discord_id=user_id)
+    if player is None:
+        raise JobError("The user you gave is not registered by the bot.")
+    queryset = (TradeArchive if archived else Trade).filter(Q(player1=player) | Q(player2=player))
+    total = await queryset.count()
+
+    async def progress(count: int):
+        await ctx.progress(count, total)
+
+    file = await export_file(
+        player,
+        f"{user_id}_trades.zip",
+        items=False,
+        trades=True,
+        archived=archived,
+        progress=progress,
+    )
+    kind = "archived trades" if archived else "trades"
+    return JobResult(f"Here are the {kind} of user {user_id}:", (file,))
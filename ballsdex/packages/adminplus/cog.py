@@ -24,12 +24,15 @@ from ballsdex.core.models import (
     BlacklistedID,
     GuildConfig,
     Player,
+    PlayerCollectionSummary,
     Trade,
     TradeObject,
     balls,
     specials,
 )
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import get_catalog
+from ballsdex.core.utils.counters import instance_counters
 from ballsdex.core.utils.logging import log_action
 from ballsdex.core.utils.paginator import FieldPageSource, Pages, TextPageSource
 from ballsdex.core.utils.transformers import (
@@ -153,20 +156,11 @@ class Adminplus(commands.GroupCog):
 
             if await inventory_privacy(self.bot, interaction, player) is False:
                 return
-        # Filter disabled balls, they do not count towards progression
-        # Only ID and emoji is interesting for us
-        bot_countryballs = {x: y.emoji_id for x, y in balls.items() if y.enabled}
-
-        # Set of ball IDs owned by the player
-        filters = {"ball__enabled": True}
-        if special:
-            filters["special"] = special
-            bot_countryballs = {
-                x: y.emoji_id
-                for x, y in balls.items()
-                if y.enabled and y.created_at < special.end_date
-            }
-        if not bot_countryballs:
+        # Disabled balls, and balls created after the end of the special, do not count
+        # towards progression
+        catalog = get_catalog()
+        mask = catalog.mask(special)
+        if not mask:
             await interaction.followup.send(
                 f"There are no {extra_text}{settings.plural_collectible_name}"
                 " registered on this bot yet.",
@@ -174,53 +168,21 @@ class Adminplus(commands.GroupCog):
             )
             return
 
-        owned_countryballs = set(
-            x[0]
-            for x in await BallInstance.filter(**filters)
-            .distinct()  # Do not query everything
-            .values_list("ball_id")
-        )
+        existing = catalog.bitmap(await instance_counters.ball_ids(special=special)) & mask
+        missing = mask & ~existing
 
         entries: list[tuple[str, str]] = []
-
-        def fill_fields(title: str, emoji_ids: set[int]):
-            # check if we need to add "(continued)" to the field name
-            first_field_added = False
-            buffer = ""
-
-            for emoji_id in emoji_ids:
-                emoji = self.bot.get_emoji(emoji_id)
-                if not emoji:
-                    continue
-
-                text = f"{emoji} "
-                if len(buffer) + len(text) > 1024:
-                    # hitting embed limits, adding an intermediate field
-                    if first_field_added:
-                        entries.append(("\u200B", buffer))
-                    else:
-                        entries.append((f"__**{title}**__", buffer))
-                        first_field_added = True
-                    buffer = ""
-                buffer += text
-
-            if buffer:  # add what's remaining
-                if first_field_added:
-                    entries.append(("\u200B", buffer))
-                else:
-                    entries.append((f"__**{title}**__", buffer))
-
-        if owned_countryballs:
-            # Getting the list of emoji IDs from the IDs of the owned countryballs
-            fill_fields(
-                f"Existing {settings.plural_collectible_name}",
-                set(bot_countryballs[x] for x in owned_countryballs),
+        if existing:
+            entries.extend(
+                catalog.fields(self.bot, f"Existing {settings.plural_collectible_name}", existing)
             )
         else:
             entries.append((f"__**Existing {settings.plural_collectible_name}**__", "Nothing yet."))
 
-        if missing := set(y for x, y in bot_countryballs.items() if x not in owned_countryballs):
-            fill_fields(f"Missing {settings.plural_collectible_name}", missing)
+        if missing:
+            entries.extend(
+                catalog.fields(self.bot, f"Missing {settings.plural_collectible_name}", missing)
+            )
         else:
             entries.append(
                 (
@@ -234,7 +196,7 @@ class Adminplus(commands.GroupCog):
         special_str = f" ({special.name})" if special else ""
         source.embed.description = (
             f"{settings.bot_name}{special_str} progression: "
-            f"**{round(len(owned_countryballs) / len(bot_countryballs) * 100, 1)}%**"
+            f"**{round(existing.bit_count() / mask.bit_count() * 100, 1)}%**"
         )
         source.embed.colour = discord.Colour.blurple()
         source.embed.set_author(name=(settings.bot_name), icon_url=self.bot.user.avatar.url)
@@ -274,11 +236,7 @@ class Adminplus(commands.GroupCog):
             else:
                 emote = "N/A"
 
-            filters = {}
-            filters["special"] = special
-
-            count = await BallInstance.filter(**filters)
-            countNum = len(count)
+            countNum = await instance_counters.count(special=special)
             # sorted_collectibles = sorted(enabled_collectibles.values(), key=lambda x: x.rarity)
             # if you want the Rarity to only show full numbers like 1 or 12 use the code part here:
             # rarity = int(collectible.rarity)
@@ -610,7 +568,10 @@ class Adminplus(commands.GroupCog):
         if user:
             filters["player__discord_id"] = user.id
         await interaction.response.defer(ephemeral=True, thinking=True)
-        balls = await BallInstance.filter(**filters).count()
+        if user:
+            balls = await BallInstance.filter(**filters).count()
+        else:
+            balls = await instance_counters.count(ball=ball, special=special)
         country = f"{ball.country} " if ball else ""
         plural = "s" if balls > 1 or balls == 0 else ""
         special_str = f"{special.name} " if special else ""
@@ -669,15 +630,13 @@ class Adminplus(commands.GroupCog):
             else:
                 emote = "N/A"
 
-            filters = {}
-            filters["ball"] = collectible
-            if special:
-                filters["special"] = special
             if user:
-                filters["player__discord_id"] = user.id
-
-            count = await BallInstance.filter(**filters)
-            countNum = len(count)
+                filters = {"ball": collectible, "player__discord_id": user.id}
+                if special:
+                    filters["special"] = special
+                countNum = await PlayerCollectionSummary.total(**filters)
+            else:
+                countNum = await instance_counters.count(ball=collectible, special=special)
             # sorted_collectibles = sorted(enabled_collectibles.values(), key=lambda x: x.rarity)
             # if you want the Rarity to only show full numbers like 1 or 12 use the code part here:
             # rarity = int(collectible.rarity)
@@ -2,7 +2,7 @@ import enum
 import logging
 import datetime
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import discord
 from discord import app_commands
@@ -11,11 +11,21 @@ from discord.ui import Button, View, button
 from tortoise.exceptions import DoesNotExist
 from tortoise.functions import Count
 
-from ballsdex.core.models import BallInstance, DonationPolicy, Player, Trade, TradeObject, balls, Regime
+from ballsdex.core.models import (
+    BallInstance,
+    DonationPolicy,
+    Player,
+    PlayerCollectionSummary,
+    Regime,
+    Trade,
+    TradeObject,
+)
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import completion_cache, get_catalog
 from ballsdex.core.utils.logging import log_action
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
-from ballsdex.core.utils.sorting import SortingChoices, sort_balls
+from ballsdex.core.utils.replica import replica_read
+from ballsdex.core.utils.sorting import SortingChoices
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
     BallInstanceTransform,
@@ -24,7 +34,10 @@ from ballsdex.core.utils.transformers import (
     TradeCommandType,
 )
 from ballsdex.core.utils.utils import inventory_privacy, is_staff
-from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer
+from ballsdex.packages.balls.countryballs_paginator import (
+    CountryballsViewer,
+    LazyCountryballsSource,
+)
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -77,9 +90,16 @@ class DonationRequest(View):
         self.countryball.trade_player = self.countryball.player
         self.countryball.player = self.new_player
         await self.countryball.save()
-        trade = await Trade.create(player1=self.countryball.trade_player, player2=self.new_player)
+        trade = await Trade.create(
+            player1=self.countryball.trade_player,
+            player2=self.new_player,
+            **Trade.summarize([self.countryball], []),
+        )
         await TradeObject.create(
-            trade=trade, ballinstance=self.countryball, player=self.countryball.trade_player
+            trade=trade,
+            trade_date=trade.date,
+            ballinstance=self.countryball,
+            player=self.countryball.trade_player,
         )
         await interaction.response.edit_message(
             content=interaction.message.content  # type: ignore
@@ -175,23 +195,25 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             return
 
-        await player.fetch_related("balls")
-        query = player.balls.all()
+        query = BallInstance.filter(player=player)
+        summary_filters: dict[str, Any] = {"player": player}
 
         # Apply filters
         if countryball:
             query = query.filter(ball__id=countryball.pk)
+            summary_filters["ball_id"] = countryball.pk
         if special:
             query = query.filter(special=special)
+            summary_filters["special"] = special
         if regime:
             query = query.filter(ball__regime=regime)
+            summary_filters["ball__regime"] = regime
 
-        if sort:
-            countryballs = await sort_balls(sort, query)
-        else:
-            countryballs = await query.order_by("-favorite")
+        total = await replica_read(
+            lambda db: PlayerCollectionSummary.total(using_db=db, **summary_filters)
+        )
 
-        if len(countryballs) < 1:
+        if total < 1:
             # Build filter description
             filter_parts = []
             if countryball:
@@ -214,10 +236,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
                 )
             return
 
-        if reverse:
-            countryballs.reverse()
-
-        paginator = CountryballsViewer(interaction, countryballs)
+        source = LazyCountryballsSource(query, total, sort=sort, reverse=reverse)
+        paginator = CountryballsViewer(interaction, source)
         if user_obj == interaction.user:
             await paginator.start()
         else:
@@ -268,20 +288,11 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
 
             if await inventory_privacy(self.bot, interaction, player, user_obj) is False:
                 return
-        # Filter disabled balls, they do not count towards progression
-        # Only ID and emoji is interesting for us
-        bot_countryballs = {x: y.emoji_id for x, y in balls.items() if y.enabled}
-
-        # Set of ball IDs owned by the player
-        filters = {"player__discord_id": user_obj.id, "ball__enabled": True}
-        if special:
-            filters["special"] = special
-            bot_countryballs = {
-                x: y.emoji_id
-                for x, y in balls.items()
-                if y.enabled and (special.end_date is None or y.created_at < special.end_date)
-            }
-        if not bot_countryballs:
+        # Disabled balls, and balls created after the end of the special, do not count
+        # towards progression
+        catalog = get_catalog()
+        mask = catalog.mask(special)
+        if not mask:
             await interaction.followup.send(
                 f"There are no {extra_text}{settings.plural_collectible_name}"
                 " registered on this bot yet.",
@@ -289,53 +300,21 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             )
             return
 
-        owned_countryballs = set(
-            x[0]
-            for x in await BallInstance.filter(**filters)
-            .distinct()  # Do not query everything
-            .values_list("ball_id")
-        )
+        owned = await completion_cache.owned(user_obj.id, special) & mask
+        missing = mask & ~owned
 
         entries: list[tuple[str, str]] = []
-
-        def fill_fields(title: str, emoji_ids: set[int]):
-            # check if we need to add "(continued)" to the field name
-            first_field_added = False
-            buffer = ""
-
-            for emoji_id in emoji_ids:
-                emoji = self.bot.get_emoji(emoji_id)
-                if not emoji:
-                    continue
-
-                text = f"{emoji} "
-                if len(buffer) + len(text) > 1024:
-                    # hitting embed limits, adding an intermediate field
-                    if first_field_added:
-                        entries.append(("\u200B", buffer))
-                    else:
-                        entries.append((f"__**{title}**__", buffer))
-                        first_field_added = True
-                    buffer = ""
-                buffer += text
-
-            if buffer:  # add what's remaining
-                if first_field_added:
-                    entries.append(("\u200B", buffer))
-                else:
-                    entries.append((f"__**{title}**__", buffer))
-
-        if owned_countryballs:
-            # Getting the list of emoji IDs from the IDs of the owned countryballs
-            fill_fields(
-                f"Owned {settings.plural_collectible_name}",
-                set(bot_countryballs[x] for x in owned_countryballs),
+        if owned:
+            entries.extend(
+                catalog.fields(self.bot, f"Owned {settings.plural_collectible_name}", owned)
             )
         else:
             entries.append((f"__**Owned {settings.plural_collectible_name}**__", "Nothing yet."))
 
-        if missing := set(y for x, y in bot_countryballs.items() if x not in owned_countryballs):
-            fill_fields(f"Missing {settings.plural_collectible_name}", missing)
+        if missing:
+            entries.extend(
+                catalog.fields(self.bot, f"Missing {settings.plural_collectible_name}", missing)
+            )
         else:
             entries.append(
                 (
@@ -349,7 +328,7 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         special_str = f" ({special.name})" if special else ""
         source.embed.description = (
             f"{settings.bot_name}{special_str} progression: "
-            f"**{round(len(owned_countryballs) / len(bot_countryballs) * 100, 1)}%**"
+            f"**{round(owned.bit_count() / mask.bit_count() * 100, 1)}%**"
         )
         source.embed.colour = discord.Colour.blurple()
         source.embed.set_author(name=user_obj.display_name, icon_url=user_obj.display_avatar.url)
@@ -562,7 +541,14 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
             interaction = view.interaction_response
         else:
             await interaction.response.defer()
-        await countryball.lock_for_trade()
+        if not await countryball.lock_for_trade():
+            # locked by a trade while the donation was being confirmed
+            await interaction.followup.send(
+                f"This {settings.collectible_name} is currently locked for a trade. "
+                "Please try again later.",
+                ephemeral=True,
+            )
+            return
         new_player, _ = await Player.get_or_create(discord_id=user.id)
         old_player = countryball.player
 
@@ -617,8 +603,12 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         countryball.favorite = False
         await countryball.save()
 
-        trade = await Trade.create(player1=old_player, player2=new_player)
-        await TradeObject.create(trade=trade, ballinstance=countryball, player=old_player)
+        trade = await Trade.create(
+            player1=old_player, player2=new_player, **Trade.summarize([countryball], [])
+        )
+        await TradeObject.create(
+            trade=trade, trade_date=trade.date, ballinstance=countryball, player=old_player
+        )
 
         cb_txt = (
             countryball.description(short=True, include_emoji=True, bot=self.bot, is_trade=True)
@@ -1,35 +1,234 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+import math
+from typing import TYPE_CHECKING, Any, Iterable, List
 
 import discord
+from tortoise.expressions import Q
 
-from ballsdex.core.models import BallInstance
+from ballsdex.core.models import BallInstance, BallInstanceView
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.replica import replica_read
+from ballsdex.core.utils.sorting import (
+    SortingChoices,
+    keyset_ordering,
+    reverse_ordering,
+    sort_balls,
+)
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
+    from tortoise.queryset import QuerySet
+
     from ballsdex.core.bot import BallsDexBot
 
 
-class CountryballsSource(menus.ListPageSource):
-    def __init__(self, entries: List[BallInstance]):
+class EntityPageSource(menus.PageSource):
+    """
+    Mixin for page sources of ball instances, keeping the instances of the displayed page
+    mapped by ID so that selections can be resolved without querying each one.
+    """
+
+    entities: dict[int, BallInstance | BallInstanceView] = {}
+
+    def set_entities(self, balls: Iterable[BallInstance | BallInstanceView]):
+        self.entities = {x.pk: x for x in balls}
+
+    async def resolve(
+        self, ids: Iterable[int], *, prefetch: Iterable[str] = ()
+    ) -> list[BallInstance]:
+        """
+        Return the full instances for the given IDs of the displayed page, in the same order.
+
+        Instances already loaded as models are reused, the others are loaded with a single
+        query. IDs that are not on the displayed page are ignored.
+
+        Parameters
+        ----------
+        ids: Iterable[int]
+            IDs of the selected instances.
+        prefetch: Iterable[str]
+            Relations to load with the instances, with a join.
+        """
+        ids = [x for x in ids if x in self.entities]
+        missing = [x for x in ids if not isinstance(self.entities[x], BallInstance)]
+        loaded: dict[int, BallInstance] = {}
+        if missing:
+            queryset = BallInstance.filter(id__in=missing)
+            if prefetch := tuple(prefetch):
+                queryset = queryset.select_related(*prefetch)
+            loaded = {x.pk: x for x in await queryset}
+        results: list[BallInstance] = []
+        for id in ids:
+            entity = self.entities[id]
+            if isinstance(entity, BallInstance):
+                results.append(entity)
+            elif id in loaded:
+                results.append(loaded[id])
+        return results
+
+
+class CountryballsSource(EntityPageSource, menus.ListPageSource):
+    def __init__(self, entries: List[BallInstance] | List[BallInstanceView]):
         super().__init__(entries, per_page=25)
 
-    async def format_page(self, menu: CountryballsSelector, balls: List[BallInstance]):
+    async def format_page(
+        self, menu: CountryballsSelector, balls: List[BallInstance] | List[BallInstanceView]
+    ):
+        self.set_entities(balls)
+        menu.set_options(balls)
+        return True  # signal to edit the page
+
+
+class LazyCountryballsSource(EntityPageSource):
+    """
+    Page source loading the instances of a queryset one page at a time.
+
+    Pages are fetched with keyset pagination on the sort key and the ID when the sorting method
+    allows it: the next (or previous) page starts right after the last (or before the first)
+    row of an already loaded neighbour. Jumping to a page without a loaded neighbour, or using
+    a sort on a computed value, falls back to an offset.
+
+    Each query loads `read_ahead` pages, so that going to the neighbouring page is usually
+    served from the cache.
+
+    Parameters
+    ----------
+    queryset: QuerySet[BallInstance]
+        The filtered instances to list, without ordering.
+    total: int
+        Number of instances matching the queryset, used for the page count. This can be an
+        estimate, like the total of `PlayerCollectionSummary`.
+    sort: SortingChoices | None
+        Sorting method, defaults to favorites first.
+    reverse: bool
+        Reverse the ordering.
+    """
+
+    per_page: int = 25
+    read_ahead: int = 3
+    max_cached_pages: int = 15
+
+    def __init__(
+        self,
+        queryset: "QuerySet[BallInstance]",
+        total: int,
+        *,
+        sort: SortingChoices | None = None,
+        reverse: bool = False,
+    ):
+        self.total = total
+        self.ordering = keyset_ordering(sort, reverse)
+        if self.ordering is not None:
+            self.queryset = queryset.order_by(*self.ordering)
+        else:
+            # sort on a computed value, sort_balls is checked above so this is never None
+            self.queryset = sort_balls(sort, queryset, reverse=reverse)  # type: ignore
+        self.pages: dict[int, list[BallInstanceView]] = {}
+        # sort key values of the first and last row of each cached page
+        self.bounds: dict[int, tuple[tuple[Any, ...], tuple[Any, ...]]] = {}
+
+    def is_paginating(self) -> bool:
+        return self.total > self.per_page
+
+    def get_max_pages(self) -> int:
+        return max(1, math.ceil(self.total / self.per_page))
+
+    def _after(self, values: tuple[Any, ...], ordering: tuple[str, ...]) -> Q:
+        # rows strictly after the given key in the given ordering: (a, b) > (x, y) is
+        # a > x OR (a = x AND b > y), with the comparison flipped for descending fields
+        conditions: list[Q] = []
+        equal: dict[str, Any] = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            conditions.append(Q(**equal, **{f"{name}__{lookup}": value}))
+            equal[name] = value
+        return Q(*conditions, join_type="OR")
+
+    async def _fetch(
+        self, queryset: "QuerySet[BallInstance]", limit: int
+    ) -> list[tuple[BallInstanceView, tuple[Any, ...]]]:
+        keys = tuple(x.lstrip("-") for x in self.ordering or ())
+        queryset = queryset.limit(limit)
+        rows = await replica_read(
+            lambda db: queryset.using_db(db).values_list(*BallInstanceView.__slots__, *keys)
+        )
+        size = len(BallInstanceView.__slots__)
+        return [(BallInstanceView(*row[:size]), tuple(row[size:])) for row in rows]
+
+    async def _load(self, page_number: int):
+        limit = self.per_page * self.read_ahead
+        if self.ordering is not None and (page_number - 1) in self.bounds:
+            # going forward, continue after the last row of the previous page
+            first = page_number
+            queryset = self.queryset.filter(
+                self._after(self.bounds[page_number - 1][1], self.ordering)
+            )
+            rows = await self._fetch(queryset, limit)
+        elif self.ordering is not None and (page_number + 1) in self.bounds:
+            # going backward, read in reverse before the first row of the next page
+            first = max(0, page_number - self.read_ahead + 1)
+            limit = self.per_page * (page_number + 1 - first)
+            ordering = reverse_ordering(self.ordering)
+            queryset = self.queryset.filter(
+                self._after(self.bounds[page_number + 1][0], ordering)
+            ).order_by(*ordering)
+            rows = await self._fetch(queryset, limit)
+            rows.reverse()
+        else:
+            first = page_number
+            rows = await self._fetch(self.queryset.offset(page_number * self.per_page), limit)
+        if first == page_number and len(rows) < limit:
+            # reading forward reached the end, the actual total is known
+            self.total = first * self.per_page + len(rows)
+
+        for i in range(0, len(rows), self.per_page):
+            chunk = rows[i : i + self.per_page]
+            number = first + i // self.per_page
+            self.pages[number] = [x[0] for x in chunk]
+            self.bounds[number] = (chunk[0][1], chunk[-1][1])
+
+        if len(self.pages) > self.max_cached_pages:
+            # forget the pages that are the furthest from the one being viewed
+            for number in sorted(self.pages, key=lambda x: abs(x - page_number))[
+                self.max_cached_pages :
+            ]:
+                del self.pages[number]
+                del self.bounds[number]
+
+    async def get_page(self, page_number: int) -> list[BallInstanceView]:
+        if page_number not in self.pages:
+            await self._load(page_number)
+        page = self.pages.get(page_number)
+        if page is None:
+            if page_number > 0:
+                # the total was overestimated, it is corrected for the next pages
+                raise IndexError(page_number)
+            return []
+        return page
+
+    async def format_page(self, menu: CountryballsSelector, balls: List[BallInstanceView]):
+        self.set_entities(balls)
         menu.set_options(balls)
         return True  # signal to edit the page
 
 
 class CountryballsSelector(Pages):
-    def __init__(self, interaction: discord.Interaction["BallsDexBot"], balls: List[BallInstance]):
+    source: EntityPageSource
+
+    def __init__(
+        self,
+        interaction: discord.Interaction["BallsDexBot"],
+        balls: List[BallInstance] | List[BallInstanceView] | EntityPageSource,
+    ):
         self.bot = interaction.client
-        source = CountryballsSource(balls)
+        source = balls if isinstance(balls, EntityPageSource) else CountryballsSource(balls)
         super().__init__(source, interaction=interaction)
         self.add_item(self.select_ball_menu)
 
-    def set_options(self, balls: List[BallInstance]):
+    def set_options(self, balls: List[BallInstance] | List[BallInstanceView]):
         options: List[discord.SelectOption] = []
         for ball in balls:
             emoji = self.bot.get_emoji(int(ball.countryball.emoji_id))
@@ -52,10 +251,13 @@ class CountryballsSelector(Pages):
     @discord.ui.select()
     async def select_ball_menu(self, interaction: discord.Interaction, item: discord.ui.Select):
         await interaction.response.defer(thinking=True)
-        ball_instance = await BallInstance.get(
-            id=int(interaction.data.get("values")[0])  # type: ignore
-        )
-        await self.ball_selected(interaction, ball_instance)
+        instances = await self.source.resolve([int(x) for x in item.values])
+        if not instances:
+            await interaction.followup.send(
+                f"This {settings.collectible_name} is no longer displayed.", ephemeral=True
+            )
+            return
+        await self.ball_selected(interaction, instances[0])
 
     async def ball_selected(self, interaction: discord.Interaction, ball_instance: BallInstance):
         raise NotImplementedError()
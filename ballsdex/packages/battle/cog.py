@@ -14,9 +14,11 @@ import io
 from ballsdex.core.models import (
     Ball,
     BallInstance,
+    BallInstanceView,
     Player
 )
 from ballsdex.core.models import balls as countryballs
+from ballsdex.core.utils.sessions import SessionRegistry
 from ballsdex.settings import settings
 
 from ballsdex.core.utils.transformers import (
@@ -24,10 +26,12 @@ from ballsdex.core.utils.transformers import (
     BallTransform
 )
 
+from ballsdex.packages.battle.odds import BattleOdds, odds_estimator
 from ballsdex.packages.battle.xe_battle_lib import (
     BattleBall,
+    BattleDeck,
     BattleInstance,
-    gen_battle,
+    run_battle,
 )
 
 if TYPE_CHECKING:
@@ -35,7 +39,8 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("ballsdex.packages.battle")
 
-battles = []
+# ongoing battles, keyed by the ID of both users
+battles: SessionRegistry["GuildBattle"] = SessionRegistry()
 
 @dataclass
 class GuildBattle:
@@ -49,23 +54,39 @@ class GuildBattle:
 
     battle: BattleInstance = field(default_factory=BattleInstance)
 
+    # estimated odds of the current decks, computed in the background
+    odds: BattleOdds | None = None
+    odds_task: asyncio.Task | None = None
 
-def gen_deck(balls) -> str:
-    """Generates a text representation of the player's deck."""
+
+def gen_deck(balls: BattleDeck) -> str:
+    """Generates a text representation of the player's deck, cached until the deck changes."""
     if not balls:
         return "Empty"
-    deck = "\n".join(
-        [
-            f"- {ball.emoji} {ball.name} (HP: {ball.health} | DMG: {ball.attack})"
-            for ball in balls
-        ]
-    )
-    if len(deck) > 1024:
-        return deck[0:941] + f'\nTotal: {len(balls)}'
+    if balls.rendered is not None:
+        return balls.rendered
+    lines = []
+    length = -1
+    # only render the lines that fit in the field
+    for ball in balls:
+        lines.append(f"- {ball.emoji} {ball.name} (HP: {ball.health} | DMG: {ball.attack})")
+        length += len(lines[-1]) + 1
+        if length > 1024:
+            break
+    deck = "\n".join(lines)
+    if length > 1024:
+        deck = deck[0:941] + f'\nTotal: {len(balls)}'
+    balls.rendered = deck
     return deck
 
 def update_embed(
-    author_balls, opponent_balls, author, opponent, author_ready, opponent_ready
+    author_balls,
+    opponent_balls,
+    author,
+    opponent,
+    author_ready,
+    opponent_ready,
+    odds: BattleOdds | None = None,
 ) -> discord.Embed:
     """Creates an embed for the battle setup phase."""
     embed = discord.Embed(
@@ -91,6 +112,15 @@ def update_embed(
         value=gen_deck(opponent_balls),
         inline=True,
     )
+    if odds is not None:
+        embed.add_field(
+            name="Estimated odds:",
+            value=(
+                f"{author}: {odds.p1_win:.0%} | {opponent}: {odds.p2_win:.0%} | "
+                f"Draw: {odds.draw:.0%}\nAverage length: {odds.turns:.0f} turns"
+            ),
+            inline=False,
+        )
     return embed
 
 
@@ -118,16 +148,7 @@ def fetch_battle(user: discord.User | discord.Member):
     user: discord.User | discord.Member
         The user you want to fetch the battle from.
     """
-    found_battle = None
-
-    for battle in battles:
-        if user not in (battle.author, battle.opponent):
-            continue
-
-        found_battle = battle
-        break
-
-    return found_battle
+    return battles.get(user.id)
 
 
 class Battle(commands.GroupCog):
@@ -142,6 +163,40 @@ class Battle(commands.GroupCog):
         name='bulk', description='Bulk commands for battle'
     )
 
+    def refresh_odds(self, guild_battle: GuildBattle):
+        """
+        Estimate the odds of the battle in the background, then show them on the battle embed.
+        """
+        if guild_battle.odds_task is not None:
+            guild_battle.odds_task.cancel()
+        guild_battle.odds = None
+        guild_battle.odds_task = asyncio.create_task(self.show_odds(guild_battle))
+
+    async def show_odds(self, guild_battle: GuildBattle):
+        try:
+            odds = await odds_estimator.estimate(
+                guild_battle.battle.p1_balls, guild_battle.battle.p2_balls
+            )
+            # the battle may have started or been cancelled in the meantime
+            if odds is None or fetch_battle(guild_battle.author) is not guild_battle:
+                return
+            guild_battle.odds = odds
+            await guild_battle.interaction.edit_original_response(
+                embed=update_embed(
+                    guild_battle.battle.p1_balls,
+                    guild_battle.battle.p2_balls,
+                    guild_battle.author.name,
+                    guild_battle.opponent.name,
+                    guild_battle.author_ready,
+                    guild_battle.opponent_ready,
+                    odds,
+                )
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Failed to estimate the odds of a battle")
+
     async def start_battle(self, interaction: discord.Interaction):
         guild_battle = fetch_battle(interaction.user)
 
@@ -166,7 +221,12 @@ class Battle(commands.GroupCog):
                 )
                 return
             new_view = create_disabled_buttons()
-            battle_log = "\n".join(gen_battle(guild_battle.battle))
+            # unregister first so that the battle cannot be started twice while it runs
+            battles.remove(guild_battle)
+            await interaction.response.defer()
+            # large decks take a while to simulate, keep it off the event loop
+            result = await asyncio.to_thread(run_battle, guild_battle.battle)
+            battle_log = await asyncio.to_thread(result.log.render)
 
             embed = discord.Embed(
                 title=f"{settings.plural_collectible_name.title()} Battle Plan",
@@ -188,9 +248,8 @@ class Battle(commands.GroupCog):
                 value=f"{guild_battle.battle.winner} - Turn: {guild_battle.battle.turns}",
                 inline=False,
             )
-            embed.set_footer(text="Battle log is attached.")
+            embed.set_footer(text=f"Battle log is attached. Seed: {result.seed}")
 
-            await interaction.response.defer()
             await interaction.message.edit(
                 content=f"{guild_battle.author.mention} vs {guild_battle.opponent.mention}",
                 embed=embed,
@@ -199,7 +258,6 @@ class Battle(commands.GroupCog):
                     discord.File(io.StringIO(battle_log), filename="battle-log.txt")
                 ],
             )
-            battles.pop(battles.index(guild_battle))
         else:
             # One player is ready, waiting for the other player
 
@@ -207,34 +265,14 @@ class Battle(commands.GroupCog):
                 f"Done! Waiting for the other player to press 'Ready'.", ephemeral=True
             )
 
-            author_emoji = (
-                ":white_check_mark:" if interaction.user == guild_battle.author else ""
-            )
-            opponent_emoji = (
-                ":white_check_mark:"
-                if interaction.user == guild_battle.opponent
-                else ""
-            )
-
-            embed = discord.Embed(
-                title=f"{settings.plural_collectible_name.title()} Battle Plan",
-                description=(
-                    f"Add or remove {settings.plural_collectible_name} you want to propose to the other player using the "
-                    "'/battle add' and '/battle remove' commands. Once you've finished, "
-                    "click the tick button to start the battle."
-                ),
-                color=discord.Colour.blurple(),
-            )
-
-            embed.add_field(
-                name=f"{author_emoji} {guild_battle.author.name}'s deck:",
-                value=gen_deck(guild_battle.battle.p1_balls),
-                inline=True,
-            )
-            embed.add_field(
-                name=f"{opponent_emoji} {guild_battle.opponent.name}'s deck:",
-                value=gen_deck(guild_battle.battle.p2_balls),
-                inline=True,
+            embed = update_embed(
+                guild_battle.battle.p1_balls,
+                guild_battle.battle.p2_balls,
+                guild_battle.author.name,
+                guild_battle.opponent.name,
+                guild_battle.author_ready,
+                guild_battle.opponent_ready,
+                guild_battle.odds,
             )
 
             await guild_battle.interaction.edit_original_response(embed=embed)
@@ -270,7 +308,7 @@ class Battle(commands.GroupCog):
             pass
 
         await interaction.message.edit(embed=embed, view=create_disabled_buttons())
-        battles.pop(battles.index(guild_battle))
+        battles.remove(guild_battle)
 
     @app_commands.command()
     async def start(self, interaction: discord.Interaction, opponent: discord.Member):
@@ -306,7 +344,9 @@ class Battle(commands.GroupCog):
             )
             return
         
-        battles.append(GuildBattle(interaction, interaction.user, opponent))
+        battles.add(
+            GuildBattle(interaction, interaction.user, opponent), interaction.user.id, opponent.id
+        )
 
         embed = update_embed([], [], interaction.user.name, opponent.name, False, False)
 
@@ -364,9 +404,15 @@ class Battle(commands.GroupCog):
             if interaction.user == guild_battle.author
             else guild_battle.battle.p2_balls
         )
-        # Create the BattleBall instance
-
         for countryball in countryballs:
+            # Check if ball has already been added
+
+            if countryball.id in user_balls:
+                yield True
+                continue
+
+            # Create the BattleBall instance
+
             ball = BattleBall(
                 countryball.countryball.country,
                 interaction.user.name,
@@ -374,14 +420,7 @@ class Battle(commands.GroupCog):
                 countryball.attack,
                 self.bot.get_emoji(countryball.countryball.emoji_id),
             )
-
-            # Check if ball has already been added
-
-            if ball in user_balls:
-                yield True
-                continue
-            
-            user_balls.append(ball)
+            user_balls.add(countryball.id, ball)
             yield False
 
         # Update the battle embed for both players
@@ -396,6 +435,7 @@ class Battle(commands.GroupCog):
                 guild_battle.opponent_ready,
             )
         )
+        self.refresh_odds(guild_battle)
 
     async def remove_balls(self, interaction: discord.Interaction, countryballs):
         guild_battle = fetch_battle(interaction.user)
@@ -428,25 +468,10 @@ class Battle(commands.GroupCog):
             if interaction.user == guild_battle.author
             else guild_battle.battle.p2_balls
         )
-        # Create the BattleBall instance
-
         for countryball in countryballs:
-            ball = BattleBall(
-                countryball.countryball.country,
-                interaction.user.name,
-                countryball.health,
-                countryball.attack,
-                self.bot.get_emoji(countryball.countryball.emoji_id),
-            )
-
-            # Check if ball has already been added
+            # Check if ball is in the deck
 
-            if ball not in user_balls:
-                yield True
-                continue
-            
-            user_balls.remove(ball)
-            yield False
+            yield not user_balls.remove(countryball.id)
 
         # Update the battle embed for both players
 
@@ -460,6 +485,7 @@ class Battle(commands.GroupCog):
                 guild_battle.opponent_ready,
             )
         )
+        self.refresh_odds(guild_battle)
 
     @app_commands.command()
     async def add(
@@ -549,7 +575,7 @@ class Battle(commands.GroupCog):
         Adds all your countryballs to a battle.
         """
         player, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        balls = await BallInstance.filter(player=player)
+        balls = await BallInstanceView.fetch(BallInstance.filter(player=player))
 
         count = 0
         async for dupe in self.add_balls(interaction, balls):
@@ -568,7 +594,7 @@ class Battle(commands.GroupCog):
         Removes all your countryballs from a battle.
         """
         player, _ = await Player.get_or_create(discord_id=interaction.user.id)
-        balls = await BallInstance.filter(player=player)
+        balls = await BallInstanceView.fetch(BallInstance.filter(player=player))
 
         count = 0
         async for not_in_battle in self.remove_balls(interaction, balls):
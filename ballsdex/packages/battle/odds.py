@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import logging
+import random
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
+from cachetools import LRUCache
+
+from ballsdex.packages.battle.xe_battle_lib import (
+    DAMAGE_RANGE,
+    MISS_CHANCE,
+    STALEMATE_ROUNDS,
+    BattleBall,
+    simulate,
+)
+
+log = logging.getLogger("ballsdex.packages.battle.odds")
+
+__all__ = ("BattleOdds", "OddsEstimator", "odds_estimator")
+
+# battles simulated for an estimate
+SIMULATIONS = 2000
+# minimum number of battles simulated for large decks
+MIN_SIMULATIONS = 200
+# the cost of a simulation grows with the square of the deck sizes, the number of simulations
+# is lowered for large decks to stay under this many ball updates
+WORK_BUDGET = 50_000_000
+# decks with more balls than this in total are not estimated
+MAX_BALLS = 500
+
+
+@dataclass(frozen=True)
+class BattleOdds:
+    """
+    Outcome of a battle estimated from simulations.
+    """
+
+    p1_win: float
+    p2_win: float
+    draw: float
+    turns: float
+    """Average number of turns of a battle."""
+    simulations: int
+
+
+def fingerprint(p1_balls: list[BattleBall], p2_balls: list[BattleBall]) -> bytes:
+    """
+    Digest of the stats of both decks, in order. Decks with the same fingerprint have the same
+    odds, whatever the names of the balls.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for balls in (p1_balls, p2_balls):
+        digest.update(len(balls).to_bytes(8, "little"))
+        digest.update(array("q", (x.health for x in balls)).tobytes())
+        digest.update(array("q", (x.attack for x in balls)).tobytes())
+    return digest.digest()
+
+
+def estimate_reference(
+    p1_balls: list[BattleBall],
+    p2_balls: list[BattleBall],
+    simulations: int,
+    seed: int | None = None,
+) -> BattleOdds:
+    """
+    Estimate the odds of a battle by running the battle engine repeatedly.
+
+    This is the reference for `estimate_vectorized`, both must give the same odds.
+    """
+    rng = random.Random(seed)
+    wins = [0, 0]
+    turns = 0
+    for _ in range(simulations):
+        result = simulate(p1_balls, p2_balls, rng=rng)
+        if result.winner is not None:
+            wins[result.winner] += 1
+        turns += result.turns
+    return BattleOdds(
+        wins[0] / simulations,
+        wins[1] / simulations,
+        (simulations - wins[0] - wins[1]) / simulations,
+        turns / simulations,
+        simulations,
+    )
+
+
+def estimate_vectorized(
+    p1_balls: list[BattleBall],
+    p2_balls: list[BattleBall],
+    simulations: int,
+    seed: int | None = None,
+) -> BattleOdds:
+    """
+    Estimate the odds of a battle by running many battles at once with NumPy.
+
+    The battles advance in lockstep, one attack at a time, following the same rules as
+    `xe_battle_lib.simulate`: each battle keeps the pair of the current round and the side
+    about to attack, and a snapshot of the balls alive at the start of the round.
+    """
+    if all(x.attack <= 0 for x in p1_balls) and all(x.attack <= 0 for x in p2_balls):
+        return BattleOdds(0, 0, 1, 0, simulations)
+
+    rng = np.random.default_rng(seed)
+    low, high = DAMAGE_RANGE
+    count = simulations
+    decks = (p1_balls, p2_balls)
+    attack = [np.array([x.attack for x in balls], dtype=np.int64) for balls in decks]
+    health = [
+        np.tile(np.maximum(np.array([x.health for x in balls], dtype=np.int64), 0), (count, 1))
+        for balls in decks
+    ]
+    alive = [x > 0 for x in health]
+    alive_count = [x.sum(axis=1) for x in alive]
+    # balls alive at the start of the round, in deck order
+    order = [np.zeros(x.shape, dtype=np.int64) for x in health]
+
+    # -1 while the battle runs, then the winning side, or 2 for a draw
+    winner = np.full(count, -1, dtype=np.int64)
+    winner[alive_count[1] == 0] = 0
+    winner[alive_count[0] == 0] = 1
+    turns = np.zeros(count, dtype=np.int64)
+    pair = np.zeros(count, dtype=np.int64)
+    pairs = np.zeros(count, dtype=np.int64)
+    side = np.zeros(count, dtype=np.int64)
+    idle_rounds = np.zeros(count, dtype=np.int64)
+    damage_dealt = np.ones(count, dtype=bool)
+    new_round = np.ones(count, dtype=bool)
+
+    def advance(battles, attacker_side: int):
+        # the second ball of a pair attacked, move on to the next pair
+        if attacker_side == 0:
+            side[battles] = 1
+        else:
+            pair[battles] += 1
+            side[battles] = 0
+
+    while True:
+        running = np.flatnonzero((winner == -1) & new_round)
+        if running.size:
+            idle_rounds[running] = np.where(damage_dealt[running], 0, idle_rounds[running] + 1)
+            winner[running[idle_rounds[running] >= STALEMATE_ROUNDS]] = 2
+            running = running[winner[running] == -1]
+            pairs[running] = np.minimum(alive_count[0][running], alive_count[1][running])
+            for i in (0, 1):
+                order[i][running] = np.argsort(~alive[i][running], axis=1, kind="stable")
+            pair[running] = 0
+            side[running] = 0
+            damage_dealt[running] = False
+            new_round[running] = False
+
+        running = np.flatnonzero(winner == -1)
+        if not running.size:
+            break
+        for current in (0, 1):
+            enemy = 1 - current
+            battles = running[side[running] == current]
+            attackers = order[current][battles, pair[battles]]
+
+            # a ball killed earlier in the round does not attack
+            dead = ~alive[current][battles, attackers]
+            advance(battles[dead], current)
+            battles, attackers = battles[~dead], attackers[~dead]
+            turns[battles] += 1
+
+            # a miss ends the pair
+            missed = rng.random(battles.size) < MISS_CHANCE
+            advance(battles[missed], 1)
+            battles, attackers = battles[~missed], attackers[~missed]
+
+            # pick a random alive enemy, the n-th alive ball is the first reaching n in the
+            # cumulative count of alive balls
+            position = (rng.random(battles.size) * alive_count[enemy][battles]).astype(np.int64)
+            cumulative = np.cumsum(alive[enemy][battles], axis=1)
+            targets = np.argmax(cumulative > position[:, None], axis=1)
+
+            factor = low + (high - low) * rng.random(battles.size)
+            damage = np.trunc(attack[current][attackers] * factor).astype(np.int64)
+            damage_dealt[battles] |= damage > 0
+            remaining = health[enemy][battles, targets] - damage
+            killed = remaining <= 0
+            health[enemy][battles, targets] = np.where(killed, 0, remaining)
+            alive[enemy][battles[killed], targets[killed]] = False
+            alive_count[enemy][battles] -= killed
+
+            won = alive_count[enemy][battles] == 0
+            winner[battles[won]] = current
+            advance(battles[~won], current)
+
+        new_round[running] = pair[running] >= pairs[running]
+
+    return BattleOdds(
+        float(np.mean(winner == 0)),
+        float(np.mean(winner == 1)),
+        float(np.mean(winner == 2)),
+        float(np.mean(turns)),
+        simulations,
+    )
+
+
+class OddsEstimator:
+    """
+    Estimate the odds of battles off the event loop, caching the estimates by deck fingerprint.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.cache: LRUCache[bytes, BattleOdds] = LRUCache(maxsize)
+        self.pending: dict[bytes, asyncio.Future[BattleOdds]] = {}
+
+    @staticmethod
+    def simulations(p1_balls: list[BattleBall], p2_balls: list[BattleBall]) -> int:
+        size = len(p1_balls) + len(p2_balls)
+        return max(MIN_SIMULATIONS, min(SIMULATIONS, WORK_BUDGET // size**2))
+
+    @staticmethod
+    def compute(p1_balls: list[BattleBall], p2_balls: list[BattleBall]) -> BattleOdds:
+        simulations = OddsEstimator.simulations(p1_balls, p2_balls)
+        return estimate_vectorized(p1_balls, p2_balls, simulations)
+
+    async def estimate(
+        self, p1_balls: list[BattleBall], p2_balls: list[BattleBall]
+    ) -> BattleOdds | None:
+        """
+        Return the estimated odds of a battle between two decks, or `None` if a deck is empty
+        or the decks are too large to be estimated.
+        """
+        if not p1_balls or not p2_balls or len(p1_balls) + len(p2_balls) > MAX_BALLS:
+            return None
+        key = fingerprint(p1_balls, p2_balls)
+        if (odds := self.cache.get(key)) is not None:
+            return odds
+        if (future := self.pending.get(key)) is None:
+            # copy the decks, they may change while the estimate runs
+            future = asyncio.ensure_future(
+                asyncio.to_thread(self.compute, list(p1_balls), list(p2_balls))
+            )
+            self.pending[key] = future
+            future.add_done_callback(lambda _: self.pending.pop(key, None))
+        odds = await asyncio.shield(future)
+        self.cache[key] = odds
+        return odds
+
+
+odds_estimator = OddsEstimator()
+
+
+# cross-check of the vectorized estimate against the battle engine
+
+
+if __name__ == "__main__":
+    p1 = [
+        BattleBall("Republic of China", "eggum", 3120, 567),
+        BattleBall("German Empire", "eggum", 2964, 784),
+        BattleBall("United States", "eggum", 2850, 1309),
+    ]
+    p2 = [
+        BattleBall("United Kingdom", "xen64", 2875, 763),
+        BattleBall("Israel", "xen64", 1961, 737),
+        BattleBall("Soviet Union", "xen64", 2525, 864),
+    ]
+    print(f"Reference:  {estimate_reference(p1, p2, 20000, seed=0)}")
+    print(f"Vectorized: {estimate_vectorized(p1, p2, 20000, seed=0)}")
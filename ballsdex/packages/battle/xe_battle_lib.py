@@ -1,5 +1,19 @@
-from dataclasses import dataclass, field
 import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+# chance for an attack to miss
+MISS_CHANCE = 31 / 101
+# damage is the attack of the ball multiplied by a random factor in this range
+DAMAGE_RANGE = (0.8, 1.2)
+# the battle ends in a draw after this many rounds without any damage dealt
+STALEMATE_ROUNDS = 100
+
+# kinds of battle events
+MISS = 0
+HIT = 1
+KILL = 2
 
 
 @dataclass
@@ -12,99 +26,311 @@ class BattleBall:
     dead: bool = False
 
 
+class BattleDeck:
+    """
+    Deck of a battle, keyed by the ID of the ball instances in the order they were added.
+
+    Adding, removing and looking up a ball are constant time. The list of balls and the text
+    rendering of the deck are cached until the deck changes.
+
+    Parameters
+    ----------
+    balls: Iterable[tuple[int, BattleBall]]
+        Initial balls of the deck, with the ID of their instance.
+    """
+
+    def __init__(self, balls: Iterable[tuple[int, BattleBall]] = ()):
+        self.balls: dict[int, BattleBall] = dict(balls)
+        self._list: list[BattleBall] | None = None
+        # text rendering of the deck, cached by the battle cog
+        self.rendered: str | None = None
+
+    def __len__(self) -> int:
+        return len(self.balls)
+
+    def __iter__(self) -> Iterator[BattleBall]:
+        return iter(self.balls.values())
+
+    def __contains__(self, pk: int) -> bool:
+        return pk in self.balls
+
+    def add(self, pk: int, ball: BattleBall) -> bool:
+        """
+        Add a ball to the deck. Returns `False` if its instance is already in the deck.
+        """
+        if pk in self.balls:
+            return False
+        self.balls[pk] = ball
+        self.changed()
+        return True
+
+    def remove(self, pk: int) -> bool:
+        """
+        Remove a ball from the deck. Returns `False` if its instance is not in the deck.
+        """
+        if self.balls.pop(pk, None) is None:
+            return False
+        self.changed()
+        return True
+
+    def changed(self):
+        """
+        Clear the cached data of the deck, must be called after changing the balls.
+        """
+        self._list = None
+        self.rendered = None
+
+    def to_list(self) -> list[BattleBall]:
+        if self._list is None:
+            self._list = list(self.balls.values())
+        return self._list
+
+
 @dataclass
 class BattleInstance:
-    p1_balls: list = field(default_factory=list)
-    p2_balls: list = field(default_factory=list)
+    p1_balls: BattleDeck = field(default_factory=BattleDeck)
+    p2_balls: BattleDeck = field(default_factory=BattleDeck)
     winner: str = ""
     turns: int = 0
+    # seed of the last simulation, replaying the same decks with it gives the same battle
+    seed: int | None = None
 
 
-def get_damage(ball):
-    return int(ball.attack * random.uniform(0.8, 1.2))
+class BattleLog:
+    """
+    Compact log of a battle, stored as flat integers and only rendered to text on demand.
 
+    Each event is stored as `(turn, kind, side, attacker, target, damage)`, where `side` is the
+    attacking side (0 or 1) and `attacker` and `target` are indexes in the decks.
+    """
 
-def attack(current_ball, enemy_balls):
-    alive_balls = [ball for ball in enemy_balls if not ball.dead]
-    enemy = random.choice(alive_balls)
+    FIELDS = 6
 
-    attack_dealt = get_damage(current_ball)
-    enemy.health -= attack_dealt
+    def __init__(self, p1_balls: list[BattleBall], p2_balls: list[BattleBall]):
+        self.decks = (p1_balls, p2_balls)
+        self.events = array("q")
+        self.stalemate = False
 
-    if enemy.health <= 0:
-        enemy.health = 0
-        enemy.dead = True
-    if enemy.dead:
-        gen_text = f"{current_ball.owner}'s {current_ball.name} has killed {enemy.owner}'s {enemy.name}"
-    else:
-        gen_text = f"{current_ball.owner}'s {current_ball.name} has dealt {attack_dealt} damage to {enemy.owner}'s {enemy.name}"
-    return gen_text
+    def __len__(self) -> int:
+        return len(self.events) // self.FIELDS
 
+    def add(self, turn: int, kind: int, side: int, attacker: int, target: int, damage: int = 0):
+        self.events.extend((turn, kind, side, attacker, target, damage))
 
-def random_events():
-    if random.randint(0, 100) <= 30: # miss
-        return 1
-    else:
-        return 0
+    def __iter__(self) -> Iterator[str]:
+        if not self.events and not self.stalemate:
+            yield "Everyone stared at each other, resulting in nobody winning."
+            return
+        events = self.events
+        for i in range(0, len(events), self.FIELDS):
+            turn, kind, side, attacker, target, damage = events[i : i + self.FIELDS]
+            current = self.decks[side][attacker]
+            enemy = self.decks[1 - side][target]
+            if kind == MISS:
+                text = f"{current.owner}'s {current.name} missed {enemy.owner}'s {enemy.name}"
+            elif kind == KILL:
+                text = f"{current.owner}'s {current.name} has killed {enemy.owner}'s {enemy.name}"
+            else:
+                text = (
+                    f"{current.owner}'s {current.name} has dealt {damage} damage to "
+                    f"{enemy.owner}'s {enemy.name}"
+                )
+            yield f"Turn {turn}: {text}"
+        if self.stalemate:
+            yield "Nobody could deal any damage anymore, resulting in nobody winning."
+
+    def render(self) -> str:
+        return "\n".join(self)
 
 
-def gen_battle(battle: BattleInstance):
-    turn = 0  # Initialize turn counter
+@dataclass
+class BattleResult:
+    winner: int | None
+    """Winning side (0 or 1), `None` for a draw."""
+    turns: int
+    seed: int | None
+    """Seed of the random generator, `None` if a generator was given."""
+    log: BattleLog
+    health: tuple[list[int], list[int]]
+    """Remaining health of each ball, by side."""
 
-    # Continue the battle if both players have at least one alive ball.
-    # End the battle if all balls do less than 1 damage.
 
-    if all(
-        ball.attack <= 0 for ball in battle.p1_balls + battle.p2_balls
-    ):
-        yield (
-            "Everyone stared at each other, "
-            "resulting in nobody winning."
-        )
-        return
+class _Side:
+    """
+    State of one side of a battle, kept in flat arrays indexed by position in the deck.
 
-    while any(ball for ball in battle.p1_balls if not ball.dead) and any(
-        ball for ball in battle.p2_balls if not ball.dead
-    ):
-        alive_p1_balls = [ball for ball in battle.p1_balls if not ball.dead]
-        alive_p2_balls = [ball for ball in battle.p2_balls if not ball.dead]
+    Alive balls are tracked twice: in a doubly linked list keeping the deck order, to pair
+    the balls of each round, and in a dense pool with swap removal, to pick random targets.
+    Both are updated in constant time when a ball dies.
+    """
 
-        for p1_ball, p2_ball in zip(alive_p1_balls, alive_p2_balls):
-            # Player 1 attacks first
+    __slots__ = ("health", "attack", "next", "prev", "head", "pool", "where")
 
-            if not p1_ball.dead:
-                turn += 1
+    def __init__(self, balls: list[BattleBall]):
+        count = len(balls)
+        self.health = array("q", (x.health for x in balls))
+        self.attack = array("q", (x.attack for x in balls))
+        # -1 marks the ends of the linked list
+        self.next = array("q", range(1, count + 1))
+        self.prev = array("q", range(-1, count - 1))
+        if count:
+            self.next[-1] = -1
+        self.head = 0 if count else -1
+        self.pool = array("q", range(count))
+        self.where = array("q", range(count))
+        # balls without health are dead from the start
+        for i in range(count):
+            if self.health[i] <= 0:
+                self.health[i] = 0
+                self.kill(i)
 
-                event = random_events()
-                if event == 1:
-                    yield f"Turn {turn}: {p1_ball.owner}'s {p1_ball.name} missed {p2_ball.owner}'s {p2_ball.name}"
-                    continue
-                yield f"Turn {turn}: {attack(p1_ball, battle.p2_balls)}"
+    def alive(self) -> int:
+        return len(self.pool)
 
-                if all(ball.dead for ball in battle.p2_balls):
-                    break
-            # Player 2 attacks
-            
-            if not p2_ball.dead:
-                turn += 1
+    def first(self, count: int) -> list[int]:
+        """
+        Indexes of the first `count` alive balls, in deck order.
+        """
+        result = []
+        i = self.head
+        while i != -1 and len(result) < count:
+            result.append(i)
+            i = self.next[i]
+        return result
 
-                event = random_events()
-                if event == 1:
-                    yield f"Turn {turn}: {p2_ball.owner}'s {p2_ball.name} missed {p1_ball.owner}'s {p1_ball.name}"
-                    continue
-                yield f"Turn {turn}: {attack(p2_ball, battle.p1_balls)}"
+    def kill(self, i: int):
+        prev, next = self.prev[i], self.next[i]
+        if prev == -1:
+            self.head = next
+        else:
+            self.next[prev] = next
+        if next != -1:
+            self.prev[next] = prev
+        # swap with the last of the pool
+        position, last = self.where[i], self.pool[-1]
+        self.pool[position] = last
+        self.where[last] = position
+        self.pool.pop()
+        self.where[i] = -1
+
+    def is_alive(self, i: int) -> bool:
+        return self.where[i] != -1
+
+
+def simulate(
+    p1_balls: list[BattleBall],
+    p2_balls: list[BattleBall],
+    *,
+    seed: int | None = None,
+    rng: random.Random | None = None,
+) -> BattleResult:
+    """
+    Simulate a battle between two decks. The decks are not modified.
+
+    Each round pairs the alive balls of both decks in order. In each pair, the ball of the
+    first player attacks a random alive enemy, then the ball of the second player does, unless
+    the first one missed. The battle ends when a side has no ball alive.
 
-                if all(ball.dead for ball in battle.p1_balls):
+    Parameters
+    ----------
+    p1_balls: list[BattleBall]
+        Deck of the first player, who attacks first.
+    p2_balls: list[BattleBall]
+        Deck of the second player.
+    seed: int | None
+        Seed of the random generator. A random seed is picked and returned if omitted, the
+        same seed and decks always give the same battle.
+    rng: random.Random | None
+        Random generator to use instead of a seeded one.
+    """
+    if rng is None:
+        if seed is None:
+            seed = random.randrange(2**63)
+        rng = random.Random(seed)
+    else:
+        seed = None
+    sides = (_Side(p1_balls), _Side(p2_balls))
+    log = BattleLog(p1_balls, p2_balls)
+    result = BattleResult(None, 0, seed, log, (list(sides[0].health), list(sides[1].health)))
+
+    if all(x.attack <= 0 for x in p1_balls) and all(x.attack <= 0 for x in p2_balls):
+        return result
+
+    low, high = DAMAGE_RANGE
+    random_float = rng.random
+    turn = 0
+    idle_rounds = 0
+    while sides[0].alive() and sides[1].alive():
+        count = min(sides[0].alive(), sides[1].alive())
+        pairs = zip(sides[0].first(count), sides[1].first(count))
+        damage_dealt = False
+        for pair in pairs:
+            for side in (0, 1):
+                current, enemy = sides[side], sides[1 - side]
+                attacker = pair[side]
+                if not current.is_alive(attacker):
+                    continue
+                turn += 1
+                if random_float() < MISS_CHANCE:
+                    log.add(turn, MISS, side, attacker, pair[1 - side])
+                    # a miss of the first player ends the pair
                     break
-    # Determine the winner
+                target = enemy.pool[int(random_float() * len(enemy.pool))]
+                damage = int(current.attack[attacker] * (low + (high - low) * random_float()))
+                if damage > 0:
+                    damage_dealt = True
+                health = enemy.health[target] - damage
+                if health <= 0:
+                    enemy.health[target] = 0
+                    enemy.kill(target)
+                    log.add(turn, KILL, side, attacker, target, damage)
+                    if not enemy.alive():
+                        break
+                else:
+                    enemy.health[target] = health
+                    log.add(turn, HIT, side, attacker, target, damage)
+            if not sides[0].alive() or not sides[1].alive():
+                break
+
+        idle_rounds = 0 if damage_dealt else idle_rounds + 1
+        if idle_rounds >= STALEMATE_ROUNDS:
+            log.stalemate = True
+            break
+
+    if not sides[0].alive():
+        result.winner = 1
+    elif not sides[1].alive():
+        result.winner = 0
+    result.turns = turn
+    result.health = (list(sides[0].health), list(sides[1].health))
+    return result
+
+
+def run_battle(battle: BattleInstance, seed: int | None = None) -> BattleResult:
+    """
+    Simulate a battle and update the instance with its outcome: the winner, the number of
+    turns, the seed and the remaining health of the balls.
+    """
+    decks = (battle.p1_balls.to_list(), battle.p2_balls.to_list())
+    result = simulate(*decks, seed=seed)
+    for balls, health in zip(decks, result.health):
+        for ball, value in zip(balls, health):
+            ball.health = value
+            ball.dead = value <= 0
+    battle.p1_balls.changed()
+    battle.p2_balls.changed()
+    if result.winner is not None:
+        battle.winner = decks[result.winner][0].owner
+    battle.turns = result.turns
+    battle.seed = result.seed
+    return result
 
-    if all(ball.dead for ball in battle.p1_balls):
-        battle.winner = battle.p2_balls[0].owner
-    elif all(ball.dead for ball in battle.p2_balls):
-        battle.winner = battle.p1_balls[0].owner
-    # Set turns
 
-    battle.turns = turn
+def gen_battle(battle: BattleInstance, seed: int | None = None) -> Iterator[str]:
+    """
+    Run a battle and yield the lines of its log.
+    """
+    yield from run_battle(battle, seed).log
 
 
 # test
@@ -112,21 +338,29 @@ def gen_battle(battle: BattleInstance):
 
 if __name__ == "__main__":
     battle = BattleInstance(
-        [
-            BattleBall("Republic of China", "eggum", 3120, 567),
-            BattleBall("German Empire", "eggum", 2964, 784),
-            BattleBall("United States", "eggum", 2850, 1309),
-        ],
-        [
-            BattleBall("United Kingdom", "xen64", 2875, 763),
-            BattleBall("Israel", "xen64", 1961, 737),
-            BattleBall("Soviet Union", "xen64", 2525, 864),
-        ],
+        BattleDeck(
+            enumerate(
+                [
+                    BattleBall("Republic of China", "eggum", 3120, 567),
+                    BattleBall("German Empire", "eggum", 2964, 784),
+                    BattleBall("United States", "eggum", 2850, 1309),
+                ]
+            )
+        ),
+        BattleDeck(
+            enumerate(
+                [
+                    BattleBall("United Kingdom", "xen64", 2875, 763),
+                    BattleBall("Israel", "xen64", 1961, 737),
+                    BattleBall("Soviet Union", "xen64", 2525, 864),
+                ]
+            )
+        ),
     )
 
     print(
-        f"Battle between {battle.p1_balls[0].owner} and {battle.p2_balls[0].owner} begins! - {battle.p1_balls[0].owner} begins"
+        f"Battle between {battle.p1_balls.to_list()[0].owner} and {battle.p2_balls.to_list()[0].owner} begins! - {battle.p1_balls.to_list()[0].owner} begins"
     )
     for attack_text in gen_battle(battle):
         print(attack_text)
-    print(f"Winner:\n{battle.winner} - Turn: {battle.turns}")
+    print(f"Winner:\n{battle.winner} - Turn: {battle.turns} - Seed: {battle.seed}")
@@ -31,6 +31,7 @@ FILENAME_RE = re.compile(r"^(.+)(\.\S+)$")
 from ballsdex.core.models import (
     Ball,
     BallInstance,
+    BallInstanceView,
     BlacklistedGuild,
     BlacklistedID,
     GuildConfig,
@@ -279,7 +280,7 @@ class Boss(commands.GroupCog):
             await self.start_next_round(output_channel)
 
 
-    async def auto_select_ball(self, user_id: int) -> BallInstance | None:
+    async def auto_select_ball(self, user_id: int) -> BallInstanceView | None:
         """
         Automatically select the best ball from user's inventory based on current round type.
         Returns the selected ball instance or None if no valid ball is found.
@@ -289,7 +290,9 @@ class Boss(commands.GroupCog):
             player, _ = await Player.get_or_create(discord_id=user_id)
             
             # Get all tradeable balls owned by the player
-            player_balls = await BallInstance.filter(player=player, tradeable=True)
+            player_balls = await BallInstanceView.fetch(
+                BallInstance.filter(player=player, tradeable=True)
+            )
             if not player_balls:
                 return None
                 
@@ -6,11 +6,13 @@ from tortoise.exceptions import DoesNotExist
 
 from typing import TYPE_CHECKING, Optional
 
-from ballsdex.core.models import BallInstance, Player, Special, specials, balls
+from ballsdex.core.models import BallInstance, Player, PlayerCollectionSummary, Special, specials, balls
+from ballsdex.core.utils.counters import instance_counters
 from ballsdex.core.utils.transformers import BallEnabledTransform
 from ballsdex.settings import settings
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
 from ballsdex.core.utils.logging import log_action
+from ballsdex.core.utils.query_stats import track_queries
 
 if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
@@ -104,7 +106,7 @@ class Collector(commands.GroupCog, name="claim"):
         if not emerald_special:
             return await interaction.followup.send("The 'Emerald' special is not configured in the bot. Contact an admin.", ephemeral=True)
 
-        if await BallInstance.filter(special=emerald_special, player__discord_id=interaction.user.id, ball=countryball).count() >= 1:
+        if await PlayerCollectionSummary.total(special=emerald_special, player__discord_id=interaction.user.id, ball=countryball) >= 1:
             return await interaction.followup.send(f"You already have a {countryball.country} emerald card.", ephemeral=True)
 
         collector_special = next((x for x in specials.values() if x.name == "Collector"), None)
@@ -114,8 +116,8 @@ class Collector(commands.GroupCog, name="claim"):
         if not all([collector_special, diamond_special, shiny_special]):
             return await interaction.followup.send("One or more required specials (Collector, Diamond, Shiny) are missing from the bot.", ephemeral=True)
 
-        has_collector = await BallInstance.filter(special=collector_special, player__discord_id=interaction.user.id, ball=countryball).count() >= 1
-        has_diamond = await BallInstance.filter(special=diamond_special, player__discord_id=interaction.user.id, ball=countryball).count() >= 1
+        has_collector = await PlayerCollectionSummary.total(special=collector_special, player__discord_id=interaction.user.id, ball=countryball) >= 1
+        has_diamond = await PlayerCollectionSummary.total(special=diamond_special, player__discord_id=interaction.user.id, ball=countryball) >= 1
 
         non_hidden_specials = [s for s in specials.values() if not s.hidden and s.name not in ["Collector", "Diamond", "Emerald", "Shiny"]]
         special_requirements = {}
@@ -123,9 +125,9 @@ class Collector(commands.GroupCog, name="claim"):
         required_shinies = 0
 
         for special in non_hidden_specials:
-            total_instances = await BallInstance.filter(special=special).count()
+            total_instances = await instance_counters.count(special=special)
             required_count = max(1, total_instances // 3)
-            user_count = await BallInstance.filter(special=special, player__discord_id=interaction.user.id).count()
+            user_count = await PlayerCollectionSummary.total(special=special, player__discord_id=interaction.user.id)
 
             if total_instances < 3:
                 required_shinies += 1
@@ -134,7 +136,7 @@ class Collector(commands.GroupCog, name="claim"):
 
             special_requirements[special.name] = {"required": required_count, "has": user_count}
 
-        user_shinies = await BallInstance.filter(special=shiny_special, player__discord_id=interaction.user.id, ball=countryball).count()
+        user_shinies = await PlayerCollectionSummary.total(special=shiny_special, player__discord_id=interaction.user.id, ball=countryball)
         if user_shinies < required_shinies:
             missing_requirements.append(f"{required_shinies} Extra Shiny {countryball.country}.")
 
@@ -179,14 +181,14 @@ class Collector(commands.GroupCog, name="claim"):
         checkfilter = {"special": special, "player__discord_id": interaction.user.id, "ball": countryball}
         
         await interaction.response.defer(ephemeral=True, thinking=True)
-        checkcounter = await BallInstance.filter(**checkfilter).count()
+        checkcounter = await PlayerCollectionSummary.total(**checkfilter)
         if checkcounter >= 1:
             return await interaction.followup.send(f"You already have a {countryball.country} {special_name.lower()} card.", ephemeral=True)
 
         filters["player__discord_id"] = interaction.user.id
         if required_special:
             filters["special"] = required_special
-        balls_count = await BallInstance.filter(**filters).count()
+        balls_count = await PlayerCollectionSummary.total(**filters)
         collector_number = int(int((gradient * (countryball.rarity - t1_rarity) + t1_req) / rounding_option) * rounding_option)
 
         player, _ = await Player.get_or_create(discord_id=interaction.user.id)
@@ -246,7 +248,10 @@ class Collector(commands.GroupCog, name="claim"):
         Automatically check for unmet Collector, Diamond, and Emerald cards, delete them, notify users, and log to channel.
         """
         await self.bot.wait_until_ready()  
+        with track_queries("collector.check_unmet_cards"):
+            await self._check_unmet_cards()
 
+    async def _check_unmet_cards(self):
         special_types = {
             "Collector": {"gradient": gradient, "t1_rarity": T1Rarity, "t1_req": T1Req, "rounding": RoundingOption, "req_special": None},
             "Diamond": {"gradient": dgradient, "t1_rarity": dT1Rarity, "t1_req": dT1Req, "rounding": dRoundingOption, "req_special": "Shiny"},
@@ -269,28 +274,28 @@ class Collector(commands.GroupCog, name="claim"):
             special = next((x for x in specials.values() if x.name == special_name), None)
             instances = await BallInstance.filter(special=special).prefetch_related("player", "ball")
             for instance in instances:
-                checkfilter = {"player__discord_id": instance.player.discord_id, "ball": instance.ball}
+                checkfilter = {"player_id": instance.player_id, "ball_id": instance.ball_id}
                 if config["req_special"]:
                     checkfilter["special"] = shiny_special
                 required_count = int(int((config["gradient"] * (instance.ball.rarity - config["t1_rarity"]) + config["t1_req"]) / config["rounding"]) * config["rounding"])
-                user_count = await BallInstance.filter(**checkfilter).count()
+                user_count = await PlayerCollectionSummary.total(**checkfilter)
                 if user_count < required_count:
                     unmet_cards[special_name].append(instance)
 
         non_hidden_specials = [s for s in specials.values() if not s.hidden and s.name not in ["Collector", "Diamond", "Emerald", "Shiny"]]
         emerald_instances = await BallInstance.filter(special=emerald_special).prefetch_related("player", "ball")
         for instance in emerald_instances:
-            has_collector = await BallInstance.filter(special=collector_special, player__discord_id=instance.player.discord_id, ball=instance.ball).count() >= 1
-            has_diamond = await BallInstance.filter(special=diamond_special, player__discord_id=instance.player.discord_id, ball=instance.ball).count() >= 1
+            has_collector = await PlayerCollectionSummary.total(special=collector_special, player_id=instance.player_id, ball_id=instance.ball_id) >= 1
+            has_diamond = await PlayerCollectionSummary.total(special=diamond_special, player_id=instance.player_id, ball_id=instance.ball_id) >= 1
             
             required_shinies = 0
             for s in non_hidden_specials:
-                if await BallInstance.filter(special=s).count() < 3:
+                if await instance_counters.count(special=s) < 3:
                     required_shinies += 1
             
-            user_shinies = await BallInstance.filter(special=shiny_special, player__discord_id=instance.player.discord_id, ball=instance.ball).count()
-            special_counts = {s.name: await BallInstance.filter(special=s, player__discord_id=instance.player.discord_id).count() for s in non_hidden_specials}
-            required_counts = {s.name: max(1, await BallInstance.filter(special=s).count() // 3) for s in non_hidden_specials if await BallInstance.filter(special=s).count() >= 3}
+            user_shinies = await PlayerCollectionSummary.total(special=shiny_special, player_id=instance.player_id, ball_id=instance.ball_id)
+            special_counts = {s.name: await PlayerCollectionSummary.total(special=s, player_id=instance.player_id) for s in non_hidden_specials}
+            required_counts = {s.name: max(1, await instance_counters.count(special=s) // 3) for s in non_hidden_specials if await instance_counters.count(special=s) >= 3}
 
             if not has_collector or not has_diamond or user_shinies < required_shinies or any(special_counts.get(name, 0) < req for name, req in required_counts.items()):
                 unmet_cards["Emerald"].append(instance)
@@ -11,7 +11,7 @@ from tortoise.transactions import atomic
 
 from typing import TYPE_CHECKING, Optional, cast, Dict, Any, Tuple
 
-from ballsdex.core.models import BallInstance, Player, Ball, specials
+from ballsdex.core.models import BallInstance, Player, PlayerCollectionSummary, Ball, specials
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
     BallTransform,
@@ -176,6 +176,14 @@ class Duos(commands.GroupCog):
                 progress_tracking[ball_name] = (0, 1 if is_boost else required_amount)
                 continue
 
+            # the summary is an upper bound of the available instances, if it's not enough
+            # there is no need to load them
+            required = 1 if is_boost else required_amount
+            owned = await PlayerCollectionSummary.total(player=player, ball=ball, special=None)
+            if owned < required:
+                progress_tracking[ball_name] = (owned, required)
+                continue
+
             # Get available regular instances of this ball
             instances = await BallInstance.filter(
                 player=player,
@@ -186,7 +194,6 @@ class Duos(commands.GroupCog):
             )
 
             current_amount = len(instances)
-            required = 1 if is_boost else required_amount
             progress_tracking[ball_name] = (current_amount, required)
             
             if current_amount >= required:
@@ -10,7 +10,7 @@ from discord.ext import commands
 from ballsdex.settings import settings
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
 from ballsdex.settings import settings
-from ballsdex.core.models import Player, BallInstance, specials, balls 
+from ballsdex.core.models import Player, PlayerCollectionSummary, specials, balls
 from ballsdex.packages.countryballs.countryball import CountryBall
 from ballsdex.core.utils.transformers import (
     BallTransform,
@@ -137,6 +137,16 @@ class gaPacks(commands.Cog):
         entries = []
         nothingcheck = ""
 
+        # one lookup for the whole collection, summed per countryball
+        filters = {"player__discord_id": interaction.user.id}
+        if special:
+            filters["special"] = special
+        owned_counts: dict[int, int] = {}
+        for ball_id, ball_count in await PlayerCollectionSummary.filter(**filters).values_list(
+            "ball_id", "count"
+        ):
+            owned_counts[ball_id] = owned_counts.get(ball_id, 0) + ball_count
+
         for collectible in sorted_collectibles:
             name = f"{collectible.country}"
             emoji = self.bot.get_emoji(collectible.emoji_id)
@@ -146,14 +156,7 @@ class gaPacks(commands.Cog):
             else:
                 emote = "N/A"
 
-            filters = {}
-            filters["ball"] = collectible
-            filters["player__discord_id"] = interaction.user.id
-            if special:
-                filters["special"] = special
-
-            count = await BallInstance.filter(**filters)
-            countNum = len(count)
+            countNum = owned_counts.get(collectible.pk, 0)
             # sorted_collectibles = sorted(enabled_collectibles.values(), key=lambda x: x.rarity)
             # if you want the Rarity to only show full numbers like 1 or 12 use the code part here:
             # rarity = int(collectible.rarity)
@@ -1,19 +1,18 @@
 import datetime
-from collections import defaultdict
 from typing import TYPE_CHECKING, Optional, cast, Dict, List, Tuple, Any
 import io
 import shutil
 import os
 import discord
-from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands
 from discord.utils import MISSING
 from tortoise.expressions import Q
-from ballsdex.core.models import BallInstance, Player, Ball, Economy
+from ballsdex.core.models import BallInstance, BallInstanceView, Player, Ball, Economy
 from ballsdex.core.models import Trade as TradeModel
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.sessions import SessionRegistry
 from ballsdex.core.utils.sorting import SortingChoices, sort_balls
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
@@ -207,19 +206,8 @@ class LineupViewButton(discord.ui.Button):
             
             # Load the lineup into the active session
             menu = LineupMenu(view.cog, interaction, manager)
-            guild_id = interaction.guild.id
-            channel_id = interaction.channel.id
-            
-            if guild_id not in view.cog.lineups:
-                view.cog.lineups[guild_id] = defaultdict(list)
-                
-            # Clear any existing lineups for this user in the channel
-            view.cog.lineups[guild_id][channel_id] = [
-                m for m in view.cog.lineups[guild_id][channel_id] 
-                if m.manager.user.id != interaction.user.id
-            ]
-            
-            view.cog.lineups[guild_id][channel_id].append(menu)
+            # Replaces any existing lineup for this user in the channel
+            view.cog.lineups.add(menu, (interaction.channel.id, interaction.user.id))
             
             # Generate and send the lineup
             image_io = await view.cog._generate_lineup_image(manager, bot=view.cog.bot)
@@ -466,7 +454,7 @@ class FormationSelectionView(discord.ui.View):
             menu = LineupMenu(
                 self.cog, interaction, LineupManager(interaction.user, player, self.selected_formation)
             )
-            self.cog.lineups[interaction.guild.id][interaction.channel.id].append(menu)
+            self.cog.lineups.add(menu, (interaction.channel.id, interaction.user.id))
             embed = discord.Embed(
                 title="Lineup creation started",
                 description=f"Formation: {self.selected_formation}",
@@ -505,10 +493,7 @@ class LineupMenu:
 
     async def user_cancel(self, manager: LineupManager):
         manager.cancelled = True
-        guild_id = self.interaction.guild_id
-        channel_id = self.interaction.channel_id
-        if guild_id in self.cog.lineups and channel_id in self.cog.lineups[guild_id]:
-            self.cog.lineups[guild_id][channel_id].remove(self)
+        self.cog.lineups.remove(self)
 
 class ForcePlacementView(discord.ui.View):
     def __init__(self, user: discord.Member, interaction: discord.Interaction, timeout: int = 60):
@@ -669,16 +654,8 @@ class LineupSelectionForCommandView(discord.ui.View):
                     logger.error(f"BallInstance with ID {data['ball_id']} not found for position {position}")
         
         menu = LineupMenu(self.cog, interaction, manager)
-        guild_id = interaction.guild.id
-        channel_id = interaction.channel.id
-        if guild_id not in self.cog.lineups:
-            self.cog.lineups[guild_id] = defaultdict(list)
-        # Clear any existing lineups for this user in the channel
-        self.cog.lineups[guild_id][channel_id] = [
-            m for m in self.cog.lineups[guild_id][channel_id] 
-            if m.manager.user.id != interaction.user.id
-        ]
-        self.cog.lineups[guild_id][channel_id].append(menu)
+        # Replaces any existing lineup for this user in the channel
+        self.cog.lineups.add(menu, (interaction.channel.id, interaction.user.id))
         
         await interaction.response.edit_message(
             content=f"Loaded lineup '{self.selected_lineup['name']}' for {self.command_type}.", 
@@ -690,7 +667,11 @@ class LineupSelectionForCommandView(discord.ui.View):
 class Lineup(commands.GroupCog):
     def __init__(self, bot: "BallsDexBot"):
         self.bot = bot
-        self.lineups: TTLCache[int, dict[int, list[LineupMenu]]] = TTLCache(maxsize=999999, ttl=1800)
+        # ongoing lineup creations, keyed by channel ID and user ID, dropped after 30 minutes
+        # without activity
+        self.lineups: SessionRegistry[LineupMenu] = SessionRegistry(
+            lambda x: x.manager.cancelled, ttl=1800
+        )
         self.POSITIONS = []
         self.db = LineupDatabase()
         self.resources_path = os.path.join(os.path.dirname(__file__), 'resources')
@@ -704,26 +685,15 @@ class Lineup(commands.GroupCog):
         channel: discord.TextChannel | None = None,
         user: discord.User | discord.Member = MISSING,
     ) -> tuple[LineupMenu, LineupManager] | tuple[None, None]:
-        guild: discord.Guild
         if interaction:
-            guild = cast(discord.Guild, interaction.guild)
             channel = cast(discord.TextChannel, interaction.channel)
             user = interaction.user
-        elif channel:
-            guild = channel.guild
-        else:
+        elif not channel:
             raise TypeError("Missing interaction or channel")
-        if guild.id not in self.lineups:
-            self.lineups[guild.id] = defaultdict(list)
-        if channel.id not in self.lineups[guild.id]:
+        lineup = self.lineups.get((channel.id, user.id))
+        if lineup is None:
             return (None, None)
-        for lineup in self.lineups[guild.id][channel.id]:
-            try:
-                lineup_manager = lineup._get_manager(user)
-                return (lineup, lineup_manager)
-            except RuntimeError:
-                continue
-        return (None, None)
+        return (lineup, lineup._get_manager(user))
 
     async def _generate_lineup_image(self, lineup_manager: LineupManager, bot: discord.Client = None) -> io.BytesIO:
         if not os.path.exists(self.field_png_path):
@@ -846,10 +816,6 @@ class Lineup(commands.GroupCog):
                 "You already have an ongoing lineup creation.", ephemeral=True
             )
             return
-        guild_id = interaction.guild.id
-        channel_id = interaction.channel.id
-        if guild_id not in self.lineups:
-            self.lineups[guild_id] = defaultdict(list)
         view = FormationSelectionView(self, interaction)
         await interaction.response.send_message(
             "Select a formation for your lineup:", 
@@ -1336,14 +1302,11 @@ class Lineup(commands.GroupCog):
             )
             return
         await interaction.response.defer(ephemeral=True)
-        player_balls = await BallInstance.filter(player__discord_id=interaction.user.id)
-        used_ball_ids = [ball.id for ball in lineup_manager.lineup.values() if ball]
+        player_balls = await BallInstanceView.fetch(
+            BallInstance.filter(player__discord_id=interaction.user.id)
+        )
+        used_ball_ids = {ball.id for ball in lineup_manager.lineup.values() if ball}
         available_balls = [ball for ball in player_balls if ball.id not in used_ball_ids]
-        for ball in available_balls:
-            if not hasattr(ball, 'countryball'):
-                await ball.fetch_related('countryball')
-            if not hasattr(ball.countryball, 'cached_economy'):
-                await ball.countryball.fetch_related('cached_economy')
         suggestions = {}
         for position in empty_positions:
             suitable_economies = lineup_manager.economy_position_mapping.get(position, [])
@@ -1431,11 +1394,7 @@ class Lineup(commands.GroupCog):
             inline=True
         )
         embed.set_image(url="attachment://saved_lineup.png")
-        guild_id = interaction.guild.id
-        channel_id = interaction.channel.id
-        if guild_id in self.lineups and channel_id in self.lineups[guild_id]:
-            if lineup in self.lineups[guild_id][channel_id]:
-                self.lineups[guild_id][channel_id].remove(lineup)
+        self.lineups.remove(lineup)
         await interaction.followup.send(
             content="Lineup saved successfully. The creation session has ended.",
             embed=embed,
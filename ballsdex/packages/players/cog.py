@@ -1,5 +1,3 @@
-import zipfile
-from io import BytesIO
 from typing import TYPE_CHECKING
 
 import discord
@@ -9,6 +7,7 @@ from discord.utils import format_dt
 from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
 
+from ballsdex.core.jobs import job_queue
 from ballsdex.core.models import (
     BallInstance,
     Block,
@@ -18,7 +17,7 @@ from ballsdex.core.models import (
     MentionPolicy,
 )
 from ballsdex.core.models import Player as PlayerModel
-from ballsdex.core.models import PrivacyPolicy, Trade, TradeObject, balls
+from ballsdex.core.models import PlayerCollectionSummary, PrivacyPolicy, Trade, balls
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.core.utils.enums import (
     DONATION_POLICY_MAP,
@@ -27,6 +26,8 @@ from ballsdex.core.utils.enums import (
     PRIVATE_POLICY_MAP,
 )
 from ballsdex.core.utils.paginator import FieldPageSource, Pages
+from ballsdex.core.utils.replica import replica_read
+from ballsdex.packages.players import export as _export_jobs  # noqa: F401 # registers jobs
 from ballsdex.settings import settings
 
 if TYPE_CHECKING:
@@ -504,22 +505,29 @@ class Player(commands.GroupCog):
         """
         await interaction.response.defer(thinking=True, ephemeral=True)
         try:
-            player = await PlayerModel.get(discord_id=interaction.user.id).prefetch_related(
-                "balls"
-            )
+            player = await PlayerModel.get(discord_id=interaction.user.id)
         except DoesNotExist:
             await interaction.followup.send("You haven't got any info to show!", ephemeral=True)
             return
-        ball = await BallInstance.filter(player=player).prefetch_related("special", "trade_player")
 
         user = interaction.user
         bot_countryballs = {x: y.emoji_id for x, y in balls.items() if y.enabled}
         total_countryballs = len(bot_countryballs)
-        owned_countryballs = set(
-            x[0]
-            for x in await player.balls.filter(ball__enabled=True)
-            .distinct()
-            .values_list("ball_id")
+        owned_countryballs: set[int] = set()
+        balls_owned = 0
+        special = 0
+        for ball_id, special_id, count in await replica_read(
+            lambda db: PlayerCollectionSummary.filter(player=player)
+            .using_db(db)
+            .values_list("ball_id", "special_id", "count")
+        ):
+            balls_owned += count
+            if special_id is not None:
+                special += count
+            if ball_id in bot_countryballs:
+                owned_countryballs.add(ball_id)
+        caught_owned = await replica_read(
+            lambda db: BallInstance.filter(player=player, trade_player=None).using_db(db).count()
         )
 
         if total_countryballs > 0:
@@ -529,12 +537,14 @@ class Player(commands.GroupCog):
         else:
             completion_percentage = "0.0%"
 
-        caught_owned = [x for x in ball if x.trade_player is None]
-        balls_owned = [x for x in ball]
-        special = [x for x in ball if x.special is not None]
-        trades = await Trade.filter(
-            Q(player1__discord_id=interaction.user.id) | Q(player2__discord_id=interaction.user.id)
-        ).values_list("player1__discord_id", "player2__discord_id")
+        trades = await replica_read(
+            lambda db: Trade.filter(
+                Q(player1__discord_id=interaction.user.id)
+                | Q(player2__discord_id=interaction.user.id)
+            )
+            .using_db(db)
+            .values_list("player1__discord_id", "player2__discord_id")
+        )
 
         trade_partners = set()
         for p1, p2 in trades:
@@ -543,10 +553,17 @@ class Player(commands.GroupCog):
             if p2 != interaction.user.id:
                 trade_partners.add(p2)
 
-        friends = await Friendship.filter(
-            Q(player1__discord_id=interaction.user.id) | Q(player2__discord_id=interaction.user.id)
-        ).count()
-        blocks = await Block.filter(player1__discord_id=interaction.user.id).count()
+        friends = await replica_read(
+            lambda db: Friendship.filter(
+                Q(player1__discord_id=interaction.user.id)
+                | Q(player2__discord_id=interaction.user.id)
+            )
+            .using_db(db)
+            .count()
+        )
+        blocks = await replica_read(
+            lambda db: Block.filter(player1__discord_id=interaction.user.id).using_db(db).count()
+        )
 
         embed = discord.Embed(
             title=f"**{user.display_name.title()}'s {settings.bot_name.title()} Info**",
@@ -563,9 +580,9 @@ class Player(commands.GroupCog):
             f"**Amount of Blocked Users:** {blocks}\n"
             "## Player Stats\n"
             f"**Completion:** {completion_percentage}\n"
-            f"**{settings.collectible_name.title()}s Owned:** {len(balls_owned):,}\n"
-            f"**Caught {settings.collectible_name.title()}s Owned**: {len(caught_owned):,}\n"
-            f"**Special {settings.collectible_name.title()}s:** {len(special):,}\n"
+            f"**{settings.collectible_name.title()}s Owned:** {balls_owned:,}\n"
+            f"**Caught {settings.collectible_name.title()}s Owned**: {caught_owned:,}\n"
+            f"**Special {settings.collectible_name.title()}s:** {special:,}\n"
             f"**Trades Completed:** {len(trades):,}\n"
             f"**Amount of Users Traded With:** {len(trade_partners):,}"
         )
@@ -591,96 +608,7 @@ class Player(commands.GroupCog):
                 "You don't have any player data to export.", ephemeral=True
             )
             return
-        await interaction.response.defer()
-        files = []
-        if type == "balls":
-            data = await get_items_csv(player)
-            filename = f"{interaction.user.id}_{settings.collectible_name}.csv"
-            data.filename = filename  # type: ignore
-            files.append(data)
-        elif type == "trades":
-            data = await get_trades_csv(player)
-            filename = f"{interaction.user.id}_trades.csv"
-            data.filename = filename  # type: ignore
-            files.append(data)
-        elif type == "all":
-            balls = await get_items_csv(player)
-            trades = await get_trades_csv(player)
-            balls_filename = f"{interaction.user.id}_{settings.collectible_name}.csv"
-            trades_filename = f"{interaction.user.id}_trades.csv"
-            balls.filename = balls_filename  # type: ignore
-            trades.filename = trades_filename  # type: ignore
-            files.append(balls)
-            files.append(trades)
-        else:
-            await interaction.followup.send("Invalid input!", ephemeral=True)
-            return
-        zip_file = BytesIO()
-        with zipfile.ZipFile(zip_file, "w") as z:
-            for file in files:
-                z.writestr(file.filename, file.getvalue())
-        zip_file.seek(0)
-        if zip_file.tell() > 25_000_000:
-            await interaction.followup.send(
-                "Your data is too large to export."
-                "Please contact the bot support for more information.",
-                ephemeral=True,
-            )
+        if type not in ("balls", "trades", "all"):
+            await interaction.response.send_message("Invalid input!", ephemeral=True)
             return
-        files = [discord.File(zip_file, "player_data.zip")]
-        try:
-            await interaction.user.send("Here is your player data:", files=files)
-            await interaction.followup.send(
-                "Your player data has been sent via DMs.", ephemeral=True
-            )
-        except discord.Forbidden:
-            await interaction.followup.send(
-                "I couldn't send the player data to you in DM. "
-                "Either you blocked me or you disabled DMs in this server.",
-                ephemeral=True,
-            )
-
-
-async def get_items_csv(player: PlayerModel) -> BytesIO:
-    """
-    Get a CSV file with all items of the player.
-    """
-    balls = await BallInstance.filter(player=player).prefetch_related(
-        "ball", "trade_player", "special"
-    )
-    txt = (
-        f"id,hex id,{settings.collectible_name},catch date,trade_player"
-        ",special,attack,attack bonus,hp,hp_bonus\n"
-    )
-    for ball in balls:
-        txt += (
-            f"{ball.id},{ball.id:0X},{ball.ball.country},{ball.catch_date},"  # type: ignore
-            f"{ball.trade_player.discord_id if ball.trade_player else 'None'},{ball.special},"
-            f"{ball.attack},{ball.attack_bonus},{ball.health},{ball.health_bonus}\n"
-        )
-    return BytesIO(txt.encode("utf-8"))
-
-
-async def get_trades_csv(player: PlayerModel) -> BytesIO:
-    """
-    Get a CSV file with all trades of the player.
-    """
-    trade_history = (
-        await Trade.filter(Q(player1=player) | Q(player2=player))
-        .order_by("date")
-        .prefetch_related("player1", "player2")
-    )
-    txt = "id,date,player1,player2,player1 received,player2 received\n"
-    for trade in trade_history:
-        player1_items = await TradeObject.filter(
-            trade=trade, player=trade.player1
-        ).prefetch_related("ballinstance")
-        player2_items = await TradeObject.filter(
-            trade=trade, player=trade.player2
-        ).prefetch_related("ballinstance")
-        txt += (
-            f"{trade.id},{trade.date},{trade.player1.discord_id},{trade.player2.discord_id},"
-            f"{','.join([i.ballinstance.to_string() for i in player2_items])},"  # type: ignore
-            f"{','.join([i.ballinstance.to_string() for i in player1_items])}\n"  # type: ignore
-        )
-    return BytesIO(txt.encode("utf-8"))
+        await job_queue.submit(interaction, "player_export", {"type": type}, direct_message=True)
@@ -0,0 +1,287 @@
+import csv
+import io
+import json
+import tempfile
+import zipfile
+from typing import IO, Any, AsyncIterator, Awaitable, Callable
+
+import discord
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.expressions import Q
+
+from ballsdex.core.jobs import JobContext, JobError, JobResult, job_queue
+from ballsdex.core.models import BallInstanceView
+from ballsdex.core.models import Player as PlayerModel
+from ballsdex.core.models import PlayerCollectionSummary, Trade
+from ballsdex.core.utils.replica import CONNECTION_ERRORS, replica_router
+from ballsdex.settings import settings
+
+__all__ = ("CHUNK_SIZE", "write_items_csv", "write_trades_csv", "export_zip", "export_file")
+
+# called with the number of rows written so far
+Progress = Callable[[int], Awaitable[None]]
+
+# archives larger than this are written to a temporary file instead of memory
+EXPORT_MEMORY_SIZE = 8 * 1024 * 1024
+# maximum size of a file uploaded by the bot
+EXPORT_MAX_SIZE = 25_000_000
+
+# number of rows fetched from the database at once
+CHUNK_SIZE = 1000
+
+VIEW_COLUMNS = ", ".join(f"i.{x}" for x in BallInstanceView.__slots__)
+
+ITEMS_QUERY = f"""
+SELECT {VIEW_COLUMNS}, tp.discord_id FROM ballinstance i
+LEFT JOIN player tp ON tp.id = i.trade_player_id
+WHERE i.player_id = $1
+ORDER BY i.id
+"""
+
+# archived trades do not have foreign keys, their players may have been deleted
+TRADES_QUERY = """
+SELECT t.id, t.date, p1.discord_id, p2.discord_id, t.summary::text
+FROM {table} t
+LEFT JOIN player p1 ON p1.id = t.player1_id
+LEFT JOIN player p2 ON p2.id = t.player2_id
+WHERE t.player1_id = $1 OR t.player2_id = $1
+ORDER BY t.date
+"""
+
+
+async def fetch_chunks(
+    db: BaseDBAsyncClient, query: str, *args: Any, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[list[Any]]:
+    async with db.acquire_connection() as connection:  # type: ignore
+        # asyncpg cursors only exist within a transaction
+        async with connection.transaction(readonly=True):
+            cursor = await connection.cursor(query, *args)
+            while rows := await cursor.fetch(chunk_size):
+                yield rows
+
+
+async def stream_chunks(
+    query: str, *args: Any, chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[list[Any]]:
+    """
+    Run a query with a server-side cursor, yielding its rows in chunks of `chunk_size`, so that
+    the full result is never held in memory.
+
+    The query runs on the replica when it is healthy. If the replica fails before the first
+    chunk, the query is retried on the primary, a later failure is raised.
+    """
+    db = await replica_router.connection()
+    started = False
+    try:
+        async for rows in fetch_chunks(db, query, *args, chunk_size=chunk_size):
+            started = True
+            yield rows
+        return
+    except CONNECTION_ERRORS:
+        if not replica_router.failed(db) or started:
+            raise
+    async for rows in fetch_chunks(replica_router.primary(), query, *args, chunk_size=chunk_size):
+        yield rows
+
+
+def csv_writer(file: IO[bytes]) -> tuple[io.TextIOWrapper, Any]:
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    return text, csv.writer(text)
+
+
+async def write_items_csv(
+    player: PlayerModel, file: IO[bytes], progress: Progress | None = None
+) -> int:
+    """
+    Write a CSV file with all items of the player, and return the number of rows written.
+    """
+    text, writer = csv_writer(file)
+    writer.writerow(
+        [
+            "id",
+            "hex id",
+            settings.collectible_name,
+            "catch date",
+            "trade_player",
+            "special",
+            "attack",
+            "attack bonus",
+            "hp",
+            "hp_bonus",
+        ]
+    )
+    size = len(BallInstanceView.__slots__)
+    written = 0
+    async for rows in stream_chunks(ITEMS_QUERY, player.pk):
+        for row in rows:
+            ball = BallInstanceView(*row[:size])
+            writer.writerow(
+                [
+                    ball.id,
+                    f"{ball.id:0X}",
+                    ball.countryball.country,
+                    ball.catch_date,
+                    row[size] if row[size] is not None else "None",
+                    ball.specialcard,
+                    ball.attack,
+                    ball.attack_bonus,
+                    ball.health,
+                    ball.health_bonus,
+                ]
+            )
+        written += len(rows)
+        if progress:
+            await progress(written)
+    text.flush()
+    text.detach()
+    return written
+
+
+async def write_trades_csv(
+    player: PlayerModel,
+    file: IO[bytes],
+    progress: Progress | None = None,
+    *,
+    archived: bool = False,
+) -> int:
+    """
+    Write a CSV file with all trades of the player, and return the number of rows written.
+
+    The contents of the trades are read from their summary. With `archived`, the archived
+    trades are written instead of the recent ones.
+    """
+    table = "trade_archive" if archived else "trade"
+    text, writer = csv_writer(file)
+    writer.writerow(["id", "date", "player1", "player2", "player1 received", "player2 received"])
+    written = 0
+    async for rows in stream_chunks(TRADES_QUERY.format(table=table), player.pk):
+        for id, date, player1, player2, summary in rows:
+            summary = json.loads(summary)
+            # instances received by each side are the ones given by the other player
+            received1, received2 = (
+                ",".join(
+                    BallInstanceView.from_summary(x).to_string(is_trade=True)
+                    for x in summary.get(key, [])
+                )
+                for key in ("player2", "player1")
+            )
+            writer.writerow([id, date, player1, player2, received1, received2])
+        written += len(rows)
+        if progress:
+            await progress(written)
+    text.flush()
+    text.detach()
+    return written
+
+
+async def export_zip(
+    player: PlayerModel,
+    file: IO[bytes],
+    *,
+    items: bool,
+    trades: bool,
+    archived: bool = False,
+    compress: bool = True,
+    progress: Progress | None = None,
+):
+    """
+    Write a ZIP archive with the requested CSV exports of a player.
+
+    CSV rows are compressed into the archive as they are streamed from the database, pass a
+    `tempfile.SpooledTemporaryFile` to also keep large archives out of memory.
+
+    Parameters
+    ----------
+    player: Player
+        The player to export.
+    file: IO[bytes]
+        Seekable binary file receiving the archive.
+    items: bool
+        Include the CSV of the player's items.
+    trades: bool
+        Include the CSV of the player's trades.
+    archived: bool
+        Export the archived trades instead of the recent ones.
+    compress: bool
+        Deflate the CSV files, enabled by default.
+    progress: Callable[[int], Awaitable[None]] | None
+        Called with the total number of rows written so far, after each chunk.
+    """
+    discord_id = player.discord_id
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(file, "w", compression=compression) as archive:
+        offset = 0
+
+        async def report(count: int):
+            if progress:
+                await progress(offset + count)
+
+        if items:
+            with archive.open(f"{discord_id}_{settings.collectible_name}.csv", "w") as entry:
+                offset = await write_items_csv(player, entry, report)
+        if trades:
+            with archive.open(f"{discord_id}_trades.csv", "w") as entry:
+                await write_trades_csv(player, entry, report, archived=archived)
+
+
+async def export_file(
+    player: PlayerModel,
+    filename: str,
+    *,
+    items: bool,
+    trades: bool,
+    archived: bool = False,
+    progress: Progress | None = None,
+) -> discord.File:
+    """
+    Export the data of a player as a ZIP archive ready to be uploaded, see `export_zip`. The
+    file must be closed by the caller, the job queue does it once the result is delivered.
+
+    Raises
+    ------
+    JobError
+        The archive is too large to be uploaded.
+    """
+    zip_file = tempfile.SpooledTemporaryFile(max_size=EXPORT_MEMORY_SIZE)
+    try:
+        await export_zip(
+            player, zip_file, items=items, trades=trades, archived=archived, progress=progress
+        )
+        if zip_file.tell() > EXPORT_MAX_SIZE:
+            raise JobError(
+                "This data is too large to export. "
+                "Please contact the bot support for more information."
+            )
+        zip_file.seek(0)
+    except BaseException:
+        zip_file.close()
+        raise
+    return discord.File(zip_file, filename)
+
+
+@job_queue.handler("player_export")
+async def export_job(ctx: JobContext) -> JobResult:
+    """
+    Background job exporting a player's data, the payload has the `type` of export:
+    "balls", "trades" or "all".
+    """
+    player = await PlayerModel.get_or_none(discord_id=ctx.job.user_id)
+    if player is None:
+        raise JobError("You don't have any player data to export.")
+    type = ctx.job.payload.get("type", "all")
+    items = type in ("balls", "all")
+    trades = type in ("trades", "all")
+
+    total = 0
+    if items:
+        total += await PlayerCollectionSummary.total(player=player)
+    if trades:
+        total += await Trade.filter(Q(player1=player) | Q(player2=player)).count()
+
+    async def progress(count: int):
+        await ctx.progress(count, total)
+
+    file = await export_file(
+        player, "player_data.zip", items=items, trades=trades, progress=progress
+    )
+    return JobResult("Here is your player data:", (file,))
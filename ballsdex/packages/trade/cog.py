@@ -1,19 +1,22 @@
 import datetime
-from collections import defaultdict
+import logging
 from typing import TYPE_CHECKING, Optional, cast
 
 import discord
-from cachetools import TTLCache
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.utils import MISSING
 from tortoise.expressions import Q
 
-from ballsdex.core.models import BallInstance, Player
+from ballsdex.core.models import BallInstance, BallInstanceView, Player
 from ballsdex.core.models import Trade as TradeModel
+from ballsdex.core.models import TradeArchive
 from ballsdex.core.utils.buttons import ConfirmChoiceView
 from ballsdex.core.utils.paginator import Pages
+from ballsdex.core.utils.replica import replica_read
+from ballsdex.core.utils.sessions import SessionRegistry
 from ballsdex.core.utils.sorting import SortingChoices, sort_balls
+from ballsdex.core.utils.tortoise import create_trade_partitions
 from ballsdex.core.utils.transformers import (
     BallEnabledTransform,
     BallInstanceTransform,
@@ -28,6 +31,8 @@ from ballsdex.settings import settings
 if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
 
+log = logging.getLogger("ballsdex.packages.trade.cog")
+
 
 @app_commands.guild_only()
 class Trade(commands.GroupCog):
@@ -37,10 +42,28 @@ class Trade(commands.GroupCog):
 
     def __init__(self, bot: "BallsDexBot"):
         self.bot = bot
-        self.trades: TTLCache[int, dict[int, list[TradeMenu]]] = TTLCache(maxsize=999999, ttl=1800)
+        # ongoing trades, keyed by channel ID and user ID
+        self.trades: SessionRegistry[TradeMenu] = SessionRegistry(
+            lambda x: x.current_view.is_finished() or x.trader1.cancelled or x.trader2.cancelled
+        )
 
     bulk = app_commands.Group(name="bulk", description="Bulk Commands")
 
+    async def cog_load(self):
+        self.create_partitions.start()
+
+    async def cog_unload(self):
+        self.create_partitions.cancel()
+
+    @tasks.loop(hours=24)
+    async def create_partitions(self):
+        """
+        Keep the monthly partitions of the trade tables created ahead of time, in case the
+        `trade_partitions` management command is not scheduled.
+        """
+        if created := await create_trade_partitions():
+            log.info(f"Created {created} monthly partitions of the trade tables")
+
     def get_trade(
         self,
         interaction: discord.Interaction | None = None,
@@ -61,44 +84,16 @@ class Trade(commands.GroupCog):
         tuple[TradeMenu, TradingUser] | tuple[None, None]
             A tuple with the `TradeMenu` and `TradingUser` if found, else `None`.
         """
-        guild: discord.Guild
         if interaction:
-            guild = cast(discord.Guild, interaction.guild)
             channel = cast(discord.TextChannel, interaction.channel)
             user = interaction.user
-        elif channel:
-            guild = channel.guild
-        else:
+        elif not channel:
             raise TypeError("Missing interaction or channel")
 
-        if guild.id not in self.trades:
-            self.trades[guild.id] = defaultdict(list)
-        if channel.id not in self.trades[guild.id]:
-            return (None, None)
-        to_remove: list[TradeMenu] = []
-        for trade in self.trades[guild.id][channel.id]:
-            if (
-                trade.current_view.is_finished()
-                or trade.trader1.cancelled
-                or trade.trader2.cancelled
-            ):
-                # remove what was supposed to have been removed
-                to_remove.append(trade)
-                continue
-            try:
-                trader = trade._get_trader(user)
-            except RuntimeError:
-                continue
-            else:
-                break
-        else:
-            for trade in to_remove:
-                self.trades[guild.id][channel.id].remove(trade)
+        trade = self.trades.get((channel.id, user.id))
+        if trade is None:
             return (None, None)
-
-        for trade in to_remove:
-            self.trades[guild.id][channel.id].remove(trade)
-        return (trade, trader)
+        return (trade, trade._get_trader(user))
 
     @app_commands.command()
     async def begin(self, interaction: discord.Interaction["BallsDexBot"], user: discord.User):
@@ -157,7 +152,11 @@ class Trade(commands.GroupCog):
         menu = TradeMenu(
             self, interaction, TradingUser(interaction.user, player1), TradingUser(user, player2)
         )
-        self.trades[interaction.guild.id][interaction.channel.id].append(menu)  # type: ignore
+        self.trades.add(
+            menu,
+            (interaction.channel.id, interaction.user.id),  # type: ignore
+            (interaction.channel.id, user.id),  # type: ignore
+        )
         await menu.start()
         await interaction.response.send_message("Trade started!", ephemeral=True)
 
@@ -219,7 +218,7 @@ class Trade(commands.GroupCog):
                 ephemeral=True,
             )
             return
-        if await countryball.is_locked():
+        if await countryball.is_locked() or not await countryball.lock_for_trade():
             await interaction.followup.send(
                 f"This {settings.collectible_name} is currently in an active trade or donation, "
                 "please try again later.",
@@ -227,7 +226,6 @@ class Trade(commands.GroupCog):
             )
             return
 
-        await countryball.lock_for_trade()
         trader.proposal.append(countryball)
         await interaction.followup.send(
             f"{countryball.countryball.country} added.", ephemeral=True
@@ -272,7 +270,7 @@ class Trade(commands.GroupCog):
             query = query.filter(special=special)
         if sort:
             query = sort_balls(sort, query)
-        balls = await query
+        balls = await BallInstanceView.fetch(query)
         if not balls:
             await interaction.followup.send(
                 f"No {settings.plural_collectible_name} found.", ephemeral=True
@@ -361,6 +359,7 @@ class Trade(commands.GroupCog):
         days: Optional[int] = None,
         countryball: BallEnabledTransform | None = None,
         special: SpecialEnabledTransform | None = None,
+        archived: bool = False,
     ):
         """
         Show the history of your trades.
@@ -377,10 +376,13 @@ class Trade(commands.GroupCog):
             The countryball you want to filter the trade history by.
         special: SpecialEnabledTransform | None
             The special you want to filter the trade history by.
+        archived: bool
+            Show your old archived trades instead of the recent ones.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
         user = interaction.user
         sort_value = sorting.value if sorting else "-date"
+        model = TradeArchive if archived else TradeModel
 
         if days is not None and days < 0:
             await interaction.followup.send(
@@ -389,12 +391,12 @@ class Trade(commands.GroupCog):
             return
 
         if trade_user:
-            queryset = TradeModel.filter(
+            queryset = model.filter(
                 (Q(player1__discord_id=user.id, player2__discord_id=trade_user.id))
                 | (Q(player1__discord_id=trade_user.id, player2__discord_id=user.id))
             )
         else:
-            queryset = TradeModel.filter(
+            queryset = model.filter(
                 Q(player1__discord_id=user.id) | Q(player2__discord_id=user.id)
             )
 
@@ -403,17 +405,14 @@ class Trade(commands.GroupCog):
             start_date = end_date - datetime.timedelta(days=days)
             queryset = queryset.filter(date__range=(start_date, end_date))
 
+        # the traded countryballs and specials are denormalized on the trade
         if countryball:
-            queryset = queryset.filter(Q(tradeobjects__ballinstance__ball=countryball)).distinct()
+            queryset = queryset.filter(ball_ids__contains=[countryball.pk])
         if special:
-            queryset = queryset.filter(Q(tradeobjects__ballinstance__special=special)).distinct()
+            queryset = queryset.filter(special_ids__contains=[special.pk])
 
-        history = await queryset.order_by(sort_value).prefetch_related(
-            "player1",
-            "player2",
-            "tradeobjects__ballinstance__ball",
-            "tradeobjects__ballinstance__special",
-        )
+        queryset = queryset.order_by(sort_value).prefetch_related("player1", "player2")
+        history = await replica_read(queryset.using_db)
 
         if not history:
             await interaction.followup.send("No history found.", ephemeral=True)
@@ -2,7 +2,9 @@ from typing import TYPE_CHECKING, Iterable
 
 import discord
 
+from ballsdex.core.models import BallInstance, BallInstanceView
 from ballsdex.core.models import Trade as TradeModel
+from ballsdex.core.models import TradeArchive
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.paginator import Pages
 from ballsdex.packages.trade.trade_user import TradingUser
@@ -14,7 +16,7 @@ if TYPE_CHECKING:
 class TradeViewFormat(menus.ListPageSource):
     def __init__(
         self,
-        entries: Iterable[TradeModel],
+        entries: Iterable[TradeModel | TradeArchive],
         header: str,
         bot: "BallsDexBot",
         is_admin: bool = False,
@@ -26,7 +28,7 @@ class TradeViewFormat(menus.ListPageSource):
         self.is_admin = is_admin
         super().__init__(entries, per_page=1)
 
-    async def format_page(self, menu: Pages, trade: TradeModel) -> discord.Embed:
+    async def format_page(self, menu: Pages, trade: TradeModel | TradeArchive) -> discord.Embed:
         embed = discord.Embed(
             title=f"Trade history for {self.header}",
             description=f"Trade ID: {trade.pk:0X}",
@@ -65,33 +67,98 @@ def _get_trader_name(trader: TradingUser, is_admin: bool = False) -> str:
         return f"{_get_prefix_emote(trader)} {trader.user.name}"
 
 
-def _build_list_of_strings(
-    trader: TradingUser, bot: "BallsDexBot", short: bool = False
-) -> list[str]:
-    # this builds a list of strings always lower than 1024 characters
-    # while not cutting in the middle of a line
-    proposal: list[str] = [""]
-    i = 0
-
-    for countryball in trader.proposal:
-        cb_text = countryball.description(short=short, include_emoji=True, bot=bot, is_trade=True)
-        if trader.locked:
-            text = f"- *{cb_text}*\n"
-        else:
-            text = f"- {cb_text}\n"
+# maximum length of the text packed in one field, below the 1024 characters limit
+FIELD_SIZE = 950
+
+# instance IDs of the proposal, locked and cancelled states of the trader
+LayoutKey = tuple[tuple[int, ...], bool, bool]
+
+
+class ProposalLines:
+    """
+    Rendered lines of a trader's proposal, kept on the `TradingUser` across embed updates.
+
+    Each instance is only described once, when it is first displayed. The packing of the lines
+    into fields is memoized until the proposal or the state of the trader changes, and when
+    instances were only appended, packing resumes from the last field instead of starting over.
+    """
+
+    __slots__ = ("descriptions", "layouts")
+
+    def __init__(self):
+        self.descriptions: dict[tuple[int, bool], str] = {}
+        # packed fields of both display modes, keyed by short flag, with the state they match
+        self.layouts: dict[bool, tuple[LayoutKey, list[str]]] = {}
+
+    def line(
+        self,
+        countryball: "BallInstance | BallInstanceView",
+        trader: TradingUser,
+        bot: "BallsDexBot",
+        short: bool,
+    ) -> str:
+        key = (countryball.pk, short)
+        if (text := self.descriptions.get(key)) is None:
+            text = self.descriptions[key] = countryball.description(
+                short=short, include_emoji=True, bot=bot, is_trade=True
+            )
+        text = f"- *{text}*\n" if trader.locked else f"- {text}\n"
         if trader.cancelled:
             text = f"~~{text}~~"
+        return text
+
+    def build(self, trader: TradingUser, bot: "BallsDexBot", short: bool = False) -> list[str]:
+        """
+        Return the proposal of the trader packed into field values, each one always lower
+        than 1024 characters without cutting in the middle of a line.
+        """
+        key = (tuple(x.pk for x in trader.proposal), trader.locked, trader.cancelled)
+        layout = self.layouts.get(short)
+        if layout is None or layout[0] != key:
+            layout = self.layouts[short] = (key, self.pack(trader, bot, short, key, layout))
+        fields = layout[1]
+        return fields if fields[0] else ["*Empty*"]
+
+    def pack(
+        self,
+        trader: TradingUser,
+        bot: "BallsDexBot",
+        short: bool,
+        key: LayoutKey,
+        previous: tuple[LayoutKey, list[str]] | None,
+    ) -> list[str]:
+        pks = key[0]
+        if (
+            previous is not None
+            and previous[0][1:] == key[1:]
+            and pks[: len(previous[0][0])] == previous[0][0]
+        ):
+            # only additions, the previous fields are still valid
+            start = len(previous[0][0])
+            fields = previous[1].copy()
+        else:
+            start = 0
+            fields = [""]
+            if len(self.descriptions) > 2 * len(pks):
+                # forget the instances removed from the proposal
+                kept = set(pks)
+                self.descriptions = {k: v for k, v in self.descriptions.items() if k[0] in kept}
+
+        for countryball in trader.proposal[start:]:
+            text = self.line(countryball, trader, bot, short)
+            if len(text) + len(fields[-1]) > FIELD_SIZE:
+                # move to a new field
+                fields.append("")
+            fields[-1] += text
+        return fields
 
-        if len(text) + len(proposal[i]) > 950:
-            # move to a new list element
-            i += 1
-            proposal.append("")
-        proposal[i] += text
-
-    if not proposal[0]:
-        proposal[0] = "*Empty*"
 
-    return proposal
+def _build_list_of_strings(
+    trader: TradingUser, bot: "BallsDexBot", short: bool = False
+) -> list[str]:
+    if trader.lines is None:
+        trader.lines = ProposalLines()
+    return trader.lines.build(trader, bot, short)
 
 
 def fill_trade_embed_fields(
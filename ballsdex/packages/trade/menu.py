@@ -1,20 +1,24 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, List, Set, cast
+from typing import TYPE_CHECKING, Hashable, Iterable, List, Set, cast
 
 import discord
 from discord.ui import Button, View, button
 from discord.utils import format_dt, utcnow
+from tortoise.transactions import in_transaction
 
-from ballsdex.core.models import BallInstance, Player, Trade, TradeObject
+from ballsdex.core.models import BallInstance, BallInstanceView, Player, Trade, TradeObject
 from ballsdex.core.utils import menus
 from ballsdex.core.utils.buttons import ConfirmChoiceView
+from ballsdex.core.utils.completion import completion_cache
+from ballsdex.core.utils.inventory_index import inventory_index
+from ballsdex.core.utils.locks import lock_manager
 from ballsdex.core.utils.paginator import Pages
-from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer
+from ballsdex.packages.balls.countryballs_paginator import CountryballsViewer, EntityPageSource
 from ballsdex.packages.trade.display import fill_trade_embed_fields
+from ballsdex.packages.trade.scheduler import trade_scheduler
 from ballsdex.packages.trade.trade_user import TradingUser
 from ballsdex.settings import settings
 
@@ -92,8 +96,7 @@ class TradeView(View):
         if not view.value:
             return
 
-        for countryball in trader.proposal:
-            await countryball.unlock()
+        await lock_manager.unlock(x.pk for x in trader.proposal)
 
         trader.proposal.clear()
         await interaction.followup.send("Proposal cleared.", ephemeral=True)
@@ -139,6 +142,10 @@ class ConfirmView(View):
         else:
             return True
 
+    async def on_timeout(self):
+        # the trade scheduler stops following the trade once both users locked
+        await self.trade.timeout()
+
     @discord.ui.button(
         style=discord.ButtonStyle.success, emoji="\N{HEAVY CHECK MARK}\N{VARIATION SELECTOR-16}"
     )
@@ -213,7 +220,6 @@ class TradeMenu:
         self.trader1 = trader1
         self.trader2 = trader2
         self.embed = discord.Embed()
-        self.task: asyncio.Task | None = None
         self.current_view: TradeView | ConfirmView = TradeView(self)
         self.message: discord.Message
         self.cooldown_start_time: datetime | None = None
@@ -243,37 +249,41 @@ class TradeMenu:
             f" list of {settings.plural_collectible_name}."
         )
         self.embed.set_footer(
-            text="This message is updated every 15 seconds, "
+            text="This message is updated every 15 seconds when the proposals change, "
             "but you can keep on editing your proposal."
         )
 
-    async def update_message_loop(self):
+    def state(self) -> Hashable:
         """
-        A loop task that updates each 5 second the menu with the new content.
+        Snapshot of what the trade message displays, to detect when it needs to be edited.
         """
+        return tuple(
+            (tuple(x.pk for x in trader.proposal), trader.locked, trader.accepted)
+            for trader in (self.trader1, self.trader2)
+        )
 
-        assert self.task
-        start_time = datetime.utcnow()
-
-        while True:
-            await asyncio.sleep(15)
-            if datetime.utcnow() - start_time > timedelta(minutes=15):
-                self.embed.colour = discord.Colour.dark_red()
-                await self.cancel("The trade timed out")
-                return
+    async def refresh(self):
+        """
+        Edit the trade message with the current proposals, called by the trade scheduler.
+        """
+        try:
+            fill_trade_embed_fields(self.embed, self.bot, self.trader1, self.trader2)
+            await self.message.edit(embed=self.embed)
+        except Exception:
+            log.exception(
+                "Failed to refresh the trade menu "
+                f"guild={self.message.guild.id} "  # type: ignore
+                f"trader1={self.trader1.user.id} trader2={self.trader2.user.id}"
+            )
+            self.embed.colour = discord.Colour.dark_red()
+            await self.cancel("The trade timed out")
 
-            try:
-                fill_trade_embed_fields(self.embed, self.bot, self.trader1, self.trader2)
-                await self.message.edit(embed=self.embed)
-            except Exception:
-                log.exception(
-                    "Failed to refresh the trade menu "
-                    f"guild={self.message.guild.id} "  # type: ignore
-                    f"trader1={self.trader1.user.id} trader2={self.trader2.user.id}"
-                )
-                self.embed.colour = discord.Colour.dark_red()
-                await self.cancel("The trade timed out")
-                return
+    async def timeout(self):
+        """
+        Cancel the trade after it timed out, called by the trade scheduler.
+        """
+        self.embed.colour = discord.Colour.dark_red()
+        await self.cancel("The trade timed out")
 
     async def start(self):
         """
@@ -288,17 +298,16 @@ class TradeMenu:
             view=self.current_view,
             allowed_mentions=discord.AllowedMentions(users=self.trader2.player.can_be_mentioned),
         )
-        self.task = self.bot.loop.create_task(self.update_message_loop())
+        trade_scheduler.register(self)
 
     async def cancel(self, reason: str = "The trade has been cancelled."):
         """
         Cancel the trade immediately.
         """
-        if self.task:
-            self.task.cancel()
+        trade_scheduler.unregister(self)
+        self.cog.trades.remove(self)
 
-        for countryball in self.trader1.proposal + self.trader2.proposal:
-            await countryball.unlock()
+        await lock_manager.unlock(x.pk for x in self.trader1.proposal + self.trader2.proposal)
 
         self.current_view.stop()
         for item in self.current_view.children:
@@ -315,8 +324,7 @@ class TradeMenu:
         """
         trader.locked = True
         if self.trader1.locked and self.trader2.locked:
-            if self.task:
-                self.task.cancel()
+            trade_scheduler.unregister(self)
             self.current_view.stop()
             fill_trade_embed_fields(self.embed, self.bot, self.trader1, self.trader2)
 
@@ -337,38 +345,71 @@ class TradeMenu:
         await self.cancel()
 
     async def perform_trade(self):
-        valid_transferable_countryballs: list[BallInstance] = []
-
-        trade = await Trade.create(player1=self.trader1.player, player2=self.trader2.player)
+        """
+        Settle the trade in a single transaction: check that both proposals are still owned by
+        their traders, record the trade, and move all instances with one update per side.
 
-        for countryball in self.trader1.proposal:
-            await countryball.refresh_from_db()
-            if countryball.player.discord_id != self.trader1.player.discord_id:
-                # This is a invalid mutation, the player is not the owner of the countryball
-                raise InvalidTradeOperation()
-            countryball.player = self.trader2.player
-            countryball.trade_player = self.trader1.player
-            countryball.favorite = False
-            valid_transferable_countryballs.append(countryball)
-            await TradeObject.create(
-                trade=trade, ballinstance=countryball, player=self.trader1.player
+        Raises
+        ------
+        InvalidTradeOperation
+            An instance changed owner during the trade, nothing was written.
+        """
+        player1, player2 = self.trader1.player, self.trader2.player
+        proposal1 = {x.pk: x for x in self.trader1.proposal}
+        proposal2 = {x.pk: x for x in self.trader2.proposal}
+
+        async with in_transaction() as connection:
+            # row locks prevent any concurrent change of owner until the transaction ends
+            _, rows = await connection.execute_query(
+                "SELECT id, player_id FROM ballinstance WHERE id = ANY($1) FOR UPDATE",
+                [[*proposal1, *proposal2]],
             )
-
-        for countryball in self.trader2.proposal:
-            if countryball.player.discord_id != self.trader2.player.discord_id:
+            owners = {row["id"]: row["player_id"] for row in rows}
+            if any(owners.get(x) != player1.pk for x in proposal1) or any(
+                owners.get(x) != player2.pk for x in proposal2
+            ):
                 # This is a invalid mutation, the player is not the owner of the countryball
                 raise InvalidTradeOperation()
-            countryball.player = self.trader1.player
-            countryball.trade_player = self.trader2.player
-            countryball.favorite = False
-            valid_transferable_countryballs.append(countryball)
-            await TradeObject.create(
-                trade=trade, ballinstance=countryball, player=self.trader2.player
-            )
 
-        for countryball in valid_transferable_countryballs:
-            await countryball.unlock()
-            await countryball.save()
+            trade = await Trade.create(
+                player1=player1,
+                player2=player2,
+                **Trade.summarize(proposal1.values(), proposal2.values()),
+                using_db=connection,
+            )
+            await TradeObject.bulk_create(
+                [
+                    TradeObject(
+                        trade=trade, trade_date=trade.date, ballinstance_id=x, player=player
+                    )
+                    for ids, player in ((proposal1, player1), (proposal2, player2))
+                    for x in ids
+                ],
+                using_db=connection,
+            )
+            for ids, new_owner, previous_owner in (
+                (proposal1, player2, player1),
+                (proposal2, player1, player2),
+            ):
+                if ids:
+                    await BallInstance.filter(id__in=list(ids)).using_db(connection).update(
+                        player=new_owner, trade_player=previous_owner, favorite=False, locked=None
+                    )
+
+        # bulk updates do not send the ORM signals, update what the instance signals would
+        lock_manager.forget([*proposal1, *proposal2])
+        for countryballs, new_owner, previous_owner in (
+            (proposal1.values(), player2, player1),
+            (proposal2.values(), player1, player2),
+        ):
+            for countryball in countryballs:
+                countryball.player = new_owner
+                countryball.trade_player = previous_owner
+                countryball.favorite = False
+                countryball.locked = None  # type: ignore
+        for player in (player1, player2):
+            inventory_index.invalidate_player(player.pk)
+            completion_cache.invalidate_player(player.pk)
 
     async def confirm(self, trader: TradingUser) -> bool:
         """
@@ -380,9 +421,9 @@ class TradeMenu:
         trader.accepted = True
         fill_trade_embed_fields(self.embed, self.bot, self.trader1, self.trader2)
         if self.trader1.accepted and self.trader2.accepted:
-            if self.task and not self.task.cancelled():
-                # shouldn't happen but just in case
-                self.task.cancel()
+            # shouldn't be registered anymore but just in case
+            trade_scheduler.unregister(self)
+            self.cog.trades.remove(self)
 
             self.embed.description = "Trade concluded!"
             self.embed.colour = discord.Colour.green()
@@ -410,20 +451,23 @@ class TradeMenu:
         return result
 
 
-class CountryballsSource(menus.ListPageSource):
-    def __init__(self, entries: List[BallInstance]):
+class CountryballsSource(EntityPageSource, menus.ListPageSource):
+    def __init__(self, entries: List[BallInstanceView]):
         super().__init__(entries, per_page=25)
 
-    async def format_page(self, menu: CountryballsSelector, balls: List[BallInstance]):
+    async def format_page(self, menu: CountryballsSelector, balls: List[BallInstanceView]):
+        self.set_entities(balls)
         menu.set_options(balls)
         return True  # signal to edit the page
 
 
 class CountryballsSelector(Pages):
+    source: CountryballsSource
+
     def __init__(
         self,
         interaction: discord.Interaction["BallsDexBot"],
-        balls: List[BallInstance],
+        balls: List[BallInstanceView],
         cog: TradeCog,
     ):
         self.bot = interaction.client
@@ -437,8 +481,10 @@ class CountryballsSelector(Pages):
         self.balls_selected: Set[BallInstance] = set()
         self.cog = cog
 
-    def set_options(self, balls: List[BallInstance]):
+    def set_options(self, balls: List[BallInstanceView]):
         options: List[discord.SelectOption] = []
+        # the page holds views while the selection holds full instances, compare their IDs
+        selected = {x.pk for x in self.balls_selected}
         for ball in balls:
             if ball.is_tradeable is False:
                 continue
@@ -452,30 +498,28 @@ class CountryballsSelector(Pages):
                     f"Caught on {ball.catch_date.strftime('%d/%m/%y %H:%M')}",
                     emoji=emoji,
                     value=f"{ball.pk}",
-                    default=ball in self.balls_selected,
+                    default=ball.pk in selected,
                 )
             )
         self.select_ball_menu.options = options
         self.select_ball_menu.max_values = len(options)
 
+    async def add_selection(self, values: Iterable[str]):
+        # resolve all the new selections of the page with a single query
+        selected = {x.pk for x in self.balls_selected}
+        ids = [int(x) for x in values if int(x) not in selected]
+        if ids:
+            self.balls_selected.update(await self.source.resolve(ids, prefetch=("ball", "player")))
+
     @discord.ui.select(min_values=1, max_values=25)
     async def select_ball_menu(self, interaction: discord.Interaction, item: discord.ui.Select):
-        for value in item.values:
-            ball_instance = await BallInstance.get(id=int(value)).prefetch_related(
-                "ball", "player"
-            )
-            self.balls_selected.add(ball_instance)
         await interaction.response.defer()
+        await self.add_selection(item.values)
 
     @discord.ui.button(label="Select Page", style=discord.ButtonStyle.secondary)
     async def select_all_button(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer(thinking=True, ephemeral=True)
-        for ball in self.select_ball_menu.options:
-            ball_instance = await BallInstance.get(id=int(ball.value)).prefetch_related(
-                "ball", "player"
-            )
-            if ball_instance not in self.balls_selected:
-                self.balls_selected.add(ball_instance)
+        await self.add_selection(x.value for x in self.select_ball_menu.options)
         await interaction.followup.send(
             (
                 f"All {settings.plural_collectible_name} on this page have been selected.\n"
@@ -518,25 +562,33 @@ class CountryballsSelector(Pages):
                     f"{settings.collectible_name.title()} #{ball.pk:0X} is not tradeable.",
                     ephemeral=True,
                 )
-            if await ball.is_locked():
+            if lock_manager.is_locked(ball.pk):
                 return await interaction.followup.send(
                     f"{settings.collectible_name.title()} #{ball.pk:0X} is locked "
                     "for trade and won't be added to the proposal.",
                     ephemeral=True,
                 )
+        if any(ball.favorite for ball in self.balls_selected):
             view = ConfirmChoiceView(interaction)
-            if ball.favorite:
-                await interaction.followup.send(
-                    f"One or more of the {settings.plural_collectible_name} is favorited, "
-                    "are you sure you want to add it to the trade?",
-                    view=view,
-                    ephemeral=True,
-                )
-                await view.wait()
-                if not view.value:
-                    return
-            trader.proposal.append(ball)
-            await ball.lock_for_trade()
+            await interaction.followup.send(
+                f"One or more of the {settings.plural_collectible_name} is favorited, "
+                "are you sure you want to add it to the trade?",
+                view=view,
+                ephemeral=True,
+            )
+            await view.wait()
+            if not view.value:
+                return
+        locked = await lock_manager.lock(ball.pk for ball in self.balls_selected)
+        if len(locked) != len(self.balls_selected):
+            # another trade or donation took some of them in the meantime, roll back
+            await lock_manager.unlock(locked)
+            return await interaction.followup.send(
+                f"Some of the {settings.plural_collectible_name} you selected are locked "
+                "for trade, nothing was added to the proposal.",
+                ephemeral=True,
+            )
+        trader.proposal.extend(self.balls_selected)
         grammar = (
             f"{settings.collectible_name}"
             if len(self.balls_selected) == 1
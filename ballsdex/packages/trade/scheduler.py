@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable
+
+if TYPE_CHECKING:
+    from ballsdex.packages.trade.menu import TradeMenu
+
+log = logging.getLogger("ballsdex.packages.trade.scheduler")
+
+__all__ = ("Timer", "TimerWheel", "TradeScheduler", "trade_scheduler")
+
+# delay between two refreshes of a trade message
+REFRESH_INTERVAL = 15
+# delay before a trade that was not locked by both users times out
+TRADE_TIMEOUT = 15 * 60
+
+
+class Timer:
+    """
+    Entry of a `TimerWheel`, firing its callback once unless cancelled.
+    """
+
+    __slots__ = ("callback", "rounds", "cancelled")
+
+    def __init__(self, callback: Callable[[], Awaitable[Any]], rounds: int):
+        self.callback = callback
+        self.rounds = rounds
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: timers are stored in the slot of the tick they expire on, so that
+    scheduling, cancelling and advancing by one tick are all constant time, regardless of the
+    number of timers.
+
+    Timers further than one turn of the wheel are stored with the number of turns left.
+
+    Parameters
+    ----------
+    resolution: float
+        Duration of a tick in seconds.
+    size: int
+        Number of slots of the wheel.
+    """
+
+    def __init__(self, resolution: float = 1, size: int = 64):
+        self.resolution = resolution
+        self.slots: list[list[Timer]] = [[] for _ in range(size)]
+        self.current = 0
+
+    def schedule(self, delay: float, callback: Callable[[], Awaitable[Any]]) -> Timer:
+        """
+        Schedule a callback to run after `delay` seconds, rounded up to the next tick.
+        """
+        ticks = max(1, math.ceil(delay / self.resolution))
+        size = len(self.slots)
+        timer = Timer(callback, (ticks - 1) // size)
+        self.slots[(self.current + ticks) % size].append(timer)
+        return timer
+
+    def advance(self) -> list[Timer]:
+        """
+        Move the wheel by one tick and return the timers expiring on it.
+        """
+        self.current = (self.current + 1) % len(self.slots)
+        slot = self.slots[self.current]
+        due: list[Timer] = []
+        remaining: list[Timer] = []
+        for timer in slot:
+            if timer.cancelled:
+                continue
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                remaining.append(timer)
+            else:
+                due.append(timer)
+        self.slots[self.current] = remaining
+        return due
+
+
+class TradeScheduler:
+    """
+    Drive the refreshes and timeouts of all active trades from a single task.
+
+    Every `REFRESH_INTERVAL` seconds, a trade's message is only edited if its proposals changed
+    since the last edit. The timeout of a trade fires once, `TRADE_TIMEOUT` seconds after it
+    was registered, unless the trade was unregistered before.
+    """
+
+    def __init__(self, resolution: float = 1):
+        self.wheel = TimerWheel(resolution)
+        self.timers: dict[TradeMenu, tuple[Timer, Timer]] = {}
+        self.states: dict[TradeMenu, Hashable] = {}
+        self.task: asyncio.Task[None] | None = None
+        self.running: set[asyncio.Task[None]] = set()
+
+    def register(self, trade: TradeMenu):
+        """
+        Start refreshing a trade and schedule its timeout. The trade message must be sent.
+        """
+        self.unregister(trade)
+        self.states[trade] = trade.state()
+        self.timers[trade] = (
+            self.wheel.schedule(REFRESH_INTERVAL, lambda: self.refresh(trade)),
+            self.wheel.schedule(TRADE_TIMEOUT, lambda: self.timeout(trade)),
+        )
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(), name="trade-scheduler")
+
+    def unregister(self, trade: TradeMenu):
+        """
+        Stop refreshing a trade and cancel its timeout.
+        """
+        for timer in self.timers.pop(trade, ()):
+            timer.cancel()
+        self.states.pop(trade, None)
+
+    async def refresh(self, trade: TradeMenu):
+        if trade not in self.timers:
+            return
+        _, timeout = self.timers[trade]
+        self.timers[trade] = (
+            self.wheel.schedule(REFRESH_INTERVAL, lambda: self.refresh(trade)),
+            timeout,
+        )
+        state = trade.state()
+        if state == self.states.get(trade):
+            return
+        self.states[trade] = state
+        await trade.refresh()
+
+    async def timeout(self, trade: TradeMenu):
+        if trade not in self.timers:
+            return
+        self.unregister(trade)
+        await trade.timeout()
+
+    async def _fire(self, timer: Timer):
+        try:
+            await timer.callback()
+        except Exception:
+            log.exception("Error in a trade timer")
+
+    async def run(self):
+        resolution = self.wheel.resolution
+        next_tick = time.monotonic() + resolution
+        while self.timers:
+            await asyncio.sleep(max(0, next_tick - time.monotonic()))
+            # catch up on the ticks missed if the loop was blocked
+            while next_tick <= time.monotonic():
+                next_tick += resolution
+                for timer in self.wheel.advance():
+                    task = asyncio.create_task(self._fire(timer))
+                    self.running.add(task)
+                    task.add_done_callback(self.running.discard)
+
+
+trade_scheduler = TradeScheduler()
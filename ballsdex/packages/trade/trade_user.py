@@ -1,32 +1,51 @@
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-from ballsdex.core.models import BlacklistedID
+from ballsdex.core.utils.users import user_resolver
 
 if TYPE_CHECKING:
     import discord
 
     from ballsdex.core.bot import BallsDexBot
-    from ballsdex.core.models import BallInstance, Player, Trade
+    from ballsdex.core.models import BallInstance, BallInstanceView, Player, Trade, TradeArchive
+    from ballsdex.packages.trade.display import ProposalLines
 
 
 @dataclass(slots=True)
 class TradingUser:
     user: "discord.User | discord.Member"
     player: "Player"
-    proposal: list["BallInstance"] = field(default_factory=list)
+    # past trades are displayed from their summary, with views instead of full instances
+    proposal: list["BallInstance | BallInstanceView"] = field(default_factory=list)
     locked: bool = False
     cancelled: bool = False
     accepted: bool = False
     blacklisted: bool | None = None
+    # rendering cache of the proposal, managed by the embed builder
+    lines: "ProposalLines | None" = field(default=None, repr=False, compare=False)
 
     @classmethod
     async def from_trade_model(
-        cls, trade: "Trade", player: "Player", bot: "BallsDexBot", is_admin: bool = False
+        cls,
+        trade: "Trade | TradeArchive",
+        player: "Player",
+        bot: "BallsDexBot",
+        is_admin: bool = False,
     ):
-        proposal = await trade.tradeobjects.filter(player=player).prefetch_related("ballinstance")
-        user = await bot.fetch_user(player.discord_id)
-        blacklisted = (
-            await BlacklistedID.exists(discord_id=player.discord_id) if is_admin else None
-        )
-        return cls(user, player, [x.ballinstance for x in proposal], blacklisted=blacklisted)
+        """
+        Build the trading user of a past trade.
+
+        Parameters
+        ----------
+        trade: Trade | TradeArchive
+            The past trade, its proposals are read from its summary.
+        player: Player
+            One of the two players of the trade.
+        bot: BallsDexBot
+            The bot instance.
+        is_admin: bool
+            Fill the blacklist status of the user.
+        """
+        user = await user_resolver.fetch(bot, player.discord_id)
+        blacklisted = player.discord_id in bot.blacklist if is_admin else None
+        return cls(user, player, trade.proposal(player), blacklisted=blacklisted)
@@ -108,8 +108,14 @@ class Settings:
     prometheus_enabled: bool = False
     prometheus_host: str = "0.0.0.0"
     prometheus_port: int = 15260
+    query_budget: int = 50
 
     spawn_manager: str = "ballsdex.packages.countryballs.spawn.SpawnManager"
+    inventory_search: str = "memory"
+
+    # background jobs
+    job_workers: int = 2
+    jobs_per_user: int = 1
 
     # django admin panel
     webhook_url: str | None = None
@@ -154,6 +160,7 @@ def read_settings(path: "Path"):
     settings.prometheus_enabled = content["prometheus"]["enabled"]
     settings.prometheus_host = content["prometheus"]["host"]
     settings.prometheus_port = content["prometheus"]["port"]
+    settings.query_budget = content["prometheus"].get("query-budget", 50)
 
     settings.max_favorites = content.get("max-favorites", 50)
     settings.max_attack_bonus = content.get("max-attack-bonus", 20)
@@ -172,6 +179,9 @@ def read_settings(path: "Path"):
     settings.spawn_manager = content.get(
         "spawn-manager", "ballsdex.packages.countryballs.spawn.SpawnManager"
     )
+    settings.inventory_search = content.get("inventory-search", "memory")
+    settings.job_workers = (content.get("jobs") or {}).get("workers", 2)
+    settings.jobs_per_user = (content.get("jobs") or {}).get("per-user", 1)
 
     if admin := content.get("admin-panel"):
         settings.webhook_url = admin.get("webhook-url")
@@ -299,8 +309,21 @@ prometheus:
   enabled: false
   host: "0.0.0.0"
   port: 15260
+  # log commands and tasks sending more database queries than this, 0 to disable
+  query-budget: 50
 
 spawn-manager: ballsdex.packages.countryballs.spawn.SpawnManager
+
+# where the inventory autocompletion searches: "memory" keeps recently searched inventories
+# in memory, "database" always queries the database using its trigram index
+inventory-search: memory
+
+# heavy reports like exports run in the background, delivered once done
+jobs:
+  # number of jobs running at the same time, across all users
+  workers: 2
+  # number of jobs a single user can have queued or running
+  per-user: 1
   """  # noqa: W291
     )
 